@@ -12,7 +12,7 @@ bl_info = {
 }
 
 from .cb_op import CBSetContributor, CBUnSetContributor, CBSetBakingTarget, CBUnSetBakingTarget, \
-    CBSetShadowCaster, CBUnSetShadowCaster, CBSetCausticSource, CBRunBaking, CBUnsetCausticSource
+    CBSetShadowCaster, CBUnSetShadowCaster, CBSetCausticSource, CBRunBaking, CBUnsetCausticSource, CBRebuildNodeGroups
 from .cb_pnl import CB_PT_PanelModifyObject, CB_PT_PanelBakingSettings, \
     Contributor_UL_List, Sources_UL_List, Recievers_UL_List, ShadowCasters_UL_List
 from .cb_properties import CB_Props
@@ -20,8 +20,8 @@ from .cb_properties import CB_Props
 classes = (
     CB_Props, CB_PT_PanelModifyObject, CB_PT_PanelBakingSettings, CBSetContributor,
     CBUnSetContributor, CBSetBakingTarget, CBUnSetBakingTarget, CBSetShadowCaster,
-    CBUnSetShadowCaster, CBSetCausticSource, CBRunBaking, CBUnsetCausticSource, Contributor_UL_List, Sources_UL_List,
-    Recievers_UL_List, ShadowCasters_UL_List)
+    CBUnSetShadowCaster, CBSetCausticSource, CBRunBaking, CBUnsetCausticSource, CBRebuildNodeGroups,
+    Contributor_UL_List, Sources_UL_List, Recievers_UL_List, ShadowCasters_UL_List)
 
 
 def register():
@@ -0,0 +1,23 @@
+# command line entry point for caustic bakes on machines without a user interface
+#
+#   blender -b scene.blend --python <addon directory>/batch_bake.py -- --output //caustics.exr --set samples=16
+#
+# A bake is distributed with --processes N on one machine, or on several machines by baking every shard with
+# --shard I/N --partial part_I.npz and merging the partials with --merge part_*.npz --output caustics.exr.
+#
+# The addon is registered from the directory of this script if it is not enabled in the blender preferences, the
+# timing information of the bake is printed as a single JSON line and the exit code is 0 for a finished bake.
+import importlib
+import os
+import sys
+import bpy
+
+directory = os.path.dirname(os.path.abspath(__file__))
+package_name = os.path.basename(directory)
+if os.path.dirname(directory) not in sys.path:
+    sys.path.append(os.path.dirname(directory))
+package = importlib.import_module(package_name)
+if not hasattr(bpy.types.Scene, 'cb_props'):
+    package.register()
+
+sys.exit(importlib.import_module(package_name + '.cb_batch').main())
@@ -0,0 +1,132 @@
+# compares the sweep line clustering of overlapping cameras with the pairwise merge passes it replaced, runs inside
+# blender because the cone tests use mathutils
+#
+#   blender -b --python benchmarks/bench_cam_clustering.py -- --contributors 1000 --output clustering.json
+#
+# Contributors are random point clouds in the light plane for sun lights and random directions for point lights. Both
+# methods have to produce the same groups of contributors.
+import argparse
+import importlib
+import json
+import math
+import os
+import sys
+import time
+import numpy as np
+
+ADDON_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_placement():
+    if os.path.dirname(ADDON_DIRECTORY) not in sys.path:
+        sys.path.append(os.path.dirname(ADDON_DIRECTORY))
+    return importlib.import_module(os.path.basename(ADDON_DIRECTORY) + '.cb_placement')
+
+
+# the merge passes of the former placement, every pass compares all pairs of groups
+def pairwise_merge(groups, place, bounds, overlap):
+    while True:
+        prepared = [bounds(place(group))[2] if group else None for group in groups]
+        merged = False
+        for i in range(len(groups)):
+            if groups[i]:
+                for j in range(len(groups)):
+                    if j != i and groups[j] and overlap(prepared[i], prepared[j]):
+                        groups[i] += groups[j]
+                        groups[j] = []
+                        merged = True
+        if not merged:
+            return [sorted(group) for group in groups if group]
+
+
+def ortho_case(placement, rng, contributors, spread):
+    extents = []
+    for _ in range(contributors):
+        size = rng.uniform(0.2, 1.0, 2)
+        angle = rng.uniform(0, math.pi)
+        points = (rng.random((64, 2)) - 0.5) * size
+        points = points @ np.array(((math.cos(angle), -math.sin(angle)), (math.sin(angle), math.cos(angle))))
+        points += rng.uniform(0, spread, 2)
+        extents.append(placement.ortho_extents(np.c_[points, np.zeros(len(points))]))
+    cache = {}
+
+    def place(group):
+        key = tuple(sorted(group))
+        if key not in cache:
+            group_extents = np.stack([extents[i] for i in group])
+            merged = np.empty(group_extents.shape[1:])
+            merged[:, 0::2] = group_extents[:, :, 0::2].min(axis=0)
+            merged[:, 1::2] = group_extents[:, :, 1::2].max(axis=0)
+            cache[key] = dict(placement.ortho_cam(merged), group=key)
+        return cache[key]
+
+    return place, placement.ortho_bounds, placement.ortho_overlap
+
+
+def pano_case(placement, rng, contributors, spread):
+    # the merged cone covers the cones of the group, this stands in for the convex hull of the directions
+    axes = rng.normal(size=(contributors, 3))
+    axes /= np.linalg.norm(axes, axis=1, keepdims=True)
+    fovs = rng.uniform(0.02, 0.2, contributors) * spread
+    cache = {}
+
+    def place(group):
+        key = tuple(sorted(group))
+        if key not in cache:
+            axis = axes[list(group)].sum(axis=0)
+            axis /= np.linalg.norm(axis)
+            half = max(math.acos(min(1.0, float(axes[i] @ axis))) + fovs[i] / 2 for i in group)
+            rotation = placement.mathutils.Vector((0, 0, 1)).rotation_difference(
+                placement.mathutils.Vector(axis)).to_euler('XYZ')
+            cache[key] = {'rotation': tuple(rotation), 'fov': min(2 * half, math.pi), 'group': key}
+        return cache[key]
+
+    return place, placement.pano_bounds, placement.pano_overlap
+
+
+# every method starts from the same contributors with an empty placement cache
+def run(method, case, placement, seed, contributors, spread):
+    place, bounds, overlap = case(placement, np.random.default_rng(seed), contributors, spread)
+    groups = [[i] for i in range(contributors)]
+    start = time.perf_counter()
+    if method == 'pairwise':
+        result = pairwise_merge(groups, place, bounds, overlap)
+    else:
+        result = [list(cam['group']) for cam in placement.merge_groups(groups, place, bounds, overlap)]
+    return sorted(result), time.perf_counter() - start
+
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--contributors', type=int, default=1000)
+    parser.add_argument('--spread', type=float, default=100.0,
+                        help='size of the light plane the sun light contributors are scattered over')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='optional path of a JSON result file')
+    args = parser.parse_args(argv)
+
+    placement = load_placement()
+    results = []
+    for name, case in (('sun', ortho_case), ('point', pano_case)):
+        spread = args.spread if name == 'sun' else 1.0
+        pairwise, pairwise_time = run('pairwise', case, placement, args.seed, args.contributors, spread)
+        sweep, sweep_time = run('sweep', case, placement, args.seed, args.contributors, spread)
+        result = {
+            'light': name,
+            'contributors': args.contributors,
+            'cams': len(sweep),
+            'pairwise_s': pairwise_time,
+            'sweep_s': sweep_time,
+            'speedup': pairwise_time / sweep_time,
+            'same_groups': pairwise == sweep
+        }
+        results.append(result)
+        print(json.dumps(result))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'seed': args.seed, 'results': results}, file, indent=2)
+
+
+main()
@@ -0,0 +1,96 @@
+# compares the geometry node and the numpy camera placement of the lights of a scene, runs inside blender
+#
+#   blender -b scene.blend --python benchmarks/bench_cam_placement.py -- --repeat 3 --output placement.json
+#
+# Both backends are timed for every caustic source of the scene and the largest difference of the camera parameters
+# is reported, the scene is left unchanged.
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+import bpy
+
+ADDON_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_addon():
+    package_name = os.path.basename(ADDON_DIRECTORY)
+    if os.path.dirname(ADDON_DIRECTORY) not in sys.path:
+        sys.path.append(os.path.dirname(ADDON_DIRECTORY))
+    package = importlib.import_module(package_name)
+    if not hasattr(bpy.types.Scene, 'cb_props'):
+        package.register()
+    return package_name
+
+
+def time_placement(placement, light, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = placement(light)
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+# largest absolute difference of the numbers in two placements, None if the cameras do not match
+def placement_difference(placement, other):
+    if len(placement['cams']) != len(other['cams']) or placement.get('full_sphere') != other.get('full_sphere'):
+        return None
+    difference = 0.0
+    for key, value in placement.items():
+        if isinstance(value, float):
+            difference = max(difference, abs(value - other[key]))
+    for cam, other_cam in zip(placement['cams'], other['cams']):
+        for key, value in cam.items():
+            values = value if isinstance(value, tuple) else (value,)
+            other_values = other_cam[key] if isinstance(other_cam[key], tuple) else (other_cam[key],)
+            difference = max(difference, *(abs(a - b) for a, b in zip(values, other_values)))
+    return difference
+
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=None, help='optional path of a JSON result file')
+    args = parser.parse_args(argv)
+
+    package_name = load_addon()
+    const = importlib.import_module(package_name + '.cb_const')
+    functions = importlib.import_module(package_name + '.cb_functions')
+    placement = importlib.import_module(package_name + '.cb_placement')
+    node_groups = importlib.import_module(package_name + '.cb_nodeGroups_v4')
+
+    node_groups.setup_geo_node_groups()
+    functions.build_collections()
+    results = []
+    try:
+        contributors = len(bpy.data.collections[const.CAUSTIC_CONTRIBUTOR_ATTRIBUTE].all_objects)
+        for light in bpy.data.collections[const.CAUSTIC_SOURCE_ATTRIBUTE].all_objects:
+            nodes, nodes_time = time_placement(functions.node_placement, light, args.repeat)
+            numpy, numpy_time = time_placement(placement.numpy_placement, light, args.repeat)
+            result = {
+                'light': light.name,
+                'type': light.data.type,
+                'contributors': contributors,
+                'cams': len(nodes['cams']),
+                'nodes_s': nodes_time,
+                'numpy_s': numpy_time,
+                'speedup': nodes_time / numpy_time,
+                'max_difference': placement_difference(nodes, numpy)
+            }
+            results.append(result)
+            print(json.dumps(result))
+    finally:
+        for name in (const.CAUSTIC_SHADOW_ATTRIBUTE, const.CAUSTIC_CONTRIBUTOR_ATTRIBUTE,
+                     const.CAUSTIC_RECEIVER_ATTRIBUTE, const.CAUSTIC_SOURCE_ATTRIBUTE):
+            functions.remove_collection(name)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'repeat': args.repeat, 'results': results}, file, indent=2)
+
+
+main()
@@ -0,0 +1,139 @@
+# benchmark suite of the splatting and lens correction kernels on synthetic frames, runs without blender
+#
+#   python benchmarks/bench_kernels.py --sample-res 512,1024 --texture-res 1024,4096 --output kernels.json
+#   python benchmarks/bench_kernels.py --baseline kernels.json
+#
+# Every configuration of valid pixel ratio, hit concentration, texture resolution, color mode and lens correction is
+# timed on the same frames. Peak memory and the memory blocks left allocated are measured in a separate run under
+# tracemalloc so the tracing does not distort the timings. With --baseline the results are compared with a previous
+# result file configuration by configuration.
+import argparse
+import itertools
+import json
+import platform
+import time
+import tracemalloc
+import numpy as np
+
+from common import load_addon_module, parse_int_list, synthetic_frame
+
+PANO_FOV = np.pi
+
+
+def parse_float_list(text):
+    return [float(value) for value in text.split(',') if value]
+
+
+# best seconds per call of kernel over repeat runs through all frames
+def time_kernel(kernel, frames, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for frame in frames:
+            kernel(frame)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(frames)
+
+
+# peak traced bytes of a single call of kernel and the number of memory blocks it left allocated, like cached tables
+def trace_kernel(kernel, frame):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    kernel(frame)
+    peak = tracemalloc.get_traced_memory()[1]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+    return peak, retained
+
+
+def splat_kernel(kernels, target, texture_res, sample_res, colored, pano):
+    def kernel(frame):
+        coordinates, colors = frame
+        kernels.compute_caustic_map(target, coordinates, colors, texture_res, colored, 0, pano, sample_res, PANO_FOV,
+                                    1.0, False)
+    return kernel
+
+
+# builds the correction table without the cache, the cost of a lens cache miss
+def lens_kernel(kernels, sample_res):
+    def kernel(frame):
+        kernels.pano_lens_table(sample_res, PANO_FOV)
+    return kernel
+
+
+def config_key(result):
+    return tuple(result[key] for key in ('kernel', 'sample_res', 'texture_res', 'valid_ratio', 'concentration',
+                                         'colored', 'pano'))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sample-res', type=parse_int_list, default=[512, 1024])
+    parser.add_argument('--texture-res', type=parse_int_list, default=[1024, 4096])
+    parser.add_argument('--valid-ratio', type=parse_float_list, default=[0.1, 0.5, 0.9])
+    parser.add_argument('--concentration', type=parse_float_list, default=[1.0, 0.01])
+    parser.add_argument('--frames', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=None, help='result file of a previous run to compare with')
+    parser.add_argument('--output', default=None, help='optional path of a JSON result file')
+    args = parser.parse_args()
+
+    kernels = load_addon_module('cb_textureRenderingFunctions')
+    targets = load_addon_module('cb_targets')
+    results = []
+    for sample_res in args.sample_res:
+        lens = lens_kernel(kernels, sample_res)
+        peak, retained = trace_kernel(lens, None)
+        results.append({
+            'kernel': 'fix_pano_lens', 'sample_res': sample_res, 'texture_res': None, 'valid_ratio': None,
+            'concentration': None, 'colored': None, 'pano': True,
+            'ms': time_kernel(lens, [None], args.repeat) * 1000, 'pixels_per_s': None, 'samples_per_s': None,
+            'peak_bytes': peak, 'retained_blocks': retained
+        })
+        for valid_ratio, concentration, colored in itertools.product(args.valid_ratio, args.concentration,
+                                                                     (False, True)):
+            rng = np.random.default_rng(args.seed)
+            frames = [synthetic_frame(rng, sample_res, valid_ratio, concentration, colored)
+                      for _ in range(args.frames)]
+            valid = sum(int((coordinates[:, 2] > 0).sum()) for coordinates, _ in frames) / len(frames)
+            for texture_res, pano in itertools.product(args.texture_res, (False, True)):
+                target = targets.CausticTarget(texture_res * texture_res, 3 if colored else 1)
+                kernel = splat_kernel(kernels, target, texture_res, sample_res, colored, pano)
+                # the first call fills the lens cache and the scratch buffer of the target
+                kernel(frames[0])
+                seconds = time_kernel(kernel, frames, args.repeat)
+                peak, retained = trace_kernel(kernel, frames[0])
+                results.append({
+                    'kernel': 'compute_caustic_map', 'sample_res': sample_res, 'texture_res': texture_res,
+                    'valid_ratio': valid_ratio, 'concentration': concentration, 'colored': colored, 'pano': pano,
+                    'ms': seconds * 1000, 'pixels_per_s': sample_res * sample_res / seconds,
+                    'samples_per_s': valid / seconds, 'peak_bytes': peak, 'retained_blocks': retained
+                })
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = {config_key(result): result for result in json.load(file)['results']}
+    for result in results:
+        previous = baseline.get(config_key(result))
+        if previous is not None:
+            result['speedup'] = previous['ms'] / result['ms']
+        print(json.dumps(result))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({
+                'config': vars(args),
+                'environment': {'python': platform.python_version(), 'numpy': np.__version__,
+                                'machine': platform.machine(), 'processor': platform.processor(),
+                                'time': time.strftime('%Y-%m-%dT%H:%M:%S')},
+                'results': results
+            }, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# measures how the thread and process accumulation backends scale with the number of cores
+#
+#   python benchmarks/bench_process_splatting.py --workers 1,2,4,8 --frames 64 --sample-res 1024
+import argparse
+import json
+import os
+import time
+import numpy as np
+
+from common import load_addon_module, parse_int_list, synthetic_frame
+
+
+def run_backend(backend, workers, frames, texture_res, colored):
+    accumulation = load_addon_module('cb_accumulation')
+    process_accumulation = load_addon_module('cb_process_accumulation')
+    targets = load_addon_module('cb_targets')
+    target = targets.CausticTarget(texture_res * texture_res, 3 if colored else 1)
+    frame_size = frames[0][0].size
+
+    start = time.perf_counter()
+    if backend == 'processes':
+        engine = process_accumulation.ProcessAccumulationEngine(target, workers, frame_size, colored)
+        pool = engine.frame_pool
+    else:
+        engine = accumulation.AccumulationEngine(target, workers)
+        pool = None
+    startup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for index, (coordinates, colors) in enumerate(frames):
+        # copying into the frame slots stands in for the viewer node readback
+        if pool is not None:
+            coordinates_slot = pool.acquire()
+            coordinates_slot[:] = coordinates.reshape(-1)
+            coordinates = coordinates_slot.reshape(-1, 4)
+            if colors is not None:
+                colors_slot = pool.acquire()
+                colors_slot[:] = colors.reshape(-1)
+                colors = colors_slot.reshape(-1, 4)
+        sample_frames = [coordinates] if colors is None else [coordinates, colors]
+        engine.submit([coordinates, colors if colors is not None else np.empty(0), texture_res, colored, index,
+                       False, 0, 0.0, 1.0, False], sample_frames)
+    engine.flush()
+    elapsed = time.perf_counter() - start
+    engine.close()
+    return target, startup, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=parse_int_list, default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument('--frames', type=int, default=32)
+    parser.add_argument('--sample-res', type=int, default=512)
+    parser.add_argument('--texture-res', type=int, default=1024)
+    parser.add_argument('--valid-ratio', type=float, default=0.5)
+    parser.add_argument('--colored', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='optional path of a JSON result file')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    frames = [synthetic_frame(rng, args.sample_res, args.valid_ratio, colored=args.colored)
+              for _ in range(args.frames)]
+
+    results = []
+    reference = None
+    for backend in ('threads', 'processes'):
+        baseline = None
+        for workers in sorted(set(args.workers)):
+            target, startup, elapsed = run_backend(backend, workers, frames, args.texture_res, args.colored)
+            if reference is None:
+                reference = target
+            baseline = baseline or elapsed
+            result = {
+                'backend': backend,
+                'workers': workers,
+                'startup_s': startup,
+                'elapsed_s': elapsed,
+                'frames_per_s': len(frames) / elapsed,
+                'speedup': baseline / elapsed,
+                'max_abs_diff': float(np.abs(target.data - reference.data).max())
+            }
+            results.append(result)
+            print(f"{backend:>9} {workers:>3} workers: {result['frames_per_s']:8.2f} frames/s "
+                  f"speedup {result['speedup']:5.2f} (startup {startup:.2f}s)")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'config': vars(args), 'results': results}, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# measures how many samples per second a bake reaches when several samples are folded into one larger render, runs
+# inside blender on a scene with caustic objects
+#
+#   blender -b scene.blend --python benchmarks/bench_sample_folding.py -- --folding 1,2,3,4 --samples 16
+#
+# Every folding factor bakes the same number of samples, a sample is one render of the base resolution worth of paths.
+import argparse
+import importlib
+import json
+import os
+import sys
+import bpy
+
+ADDON_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_addon():
+    package_name = os.path.basename(ADDON_DIRECTORY)
+    if os.path.dirname(ADDON_DIRECTORY) not in sys.path:
+        sys.path.append(os.path.dirname(ADDON_DIRECTORY))
+    package = importlib.import_module(package_name)
+    if not hasattr(bpy.types.Scene, 'cb_props'):
+        package.register()
+    return package_name
+
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--folding', default='1,2,3,4')
+    parser.add_argument('--samples', type=int, default=16)
+    parser.add_argument('--output', default=None, help='optional path of a JSON result file')
+    args = parser.parse_args(argv)
+
+    batch = importlib.import_module(load_addon() + '.cb_batch')
+    results = []
+    baseline = None
+    for folding in [int(value) for value in args.folding.split(',') if value]:
+        stats = batch.bake({'samples': args.samples, 'sample_folding': folding, 'denoise': False,
+                            'save_image_externally': False, 'stop_mode': 'SAMPLES'})
+        samples = stats['samples'] * folding ** 2
+        samples_per_second = samples / stats['total_time']
+        baseline = baseline or samples_per_second
+        result = {
+            'folding': folding,
+            'renders': stats['renders'],
+            'samples': samples,
+            'render_time_s': stats['render_time'],
+            'total_time_s': stats['total_time'],
+            'samples_per_s': samples_per_second,
+            'speedup': samples_per_second / baseline
+        }
+        results.append(result)
+        print(json.dumps(result))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'samples': args.samples, 'results': results}, file, indent=2)
+
+
+main()
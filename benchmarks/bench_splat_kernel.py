@@ -0,0 +1,117 @@
+# compares the sort free splat kernel of compute_caustic_map with the previous lexsort based implementation
+#
+#   python benchmarks/bench_splat_kernel.py --sample-res 1024 --texture-res 2048,8192
+#
+# The default concentrations time hits spread over the whole texture, the case with the largest scratch, and hits
+# piled onto a small part of it.
+import argparse
+import itertools
+import json
+import time
+import numpy as np
+
+from common import load_addon_module, parse_int_list, synthetic_frame
+
+
+def parse_float_list(text):
+    return [float(value) for value in text.split(',') if value]
+
+
+# previous implementation deduplicating the texel indices with lexsort before a fancy indexed add
+def legacy_compute_caustic_map(target_map, coordinates, colors, texture_res, colored, normalization):
+    valid = (coordinates[:, 2] > 0) & (coordinates[:, 0] > 0) & (coordinates[:, 0] < 1) & (coordinates[:, 1] > 0) & (
+            coordinates[:, 1] < 1)
+    valid = np.flatnonzero(valid)
+    if len(valid) == 0:
+        return
+    coordinates = coordinates[valid]
+    if colored:
+        colors = colors[valid]
+    data = coordinates[:, 2]
+
+    x = np.floor(coordinates[:, 0].astype(np.float64) * texture_res)
+    y = np.floor(coordinates[:, 1].astype(np.float64) * texture_res)
+    coordinates = (y * texture_res + x).astype(int).reshape(-1, 1)
+
+    order = np.lexsort(coordinates.T)
+    diff = np.diff(coordinates[order], axis=0)
+    uniq_mask = np.append(True, (diff != 0).any(axis=1))
+
+    uniq_inds = order[uniq_mask]
+    inv_idx = np.zeros_like(order)
+    inv_idx[order] = np.cumsum(uniq_mask) - 1
+
+    if colored:
+        r = np.bincount(inv_idx, weights=np.reshape(colors[:, [0]], -1))
+        g = np.bincount(inv_idx, weights=np.reshape(colors[:, [1]], -1))
+        b = np.bincount(inv_idx, weights=np.reshape(colors[:, [2]], -1))
+        data = np.vstack((r, g, b, r)).T
+    else:
+        data = np.bincount(inv_idx, weights=data)
+        data = np.vstack((data, data, data, data)).T
+
+    data = data * normalization
+    coordinates = coordinates[uniq_inds]
+    target_map[coordinates] += data.reshape(-1, 1, 4)
+
+
+def time_kernel(kernel, frames, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for coordinates, colors in frames:
+            kernel(coordinates, colors)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sample-res', type=int, default=1024)
+    parser.add_argument('--texture-res', type=parse_int_list, default=[1024, 4096])
+    parser.add_argument('--valid-ratio', type=float, default=0.5)
+    parser.add_argument('--concentration', type=parse_float_list, default=[1.0, 0.01])
+    parser.add_argument('--frames', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='optional path of a JSON result file')
+    args = parser.parse_args()
+
+    kernels = load_addon_module('cb_textureRenderingFunctions')
+    targets = load_addon_module('cb_targets')
+    rng = np.random.default_rng(args.seed)
+    results = []
+    for colored, concentration in itertools.product((False, True), args.concentration):
+        frames = [synthetic_frame(rng, args.sample_res, args.valid_ratio, concentration, colored)
+                  for _ in range(args.frames)]
+        for texture_res in args.texture_res:
+            legacy = np.zeros((texture_res * texture_res, 4))
+            # a float64 target keeps the comparison with the legacy float64 map exact
+            current = targets.CausticTarget(texture_res * texture_res, 3 if colored else 1, dtype=np.float64)
+            legacy_time = time_kernel(
+                lambda c, k: legacy_compute_caustic_map(legacy, c, k, texture_res, colored, 0.5), frames, args.repeat)
+            current_time = time_kernel(
+                lambda c, k: kernels.compute_caustic_map(current, c, k, texture_res, colored, 0, False, 0, 0.0, 0.5,
+                                                         False), frames, args.repeat)
+            result = {
+                'colored': colored,
+                'concentration': concentration,
+                'texture_res': texture_res,
+                'legacy_ms': legacy_time * 1000,
+                'direct_ms': current_time * 1000,
+                'speedup': legacy_time / current_time,
+                'identical': bool(np.array_equal(legacy[:, :current.channels], current.data))
+            }
+            results.append(result)
+            print(f"{'rgb' if colored else 'lum'} {texture_res:>6} concentration {concentration:<5}: "
+                  f"lexsort {result['legacy_ms']:8.2f} ms, direct {result['direct_ms']:8.2f} ms, speedup {result['speedup']:5.2f}, "
+                  f"identical {result['identical']}")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'config': vars(args), 'results': results}, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+# helpers shared by the benchmark scripts, they run with a plain python interpreter outside of blender
+import importlib
+import os
+import sys
+import types
+import numpy as np
+
+ADDON_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADDON_PACKAGE = 'cb_addon'
+
+
+# imports an addon module without running the package __init__, which depends on bpy
+def load_addon_module(name):
+    if ADDON_PACKAGE not in sys.modules:
+        package = types.ModuleType(ADDON_PACKAGE)
+        package.__path__ = [ADDON_DIRECTORY]
+        sys.modules[ADDON_PACKAGE] = package
+    return importlib.import_module(f'{ADDON_PACKAGE}.{name}')
+
+
+# builds a synthetic (sample_res², 4) float32 render frame like the one read back from the viewer node
+#
+# valid_ratio is the fraction of pixels that carry a caustic hit, concentration is the fraction of the UV square the
+# hits are packed into (1 spreads them over the whole texture, small values pile them onto few texels).
+def synthetic_frame(rng, sample_res, valid_ratio=0.5, concentration=1.0, colored=False):
+    pixels = sample_res * sample_res
+    frame = np.zeros((pixels, 4), dtype=np.float32)
+    valid = rng.random(pixels) < valid_ratio
+    count = int(valid.sum())
+    side = concentration ** 0.5
+    origin = rng.random(2) * (1 - side)
+    frame[valid, 0] = origin[0] + rng.random(count, dtype=np.float32) * side
+    frame[valid, 1] = origin[1] + rng.random(count, dtype=np.float32) * side
+    frame[valid, 2] = rng.random(count, dtype=np.float32) + 0.01
+    frame[:, 3] = 1
+    if colored:
+        colors = rng.random((pixels, 4), dtype=np.float32)
+        colors[:, 3] = 1
+        return frame, colors
+    return frame, None
+
+
+def parse_int_list(text):
+    return [int(value) for value in text.split(',') if value]
@@ -0,0 +1,118 @@
+import os
+import queue
+import threading
+
+from .cb_const import ACCUMULATION_QUEUE_SIZE, ACCUMULATION_MAX_WORKERS
+from .cb_targets import sum_tiles, take_dirty_tiles
+from .cb_textureRenderingFunctions import compute_caustic_map
+
+
+# returns the number of accumulation workers to use, 0 selects an automatic amount
+def worker_count(requested):
+    if requested > 0:
+        return requested
+    return max(1, min(ACCUMULATION_MAX_WORKERS, (os.cpu_count() or 1) - 1))
+
+
+# fixed pool of worker threads that splat samples into private partial buffers
+#
+# Sample k is always processed by worker k % workers and every worker handles its samples in submission order, the
+# partial buffers are summed into the target in worker order. The result therefore only depends on the submitted
+# samples and the worker count, not on thread scheduling. With track_tiles set the partial buffers record the tiles
+# they change so previews only have to read those.
+class AccumulationEngine:
+    def __init__(self, target, workers, release=None, queue_size=ACCUMULATION_QUEUE_SIZE, track_tiles=False):
+        self.target = target
+        self.release = release
+        self.submitted = 0
+        self.closed = False
+        self.errors = []
+        self.partials = [target.empty_like() for _ in range(workers)]
+        if track_tiles:
+            for partial in [target] + self.partials:
+                partial.track_tiles()
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+        self.threads = [threading.Thread(target=self.work, args=[i], daemon=True) for i in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    # True if the next sample can be submitted without blocking
+    def has_capacity(self):
+        return not self.queues[self.submitted % len(self.queues)].full()
+
+    # queues a sample for processing, blocks while the responsible worker is saturated
+    # args are the arguments of compute_caustic_map without the target, frames are released after processing
+    def submit(self, args, frames=()):
+        self.queues[self.submitted % len(self.queues)].put((args, frames))
+        self.submitted += 1
+
+    def work(self, index):
+        jobs = self.queues[index]
+        partial = self.partials[index]
+        while True:
+            job = jobs.get()
+            if job is None:
+                jobs.task_done()
+                break
+            args, frames = job
+            try:
+                compute_caustic_map(partial, *args)
+            except Exception as e:
+                self.errors.append(e)
+            finally:
+                if self.release is not None:
+                    for frame in frames:
+                        self.release(frame)
+                jobs.task_done()
+
+    # waits for all queued samples and reduces the partial buffers into the target
+    def flush(self):
+        for jobs in self.queues:
+            jobs.join()
+        for partial in self.partials:
+            self.target.merge(partial)
+            partial.clear()
+        if self.errors:
+            error = self.errors[0]
+            self.errors = []
+            raise error
+        return self.target
+
+    # current state of the accumulation including samples that are not reduced yet, used for previews
+    def snapshot(self):
+        preview = self.target.copy()
+        for partial in self.partials:
+            preview.merge(partial)
+        return preview
+
+    # tiles changed since the last call, only available with track_tiles
+    def dirty_tiles(self):
+        return take_dirty_tiles([self.target] + self.partials)
+
+    # texel indices and values of the given tiles including samples that are not reduced yet
+    def tile_values(self, tiles):
+        return sum_tiles([self.target] + self.partials, tiles)
+
+    # stops the workers, pending samples are reduced unless discard is set
+    def close(self, discard=False):
+        if self.closed:
+            return self.target
+        self.closed = True
+        if discard:
+            for jobs in self.queues:
+                while True:
+                    try:
+                        args, frames = jobs.get_nowait()
+                    except queue.Empty:
+                        break
+                    if self.release is not None:
+                        for frame in frames:
+                            self.release(frame)
+                    jobs.task_done()
+        for jobs in self.queues:
+            jobs.put(None)
+        for thread in self.threads:
+            thread.join()
+        if not discard:
+            self.flush()
+        return self.target
@@ -0,0 +1,91 @@
+import math
+import numpy as np
+
+
+# texels and values one coordinate render adds to the caustic map before normalization, lens is the per pixel fisheye
+# correction or None
+def sample_texels(coordinates, texture_res, lens=None):
+    valid = (coordinates[:, 2] > 0) & (coordinates[:, 0] > 0) & (coordinates[:, 0] < 1) & (coordinates[:, 1] > 0) & (
+            coordinates[:, 1] < 1)
+    valid = np.flatnonzero(valid)
+    values = coordinates[valid, 2].astype(np.float64)
+    if lens is not None:
+        values *= lens[valid, 0]
+    x = np.floor(coordinates[valid, 0].astype(np.float64) * texture_res)
+    y = np.floor(coordinates[valid, 1].astype(np.float64) * texture_res)
+    return (y * texture_res + x).astype(np.intp), values
+
+
+# variance of the contribution of one camera, measured on the texels touched by its pilot samples
+#
+# Only the sparse texels of every pilot are kept. The variance is summed over all texels, which is the expected
+# squared error one sample of the camera adds to the caustic map.
+class PilotStatistics:
+    def __init__(self):
+        self.texels = []
+        self.values = []
+        self.square_sum = 0.0
+        # set when a pilot finds no caustics, the camera then gets no further samples
+        self.exhausted = False
+
+    @property
+    def samples(self):
+        return len(self.texels)
+
+    def add(self, texels, values):
+        # texels hit by several pixels of a sample are summed first
+        unique, inverse = np.unique(texels, return_inverse=True)
+        sums = np.bincount(inverse, weights=values, minlength=len(unique))
+        self.texels.append(unique)
+        self.values.append(sums)
+        self.square_sum += float(sums @ sums)
+
+    # unbiased per sample variance summed over all texels, the second moment is used with a single pilot
+    def variance(self):
+        if self.samples == 0:
+            return 0.0
+        if self.samples == 1:
+            return self.square_sum
+        unique, inverse = np.unique(np.concatenate(self.texels), return_inverse=True)
+        sums = np.bincount(inverse, weights=np.concatenate(self.values), minlength=len(unique))
+        return max(self.square_sum - float(sums @ sums) / self.samples, 0.0) / (self.samples - 1)
+
+
+# distributes budget samples over the cameras proportional to their scores, every camera gets at least minimum
+#
+# With score = weight * standard deviation / sqrt(cost) this is the Neyman allocation minimizing the summed variance
+# for a fixed render cost. The rounding keeps the total by handing the leftover samples to the largest remainders.
+def neyman_allocation(budget, scores, minimum=1):
+    count = len(scores)
+    if count == 0:
+        return []
+    scores = np.asarray(scores, dtype=np.float64)
+    if not np.isfinite(scores).all() or scores.sum() <= 0:
+        scores = np.ones(count)
+    free = max(budget - minimum * count, 0)
+    shares = scores / scores.sum() * free
+    allocation = np.floor(shares).astype(int)
+    leftover = free - int(allocation.sum())
+    if leftover > 0:
+        allocation[np.argsort(allocation - shares)[:leftover]] += 1
+    return [minimum + int(samples) for samples in allocation]
+
+
+# score of a camera for neyman_allocation, share is the part of the camera estimate left to the adaptive samples
+def allocation_score(variance, normalization, share, cost):
+    return share * abs(normalization) * math.sqrt(variance) / math.sqrt(max(cost, 1e-3))
+
+
+# relative RMS noise of the map after a pass, estimated from the map before the pass and the map after it
+#
+# The previous map averages samples and the pass adds added samples. The mean of the pass samples and the previous
+# map are independent estimates of the same map, so their squared distance is the per sample variance times
+# 1 / samples + 1 / added.
+def relative_noise(previous, current, samples, added):
+    total = samples + added
+    added_mean = (current * total - previous * samples) / added
+    variance = float(np.square(added_mean - previous).sum(dtype=np.float64)) / (1 / samples + 1 / added)
+    energy = float(np.square(current).sum(dtype=np.float64))
+    if energy <= 0:
+        return None
+    return math.sqrt(variance / total / energy)
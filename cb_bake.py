@@ -0,0 +1,679 @@
+from datetime import datetime
+import time
+import bpy
+import numpy as np
+
+from .cb_accumulation import AccumulationEngine, worker_count
+from .cb_allocation import PilotStatistics, allocation_score, neyman_allocation, relative_noise, sample_texels
+from .cb_checkpoint import checkpoint_path, open_target, load_state, save_state, camera_progress, \
+    matches_placement, restore_progress
+from .cb_process_accumulation import ProcessAccumulationEngine
+from .cb_partial import save_partial
+from .cb_preview import ImagePreview
+from .cb_profiler import stage, start_profiling, stop_profiling
+from .cb_readback import ViewerReadback
+from .cb_scheduler import RenderScheduler
+from .cb_targets import CausticTarget, TiledTarget
+from .cb_const import CAUSTIC_SOURCE_ATTRIBUTE, CAUSTIC_SENSOR_NAME, COLOR_BATCH_SIZE, ADAPTIVE_PILOT_SAMPLES
+from .cb_functions import reset_compositor, reset_scene, scene_setup, setup_compositor, denoising, color_sampling, \
+    is_debug, auto_cam_placement, build_collections, remove_collections, remove_collection, cam_setup, fisheye_fov, \
+    sample_resolution, bake_scene, create_bake_scene, remove_bake_scene
+from .cb_textureRenderingFunctions import fix_pano_lens, lens_cache_info
+from .cb_nodeGroupLoader_v4 import import_stats
+from .cb_nodeGroups_v4 import setup_geo_node_groups
+
+
+# state of a single caustic bake, driven either by the modal CBRunBaking operator or synchronously by bake
+#
+# start prepares the scene and the accumulation engine, render_next renders one sample whose result is handed to the
+# accumulation engine by post, complete writes the finished map into the image and cleanup restores the scene.
+class BakeSession:
+    def __init__(self, report=None, shard=(0, 1), preview=True):
+        self.report = report
+        # index and count of the shards of a distributed bake, every shard renders every count-th camera
+        self.shard = shard
+        self.light_offset = 1
+        self.offset_end = 1
+        self.shard_cams = []
+        # rendered and valid pixels of every camera, compares the full frame with the rendered border
+        self.cam_pixels = []
+        self.scheduler = RenderScheduler()
+        self.light_amount = None
+        self.light_count = 0
+        self.original_scene_settings = None
+        self.active_cam = None
+        self.cams = None
+        cb_props = bpy.context.scene.cb_props
+        # the pilots and the allocation of a light have to be rendered in one session by one process
+        self.adaptive = cb_props.adaptive_sampling and shard[1] == 1 and not cb_props.out_of_core
+        self.light_cams = []
+        self.pilots = {}
+        self.allocated = False
+        self.allocation = []
+        # SAMPLES bakes the given samples, TIME and NOISE add passes of samples until the budget or the noise target
+        # is reached, every shard of a distributed bake has to bake the same samples
+        self.stop_mode = cb_props.stop_mode if shard[1] == 1 else 'SAMPLES'
+        # the partials of a distributed bake are accumulated in float64, their merged sum is then independent of how
+        # the cameras are split over the shards and equal to a single double precision bake
+        self.dtype = np.float64 if cb_props.double_precision or shard[1] > 1 else np.float32
+        self.passes = []
+        self.pass_start = time.perf_counter()
+        self.previous_values = None
+        self.noise = None
+        self.stop = False
+        self.render = True
+        # coordinate frames and sample offsets of the colored samples waiting for their color render
+        self.coordinates = []
+        self.color_pass = False
+        self.next_offset = 0
+        self.startTime = datetime.now()
+        self.timings = {}
+        self.profiler = None
+        self.trace = None
+        self.colored = cb_props.colored
+        if cb_props.useImage:
+            self.textureRes = cb_props.targetImage.size[0]
+        else:
+            self.textureRes = cb_props.textureRes
+        self.samples = 0
+        self.counter = 0
+        self.run_samples = cb_props.samples
+        self.samples_total = cb_props.samples
+        self.sample_weight = 1.0
+        self.checkpoint = None
+        self.last_checkpoint = time.monotonic()
+        if cb_props.out_of_core:
+            # the memory mapped target is opened in start once it is known whether a checkpoint is resumed
+            self.target = None
+        elif cb_props.sparse_target:
+            self.target = TiledTarget(self.textureRes, 3 if self.colored else 1, cb_props.compensated_summation,
+                                      self.dtype)
+        else:
+            self.target = CausticTarget(self.textureRes * self.textureRes, 3 if self.colored else 1,
+                                        cb_props.compensated_summation, self.dtype)
+        self.finish = False
+        self.readback = ViewerReadback(calibrate=is_debug())
+        self.engine = None
+        self.samples_done = 0
+        self.image_normalization = (self.textureRes ** 2) / (sample_resolution() ** 2)
+
+        if cb_props.useImage:
+            self.image = cb_props.targetImage
+        else:
+            self.image = bpy.data.images.get(cb_props.imageName)
+            if self.image is None:
+                self.image = bpy.data.images.new(name=cb_props.imageName, width=self.textureRes,
+                                                 height=self.textureRes,
+                                                 alpha=False, float_buffer=True)
+            else:
+                self.image.scale(self.textureRes, self.textureRes)
+        # synchronous bakes never refresh the image before it is complete
+        self.preview = ImagePreview(self.image, cb_props.preview_interval if preview else 0)
+
+    # setting up the scene, the camera placement of the first light and the accumulation engine
+    def start(self):
+        start_time = time.perf_counter()
+        cb_props = bpy.context.scene.cb_props
+        if cb_props.profile_bake or is_debug():
+            self.profiler = start_profiling()
+        with stage('node_groups'):
+            setup_geo_node_groups()
+        self.timings['node_groups'] = time.perf_counter() - start_time
+        if is_debug():
+            for name, stats in import_stats.items():
+                print(f"node group {name}: {stats['result']} in {stats['time'] * 1000:.2f} ms")
+        build_collections()
+        # the sensor cameras are linked into the bake scene, so it has to exist before they are placed
+        create_bake_scene(bpy.context.scene)
+        self.light_amount = len(bpy.data.collections[CAUSTIC_SOURCE_ATTRIBUTE].all_objects)
+        state = None
+        if cb_props.out_of_core:
+            state = self.open_checkpoint(cb_props, cb_props.resume_bake)
+        self.cams = self.place_cams(self.light_count)
+        if state is not None and not matches_placement(state, self.cams):
+            # the checkpoint can not be matched to the cameras of the changed scene
+            self.warn('scene changed since the checkpoint was saved, starting a new bake')
+            state = self.open_checkpoint(cb_props, False)
+            remove_collection(CAUSTIC_SENSOR_NAME)
+            self.cams = self.place_cams(0)
+        if cb_props.adaptive_sampling and not self.adaptive:
+            self.warn('adaptive sampling is not available for distributed and out-of-core bakes')
+        if cb_props.stop_mode != self.stop_mode:
+            self.warn('distributed bakes always bake the given number of samples')
+        if cb_props.accumulation_backend == 'PROCESSES' and isinstance(self.target, TiledTarget):
+            # the tiles of a sparse target grow during the bake and can not be placed in fixed shared memory blocks
+            self.warn('sparse targets are accumulated in threads, the process backend is not used')
+        self.plan_pilots(self.cams)
+        self.assign_cams(self.cams)
+        if state is not None and not state['finished']:
+            # continuing with the cameras that were not finished when the checkpoint was written
+            restore_progress(state, self.cams)
+        self.original_scene_settings = scene_setup(bpy.context.scene)
+        self.timings['material_setup'] = self.original_scene_settings['shader_settings']['setup_time']
+        self.activate_cam(self.cams.pop())
+        setup_compositor()
+        if cb_props.accumulation_backend == 'PROCESSES' and not isinstance(self.target, TiledTarget):
+            frame_size = bake_scene().render.resolution_x * bake_scene().render.resolution_y * 4
+            self.engine = ProcessAccumulationEngine(self.target, worker_count(cb_props.worker_threads),
+                                                    frame_size, self.colored,
+                                                    held_frames=COLOR_BATCH_SIZE if self.colored else 0,
+                                                    track_tiles=self.preview.enabled)
+            self.readback.pool = self.engine.frame_pool
+        else:
+            self.engine = AccumulationEngine(self.target, worker_count(cb_props.worker_threads),
+                                             release=self.readback.release, track_tiles=self.preview.enabled)
+        if state is not None and state['finished'] and not self.finish:
+            # the reweighted map of the extended bake is stored before new samples are added
+            self.save_checkpoint()
+        self.update_info()
+        bpy.app.handlers.render_post.append(self.post)
+        bpy.app.handlers.render_cancel.append(self.cancelled)
+        self.timings['setup'] = time.perf_counter() - start_time
+
+    # places the cameras of the light with the given index for the samples of the current pass
+    def place_cams(self, light_index):
+        start_time = time.perf_counter()
+        with stage('placement'):
+            cams = auto_cam_placement(bpy.data.collections[CAUSTIC_SOURCE_ATTRIBUTE].objects[light_index],
+                                      self.run_samples)
+        self.timings['placement'] = self.timings.get('placement', 0.0) + time.perf_counter() - start_time
+        return cams
+
+    # gives every camera of the current light a fixed range of sample offsets and drops the cameras of other shards
+    #
+    # The offsets only depend on the camera placement, so a camera renders the same samples whether it is baked by a
+    # single process or by one of several shards.
+    def assign_cams(self, cams):
+        index, count = self.shard
+        offset = self.light_offset
+        self.samples = 0
+        for i, cam in enumerate(cams):
+            cam['sample_offset'] = offset
+            cam['samples'] = cam['remaining']
+            offset += cam.get('offset_range', cam['remaining'])
+            if (self.light_count + i) % count != index:
+                cam['remaining'] = 0
+            elif cam['remaining'] > 0:
+                self.shard_cams.append({'light': self.light_count, 'sample_offset': cam['sample_offset'],
+                                        'samples': cam['samples'], 'cam_normalization': cam['cam_normalization']})
+            self.samples += cam['remaining']
+        self.offset_end = offset
+
+    # reduces the cameras of the light to a few pilot samples when sampling adaptively
+    #
+    # The pilots keep the weight of the density based allocation, so they make up the share pilot / planned of the
+    # estimate of their camera. The rest of the planned samples is distributed by allocate once all pilots are
+    # rendered. Every camera reserves sample offsets for the case that it receives the whole budget of the light.
+    def plan_pilots(self, cams):
+        self.light_cams = list(cams)
+        self.pilots = {}
+        self.allocated = not self.adaptive
+        if not self.adaptive:
+            return
+        budget = sum(cam['remaining'] - ADAPTIVE_PILOT_SAMPLES for cam in cams
+                     if cam['remaining'] > ADAPTIVE_PILOT_SAMPLES)
+        for cam in cams:
+            if cam['remaining'] > ADAPTIVE_PILOT_SAMPLES:
+                cam['planned'] = cam['remaining']
+                cam['offset_range'] = ADAPTIVE_PILOT_SAMPLES + budget
+                cam['remaining'] = ADAPTIVE_PILOT_SAMPLES
+                self.pilots[cam.name] = PilotStatistics()
+
+    # distributes the remaining samples of the light to the cameras with the largest expected error
+    #
+    # A camera with planned samples p, m pilots and n allocated samples estimates its contribution as
+    # m / p * pilot mean + (1 - m / p) * allocated mean, which is unbiased for any n > 0. The allocated samples are
+    # weighted accordingly so the energy normalization of the camera stays the same.
+    def allocate(self):
+        self.allocated = True
+        cams = [cam for cam in self.light_cams if cam.name in self.pilots and not self.pilots[cam.name].exhausted]
+        if not cams:
+            return
+        borders = {(pixels['light'], pixels['sample_offset']): pixels['border'] for pixels in self.cam_pixels}
+        budget = 0
+        scores = []
+        for cam in cams:
+            share = 1 - ADAPTIVE_PILOT_SAMPLES / cam['planned']
+            budget += cam['planned'] - ADAPTIVE_PILOT_SAMPLES
+            scores.append(allocation_score(self.pilots[cam.name].variance(), cam['cam_normalization'] * cam['planned'],
+                                           share, borders.get((self.light_count, cam['sample_offset']), 1.0)))
+        for cam, samples, score in zip(cams, neyman_allocation(budget, scores), scores):
+            share = 1 - ADAPTIVE_PILOT_SAMPLES / cam['planned']
+            cam['cam_normalization'] = cam['cam_normalization'] * cam['planned'] * share / samples
+            cam['samples'] = ADAPTIVE_PILOT_SAMPLES + samples
+            cam['remaining'] = samples
+            self.allocation.append({'light': self.light_count, 'sample_offset': cam['sample_offset'],
+                                    'planned': cam['planned'], 'allocated': ADAPTIVE_PILOT_SAMPLES + samples,
+                                    'variance': self.pilots[cam.name].variance(), 'score': score})
+        self.samples = self.counter + budget
+        self.cams = cams
+
+    # makes the camera the active camera and continues its sample offsets after the samples it already rendered
+    def activate_cam(self, cam):
+        self.active_cam = cam
+        border = cam.get('border', (0.0, 1.0, 0.0, 1.0))
+        self.cam_pixels.append({'light': self.light_count, 'sample_offset': cam['sample_offset'], 'renders': 0,
+                                'valid': 0, 'border': (border[1] - border[0]) * (border[3] - border[2])})
+        bake_scene().cycles.sample_offset = cam['sample_offset'] + cam['samples'] - cam['remaining']
+
+    def warn(self, message):
+        if self.report is not None:
+            self.report({'WARNING'}, message)
+        else:
+            print('caustic bake:', message)
+
+    # function that is called after a rendering is complete
+    def post(self, scene, context=None):
+        if not self.finish:
+            if self.colored:
+                # process for colored image, the coordinates of a batch of samples are rendered first and the colors
+                # are rendered afterwards with the same sample offsets so the shader is only switched twice per batch.
+                # Colored samples still take two renders: shader AOVs are only written at the primary hit, the
+                # contributor surface, while the receiver coordinates and colors arrive after refraction, and the
+                # viewer readback carries four of the five channels a colored sample needs.
+                if not self.color_pass:
+                    coordinates = self.readback.read()
+                    if self.count_valid(coordinates):
+                        self.coordinates.append((coordinates, scene.cycles.sample_offset))
+                    else:
+                        # with no valid coordinates found all remaining samples for the camera are skipped
+                        self.readback.release(coordinates)
+                        self.counter += self.active_cam['remaining'] - len(self.coordinates)
+                        self.active_cam['remaining'] = len(self.coordinates)
+                    # switching to a new random sampling position within every pixel
+                    scene.cycles.sample_offset = scene.cycles.sample_offset + 1
+                    if self.coordinates and len(self.coordinates) >= min(COLOR_BATCH_SIZE, self.active_cam['remaining']):
+                        # rendering the colors of the batch starting with the first sample position
+                        self.color_pass = True
+                        self.next_offset = scene.cycles.sample_offset
+                        scene.cycles.sample_offset = self.coordinates[0][1]
+                        color_sampling(1)
+                else:
+                    # starting the processing thread with the saved coordinates and the color information of the
+                    # current render
+                    coordinates, _ = self.coordinates.pop(0)
+                    self.start_processing(coordinates, self.readback.read())
+                    self.active_cam['remaining'] -= 1
+                    self.counter += 1
+                    if self.coordinates:
+                        scene.cycles.sample_offset = self.coordinates[0][1]
+                    else:
+                        # resetting for the next batch
+                        self.color_pass = False
+                        scene.cycles.sample_offset = self.next_offset
+                        color_sampling(0)
+            else:
+                # process with only luminance, coordinate information is directly given to the processing function
+                coordinates = self.readback.read()
+                valid = self.count_valid(coordinates) > 0
+                self.start_processing(coordinates, None)
+
+                # resetting for next sample
+                scene.cycles.sample_offset = scene.cycles.sample_offset + 1
+                if valid:
+                    self.active_cam['remaining'] -= 1
+                    self.counter += 1
+                else:
+                    # with no valid coordinates found all remaining samples for the camera are skipped
+                    self.counter += self.active_cam['remaining']
+                    self.active_cam['remaining'] = 0
+            self.render = True
+
+    # counts the pixels of a coordinate render that hit a caustic receiver
+    def count_valid(self, coordinates):
+        valid = int(np.count_nonzero(coordinates[:, 2] > 0))
+        self.cam_pixels[-1]['renders'] += 1
+        self.cam_pixels[-1]['valid'] += valid
+        if not self.allocated and self.active_cam.name in self.pilots:
+            self.record_pilot(self.pilots[self.active_cam.name], coordinates, valid)
+        return valid
+
+    # adds a pilot render of the active camera to its statistics, a render without caustics ends the camera
+    def record_pilot(self, pilot, coordinates, valid):
+        if valid == 0:
+            pilot.exhausted = True
+            return
+        lens = None
+        if self.active_cam.data.type == 'PANO':
+            lens = fix_pano_lens(bake_scene().render.resolution_x, fisheye_fov(self.active_cam))
+        pilot.add(*sample_texels(coordinates, self.textureRes, lens))
+
+    # fraction of valid pixels of every rendered camera, of the full frame and of the rendered border
+    def pixel_stats(self):
+        pixels = sample_resolution() ** 2
+        stats = []
+        for cam in self.cam_pixels:
+            if cam['renders'] > 0:
+                stats.append({
+                    'light': cam['light'],
+                    'sample_offset': cam['sample_offset'],
+                    'renders': cam['renders'],
+                    'border': cam['border'],
+                    'valid_fraction': cam['valid'] / (cam['renders'] * pixels),
+                    'cropped_valid_fraction': cam['valid'] / (cam['renders'] * pixels * max(cam['border'], 1e-12))
+                })
+        return stats
+
+    # hands the given readback frames to the accumulation engine, the frames are returned to the pool when done
+    def start_processing(self, coordinates, colors):
+        args = [coordinates, colors if colors is not None else np.empty(0), self.textureRes,
+                self.colored, self.counter, self.active_cam.data.type == 'PANO',
+                bake_scene().render.resolution_x, fisheye_fov(self.active_cam),
+                self.image_normalization * self.active_cam['cam_normalization'] * self.sample_weight, is_debug()]
+        self.engine.submit(args, [frame for frame in (coordinates, colors) if frame is not None])
+        self.samples_done += 1
+
+    def cancelled(self, scene, context=None):
+        self.stop = True
+
+    # opens the memory mapped target and returns the checkpoint to continue from, None starts a new bake
+    #
+    # A finished checkpoint is extended when more samples are requested than it holds: the existing map is weighted
+    # with old_samples / samples and the additional samples with their share of the new total.
+    def open_checkpoint(self, cb_props, resume):
+        if cb_props.useImage:
+            image_name = cb_props.targetImage.name
+        else:
+            image_name = cb_props.imageName
+        self.checkpoint = checkpoint_path(bpy.data.filepath, bpy.app.tempdir, image_name)
+        if self.shard[1] > 1:
+            self.checkpoint += f'_{self.shard[0]}of{self.shard[1]}'
+        texels = self.textureRes * self.textureRes
+        channels = 3 if self.colored else 1
+        state = None
+        if resume:
+            state = load_state(self.checkpoint, self.textureRes, channels, cb_props.compensated_summation,
+                               self.dtype)
+        self.target = open_target(self.checkpoint, texels, channels, cb_props.compensated_summation, state is None,
+                                  self.dtype)
+        if state is None:
+            self.light_count = 0
+            self.counter = 0
+            self.run_samples = cb_props.samples
+            self.samples_total = cb_props.samples
+            self.sample_weight = 1.0
+            return None
+
+        if not state['finished']:
+            self.light_count = state['light_count']
+            self.light_offset = state['light_offset']
+            self.counter = state['counter']
+            self.run_samples = state['run_samples']
+            self.samples_total = state['samples_total']
+            self.sample_weight = state['sample_weight']
+        elif cb_props.samples > state['samples_total']:
+            self.run_samples = cb_props.samples - state['samples_total']
+            self.samples_total = cb_props.samples
+            self.sample_weight = self.run_samples / self.samples_total
+            # the added samples continue after the sample offsets used by the finished bake
+            self.light_offset = state['sample_offset']
+            self.target.scale(state['samples_total'] / self.samples_total)
+        else:
+            self.samples_total = state['samples_total']
+            self.finish = True
+        return state
+
+    # stores the bake progress together with the flushed accumulation target
+    def save_checkpoint(self, finished=False):
+        if self.checkpoint is None:
+            return
+        self.engine.flush()
+        # all cameras of the light in placement order, the rendered ones are popped from self.cams
+        progress = camera_progress(self.light_cams, finished)
+        save_state(self.checkpoint, self.target, {
+            'texture_res': self.textureRes,
+            'channels': self.target.channels,
+            'compensated': self.target.compensated,
+            'dtype': self.target.dtype.name,
+            'finished': finished,
+            'light_count': self.light_count,
+            'counter': self.counter,
+            'remaining': progress['remaining'],
+            'cam_count': progress['cam_count'],
+            'light_offset': self.light_offset,
+            'sample_offset': self.offset_end,
+            'run_samples': self.run_samples,
+            'samples_total': self.samples_total,
+            'sample_weight': self.sample_weight
+        })
+        self.last_checkpoint = time.monotonic()
+
+    # updates the information displayed in the statusbar
+    def update_info(self):
+        cb_props = bpy.context.scene.cb_props
+        if self.counter < self.samples:
+            cb_props.progress_indicator_text = f'Light {self.light_count + 1}/{self.light_amount} | Render {self.counter + 1}/{self.samples}'
+        else:
+            cb_props.progress_indicator_text = f'Processing'
+        progress = self.counter / max(self.samples, 1) / self.light_amount + self.light_count / self.light_amount
+        if self.stop_mode != 'SAMPLES':
+            cb_props.progress_indicator_text = f'Pass {len(self.passes) + 1} | ' + cb_props.progress_indicator_text
+            if self.noise is not None:
+                cb_props.progress_indicator_text += f' | Noise {self.noise:.1%}'
+        if self.stop_mode == 'TIME':
+            progress = min((time.perf_counter() - self.scheduler.start_time) / cb_props.time_budget, 1)
+        cb_props.progress_indicator = progress * 100
+        cb_props.time_elapsed = str(datetime.now() - self.startTime)
+
+    # refreshes the progress information and, when due, the output image with the samples accumulated so far
+    def update_preview(self):
+        self.update_info()
+        self.preview.update(self.engine)
+
+    # switches to the next camera or light if necessary and renders the next sample, post is called by the render
+    def render_next(self):
+        cb_props = bpy.context.scene.cb_props
+        if self.active_cam['remaining'] <= 0:
+            if not self.cams and not self.allocated:
+                # all pilots of the light are rendered
+                self.allocate()
+            if len(self.cams) > 0:
+                # switching to next cam
+                self.activate_cam(self.cams.pop())
+            else:
+                # switching to next light, the accumulated samples of the finished light are reduced
+                self.engine.flush()
+                self.light_count += 1
+                if self.light_count < self.light_amount:
+                    self.cams = self.place_cams(self.light_count)
+                    self.light_offset = self.offset_end
+                    self.plan_pilots(self.cams)
+                    self.assign_cams(self.cams)
+                    self.activate_cam(self.cams.pop())
+                    self.counter = 0
+                    self.save_checkpoint()
+                elif not self.next_pass():
+                    self.finish = True
+
+        # checkpoints are not written within a colored batch whose sample offsets are not consecutive yet
+        if self.checkpoint is not None and not self.coordinates and time.monotonic() - self.last_checkpoint > \
+                cb_props.checkpoint_interval:
+            self.save_checkpoint()
+
+        # starting next sample
+        if self.active_cam['remaining'] > 0 and not self.finish:
+            cam_setup(self.active_cam)
+            self.render = False
+            self.scheduler.begin_render()
+            with stage('render'):
+                bpy.ops.render.render(scene=bake_scene().name)
+            self.scheduler.end_render()
+
+    # starts another pass over all lights if the stop mode asks for more samples, returns False when the bake is done
+    #
+    # A pass of n samples on top of a map of N samples reweights the map with N / (N + n) and the new samples with
+    # n / (N + n), like extending a finished out-of-core bake. The time budget is split into passes by the measured
+    # time per sample, the noise is estimated from how far the samples of a pass deviate from the map before it.
+    def next_pass(self):
+        if self.stop_mode == 'SAMPLES':
+            return False
+        cb_props = bpy.context.scene.cb_props
+        self.engine.flush()
+        now = time.perf_counter()
+        values = np.array(self.target.values(), dtype=np.float32)
+        if self.previous_values is not None:
+            self.noise = relative_noise(self.previous_values, values, self.samples_total - self.run_samples,
+                                        self.run_samples)
+        self.passes.append({'samples': self.run_samples, 'samples_total': self.samples_total,
+                            'time': now - self.pass_start, 'noise': self.noise})
+        remaining_time = cb_props.time_budget - (now - self.scheduler.start_time)
+        seconds_per_sample = (now - self.pass_start) / self.run_samples
+        samples = min(self.samples_total, int(remaining_time / seconds_per_sample))
+        if samples < 1 or self.stop_mode == 'NOISE' and self.noise is not None and self.noise <= cb_props.noise_target:
+            return False
+
+        self.previous_values = values
+        self.run_samples = samples
+        self.samples_total += samples
+        self.sample_weight = samples / self.samples_total
+        self.target.scale((self.samples_total - samples) / self.samples_total)
+        self.preview.invalidate()
+        self.pass_start = now
+        self.light_count = 0
+        self.counter = 0
+        self.light_offset = self.offset_end
+        self.cams = self.place_cams(0)
+        self.plan_pilots(self.cams)
+        self.assign_cams(self.cams)
+        self.activate_cam(self.cams.pop())
+        self.save_checkpoint()
+        return True
+
+    # waits for the accumulation to finish and writes the caustic map into the image
+    def complete(self):
+        start_time = time.perf_counter()
+        cb_props = bpy.context.scene.cb_props
+        self.update_info()
+        # waiting for the data processing to finish which is handled by the accumulation workers
+        self.engine.close()
+        self.save_checkpoint(finished=True)
+        self.timings['accumulation'] = time.perf_counter() - start_time
+
+        # expanding the data to RGBA with alpha 1 and transferring it into a blender image object
+        with stage('upload'):
+            self.image.pixels.foreach_set(self.target.rgba(out=self.preview.buffer).reshape(-1))
+
+        # denoising the image
+        if cb_props.denoise:
+            bpy.context.scene.cb_props.progress_indicator_text = 'Denoising'
+            self.image.pixels = denoising(self.image.name)
+
+        # saving the image externally
+        self.image.file_format = 'OPEN_EXR'
+        if cb_props.save_image_externally:
+            if cb_props.useImage:
+                image_name = cb_props.targetImage.name
+            else:
+                image_name = cb_props.imageName
+            self.image.filepath_raw = cb_props.filePath + image_name + '.exr'
+            self.image.save()
+        self.timings['output'] = time.perf_counter() - start_time - self.timings['accumulation']
+
+        print("caustic map complete in", datetime.now() - self.startTime)
+        if self.stop_mode != 'SAMPLES':
+            print(f"{self.samples_total} samples in {len(self.passes)} passes, estimated noise "
+                  + (f"{self.noise:.2%}" if self.noise is not None else "n/a"))
+        self.scheduler.report()
+        if is_debug():
+            self.readback.report(self.samples_done)
+            print("lens correction cache:", lens_cache_info())
+            for cam in self.pixel_stats():
+                print(f"light {cam['light']} camera {cam['sample_offset']}: {cam['valid_fraction']:.1%} valid pixels, "
+                      f"{cam['cropped_valid_fraction']:.1%} within the {cam['border']:.1%} rendered border")
+
+    # writes the accumulated values of this shard with the metadata needed to merge it with the other shards
+    def write_partial(self, path):
+        save_partial(path, self.target.values(), {
+            'texture_res': self.textureRes,
+            'channels': self.target.channels,
+            'image_normalization': self.image_normalization,
+            'samples_total': self.samples_total,
+            'sample_res': sample_resolution(),
+            'shard_count': self.shard[1],
+            'shards': [self.shard[0]],
+            'cams': self.shard_cams,
+            'stats': [self.stats()]
+        })
+
+    # stops the accumulation and restores the original state of the blender scene
+    # every step runs even if an earlier one failed, the first error is raised once all of them are done
+    def cleanup(self):
+        error = None
+        for step in (self.close_engine, self.restore_scene, self.remove_handlers, remove_collections,
+                     remove_bake_scene, self.write_trace):
+            try:
+                step()
+            except Exception as e:
+                if error is None:
+                    error = e
+        if error is not None:
+            raise error
+
+    def close_engine(self):
+        if self.engine is not None:
+            try:
+                if self.checkpoint is not None and not self.engine.closed:
+                    # keeping the submitted samples so the bake can be resumed from this point
+                    self.engine.close()
+                    self.save_checkpoint()
+            finally:
+                self.engine.close(discard=True)
+
+    # resetting the blender scene to its original state
+    def restore_scene(self):
+        try:
+            reset_compositor()
+        finally:
+            if self.original_scene_settings is not None:
+                self.timings['material_reset'] = reset_scene(bpy.context.scene, self.original_scene_settings)
+                if is_debug():
+                    print(f"restored {len(self.original_scene_settings['shader_settings']['materials'])} materials "
+                          f"in {self.timings['material_reset']:.3f}s")
+
+    def remove_handlers(self):
+        if self.post in bpy.app.handlers.render_post:
+            bpy.app.handlers.render_post.remove(self.post)
+        if self.cancelled in bpy.app.handlers.render_cancel:
+            bpy.app.handlers.render_cancel.remove(self.cancelled)
+
+    def write_trace(self):
+        if self.profiler is not None:
+            stop_profiling()
+            self.trace = checkpoint_path(bpy.data.filepath, bpy.app.tempdir, self.image.name) + '_trace.json'
+            self.profiler.write_trace(self.trace)
+            self.profiler.report()
+            print("bake trace written to", self.trace)
+
+    # timing information of the bake in seconds
+    def stats(self):
+        render = self.scheduler.stats()
+        return {
+            'samples': self.samples_done,
+            'renders': render['renders'],
+            'lights': self.light_amount,
+            'texture_res': self.textureRes,
+            'colored': self.colored,
+            'setup_time': self.timings.get('setup', 0.0),
+            'placement_time': self.timings.get('placement', 0.0),
+            'node_group_time': self.timings.get('node_groups', 0.0),
+            'node_groups': {name: dict(stats) for name, stats in import_stats.items()},
+            'materials': len(self.original_scene_settings['shader_settings']['materials'])
+            if self.original_scene_settings is not None else 0,
+            'material_setup_time': self.timings.get('material_setup', 0.0),
+            'material_reset_time': self.timings.get('material_reset', 0.0),
+            'render_time': render['render_time'],
+            'accumulation_time': self.timings.get('accumulation', 0.0),
+            'output_time': self.timings.get('output', 0.0),
+            'total_time': render['wall_time'],
+            'duty_cycle': render['duty_cycle'],
+            'cam_pixels': self.pixel_stats(),
+            'allocation': self.allocation,
+            'stop_mode': self.stop_mode,
+            'samples_total': self.samples_total,
+            'noise': self.noise,
+            'passes': self.passes,
+            'preview_updates': self.preview.updates,
+            'preview_tiles': self.preview.tiles,
+            'stages': self.profiler.summary() if self.profiler is not None else None,
+            'trace': self.trace
+        }
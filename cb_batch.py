@@ -0,0 +1,193 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+import bpy
+
+from .cb_bake import BakeSession
+from .cb_functions import denoising
+from .cb_partial import merge_partials
+from .cb_targets import CausticTarget
+
+
+# copies the given settings onto the CB_Props of the scene, values are converted to the type of the property
+def apply_settings(cb_props, settings):
+    for name, value in settings.items():
+        if name not in cb_props.bl_rna.properties or cb_props.bl_rna.properties[name].is_readonly:
+            raise ValueError(f'unknown caustic bake setting: {name}')
+        prop = cb_props.bl_rna.properties[name]
+        if prop.type == 'POINTER':
+            value = bpy.data.images[value] if isinstance(value, str) else value
+        elif prop.type == 'BOOLEAN' and isinstance(value, str):
+            value = value.lower() in ('1', 'true', 'yes', 'on')
+        elif prop.type == 'INT':
+            value = int(value)
+        elif prop.type == 'FLOAT':
+            value = float(value)
+        setattr(cb_props, name, value)
+
+
+# bakes the caustic map of the active scene synchronously without a window, timers or modal events
+#
+# settings are CB_Props values applied before the bake, the finished map is written to output as OpenEXR if given.
+# With shard set to (index, count) only every count-th camera is baked and the result is written to partial so it can
+# be merged with the other shards. Returns the timing information of BakeSession.stats together with the written file.
+def bake(settings=None, output=None, shard=(0, 1), partial=None):
+    cb_props = bpy.context.scene.cb_props
+    if settings:
+        apply_settings(cb_props, settings)
+    if cb_props.cb_run_baking is not None:
+        raise RuntimeError('a caustic bake is already running')
+    session = BakeSession(shard=shard, preview=False)
+    cb_props.cb_run_baking = session
+    try:
+        session.start()
+        while not session.finish and not session.stop:
+            session.render_next()
+        if session.stop:
+            raise RuntimeError('caustic bake was cancelled')
+        session.complete()
+        if partial is not None:
+            session.write_partial(bpy.path.abspath(partial))
+        if output is not None:
+            save_image(session.image, output)
+    finally:
+        session.cleanup()
+        cb_props.cb_run_baking = None
+    stats = session.stats()
+    stats['image'] = session.image.name
+    stats['output'] = output
+    stats['partial'] = partial
+    return stats
+
+
+def save_image(image, output):
+    image.filepath_raw = bpy.path.abspath(output)
+    image.file_format = 'OPEN_EXR'
+    image.save()
+
+
+# sums the partials of all shards of a bake into the image given by the scene settings
+def merge(partials, output=None):
+    values, metadata = merge_partials([bpy.path.abspath(path) for path in partials])
+    if not metadata['complete']:
+        raise ValueError(f"the partials only contain the shards {metadata['shards']} of {metadata['shard_count']}")
+    cb_props = bpy.context.scene.cb_props
+    texture_res = metadata['texture_res']
+    if cb_props.useImage:
+        image = cb_props.targetImage
+    else:
+        image = bpy.data.images.get(cb_props.imageName)
+        if image is None:
+            image = bpy.data.images.new(name=cb_props.imageName, width=texture_res, height=texture_res, alpha=False,
+                                        float_buffer=True)
+    if tuple(image.size) != (texture_res, texture_res):
+        image.scale(texture_res, texture_res)
+    target = CausticTarget(texture_res * texture_res, metadata['channels'], dtype=values.dtype, data=values)
+    image.pixels.foreach_set(target.rgba().reshape(-1))
+    if cb_props.denoise:
+        image.pixels = denoising(image.name)
+    if output is not None:
+        save_image(image, output)
+    return {
+        'image': image.name,
+        'output': output,
+        'shards': metadata['shards'],
+        'samples': sum(stats['samples'] for stats in metadata['stats']),
+        'shard_stats': metadata['stats']
+    }
+
+
+# bakes the saved .blend file in the given number of background blender processes and merges their partials
+#
+# Every process bakes one shard of the cameras with the settings of the current scene plus the given settings, the
+# processes load the .blend file from disk so unsaved changes are not part of the bake.
+def distribute(processes, settings=None, output=None):
+    if not bpy.data.filepath:
+        raise RuntimeError('the .blend file has to be saved for a distributed bake')
+    start_time = time.perf_counter()
+    directory = tempfile.mkdtemp(prefix='cb_bake_')
+    try:
+        settings_path = os.path.join(directory, 'settings.json')
+        with open(settings_path, 'w') as file:
+            # the shards only write partials, denoising and saving is done once after merging
+            json.dump(dict(settings or {}, save_image_externally=False, denoise=False), file)
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'batch_bake.py')
+        partials = [os.path.join(directory, f'partial_{i}.npz') for i in range(processes)]
+        workers = [subprocess.Popen([bpy.app.binary_path, '-b', bpy.data.filepath, '-S', bpy.context.scene.name,
+                                     '--python', script, '--', '--settings', settings_path,
+                                     '--shard', f'{i}/{processes}', '--partial', partials[i]],
+                                    stdout=subprocess.DEVNULL) for i in range(processes)]
+        failed = [i for i, worker in enumerate(workers) if worker.wait() != 0]
+        if failed:
+            raise RuntimeError(f'the bake processes of the shards {failed} failed')
+        if settings:
+            apply_settings(bpy.context.scene.cb_props, settings)
+        result = merge(partials, output)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    result['processes'] = processes
+    result['total_time'] = time.perf_counter() - start_time
+    return result
+
+
+def parse_arguments(argv):
+    # the scene is selected with the -S option of blender itself
+    parser = argparse.ArgumentParser(prog='blender -b scene.blend [-S scene] --python batch_bake.py --',
+                                     description='bakes the caustic map of a .blend file in background mode')
+    parser.add_argument('--output', help='file the baked map is written to as OpenEXR')
+    parser.add_argument('--settings', help='JSON file with CB_Props values')
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUE',
+                        help='sets a CB_Props value, can be given multiple times')
+    parser.add_argument('--report', help='file the timing information is written to as JSON')
+    parser.add_argument('--shard', help='bakes only the shard INDEX/COUNT of the cameras, requires --partial')
+    parser.add_argument('--partial', help='file the accumulated values of the shard are written to')
+    parser.add_argument('--processes', type=int, default=0,
+                        help='bakes in the given number of background blender processes and merges the result')
+    parser.add_argument('--merge', nargs='+', metavar='PARTIAL', help='merges the partials of all shards of a bake')
+    return parser.parse_args(argv)
+
+
+# command line entry point, prints the timing information as a single JSON line and returns the exit code
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    arguments = parse_arguments(argv)
+    settings = {}
+    if arguments.settings:
+        with open(arguments.settings) as file:
+            settings.update(json.load(file))
+    for setting in arguments.set:
+        name, _, value = setting.partition('=')
+        try:
+            settings[name] = json.loads(value)
+        except ValueError:
+            settings[name] = value
+
+    result = {'status': 'finished'}
+    try:
+        if arguments.merge:
+            if settings:
+                apply_settings(bpy.context.scene.cb_props, settings)
+            result.update(merge(arguments.merge, arguments.output))
+        elif arguments.processes > 0:
+            result.update(distribute(arguments.processes, settings, arguments.output))
+        else:
+            shard = (0, 1)
+            if arguments.shard:
+                index, _, count = arguments.shard.partition('/')
+                shard = (int(index), int(count))
+            result.update(bake(settings=settings, output=arguments.output, shard=shard, partial=arguments.partial))
+    except Exception as e:
+        traceback.print_exc()
+        result = {'status': 'failed', 'error': repr(e)}
+    if arguments.report:
+        with open(arguments.report, 'w') as file:
+            json.dump(result, file, indent=2)
+    print(json.dumps(result))
+    return 0 if result['status'] == 'finished' else 1
@@ -0,0 +1,74 @@
+# checkpoint files of out-of-core bakes, the memory mapped accumulation target and a json file with the progress
+#
+# This module only depends on numpy, the paths of the blender file are handed in by the bake.
+import json
+import os
+import numpy as np
+
+from .cb_targets import CausticTarget
+
+CHECKPOINT_VERSION = 2
+
+
+# base path of the accumulation and checkpoint files, placed next to the .blend file or in the temporary directory
+def checkpoint_path(blend_path, temp_directory, image_name):
+    if blend_path:
+        directory = os.path.dirname(blend_path)
+        blend_name = os.path.splitext(os.path.basename(blend_path))[0]
+    else:
+        directory = temp_directory
+        blend_name = 'untitled'
+    return os.path.join(directory, f'{blend_name}_{image_name}_cb')
+
+
+# opens the memory mapped accumulation target, existing data is kept unless fresh is set
+def open_target(path, texels, channels, compensated, fresh, dtype=np.float32):
+    shape = (texels, channels)
+    mode = 'w+' if fresh or not os.path.exists(path + '.cbacc') else 'r+'
+    data = np.memmap(path + '.cbacc', dtype=dtype, mode=mode, shape=shape)
+    compensation = None
+    if compensated:
+        mode = 'w+' if fresh or not os.path.exists(path + '.cbcomp') else 'r+'
+        compensation = np.memmap(path + '.cbcomp', dtype=dtype, mode=mode, shape=shape)
+    return CausticTarget(texels, channels, compensated, dtype, data=data, compensation=compensation)
+
+
+# returns the stored checkpoint if it was written for a target with the given layout
+def load_state(path, texture_res, channels, compensated, dtype=np.float32):
+    try:
+        with open(path + '.json') as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if state.get('version') != CHECKPOINT_VERSION or state.get('texture_res') != texture_res or state.get(
+            'channels') != channels or state.get('compensated') != compensated or state.get(
+            'dtype', 'float32') != np.dtype(dtype).name:
+        return None
+    if not os.path.exists(path + '.cbacc') or (compensated and not os.path.exists(path + '.cbcomp')):
+        return None
+    return state
+
+
+# flushes the accumulation files and atomically replaces the checkpoint state
+def save_state(path, target, state):
+    target.flush()
+    state['version'] = CHECKPOINT_VERSION
+    with open(path + '.json.tmp', 'w') as file:
+        json.dump(state, file, indent=2)
+    os.replace(path + '.json.tmp', path + '.json')
+
+
+# progress of the cameras of the current light, the remaining samples are stored by the index of the camera in the
+# placement of the light so cameras that were already rendered keep their slot
+def camera_progress(cams, finished):
+    return {'cam_count': len(cams), 'remaining': [] if finished else [cam['remaining'] for cam in cams]}
+
+
+# True if the checkpoint can be continued with the cameras placed for its light
+def matches_placement(state, cams):
+    return state['finished'] or state['cam_count'] == len(cams) == len(state['remaining'])
+
+
+def restore_progress(state, cams):
+    for cam, remaining in zip(cams, state['remaining']):
+        cam['remaining'] = remaining
@@ -12,6 +12,8 @@ CAUSTIC_HIDDEN_ATTRIBUTE = 'CB_Hidden'
 CAUSTIC_MATERIAL_OUTPUT = 'CB_Caustic_Material_Output'
 DELETE_NODE_ON_RESET = 'CB_Delete_on_reset'
 DEBUG_MODE = 'CB_Debug'
+PLACEMENT_CACHE_ATTRIBUTE = 'CB_Placement_Cache'
+NODEGROUP_FINGERPRINT_ATTRIBUTE = 'CB_Node_Group_Fingerprint'
 
 NODEGROUP_ROUGHNESS_NAME = 'CB_Roughness_To_Normal'
 NODEGROUP_CONTROLLER_NAME = 'CB_Caustic_Controller_Node'
@@ -27,4 +29,18 @@ NODEGROUP_CAM_PLACEMENT_PANO = 'CB_Auto_Cam_Placement_Pano'
 NODEGROUP_CLIPPING_PLANES_PANO = 'CB_Clipping_Planes_Pano'
 
 PANO_NORMALIZATION = .01148094092 * .639726
-ORTHO_NORMALIZATION = 0.319884
\ No newline at end of file
+ORTHO_NORMALIZATION = 0.319884
+
+ACCUMULATION_QUEUE_SIZE = 2
+ACCUMULATION_MAX_WORKERS = 8
+LENS_CACHE_BYTES = 32 * 1024 * 1024
+TILE_SIZE = 64
+# int32 scratch a worker may keep for the splat kernel, one entry per texel of an 8192² texture
+SPLAT_SCRATCH_BYTES = 256 * 1024 * 1024
+UI_REFRESH_INTERVAL = 0.25
+SCHEDULER_TIMER_INTERVAL = 0.01
+COLOR_BATCH_SIZE = 4
+PLACEMENT_ANGLE_STEPS = 180
+PLACEMENT_CHUNK_SIZE = 65536
+CROP_BORDER_MARGIN = 0.02
+ADAPTIVE_PILOT_SAMPLES = 2
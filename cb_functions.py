@@ -1,17 +1,25 @@
 import math
+import time
 import bpy
 import mathutils
-from mathutils.bvhtree import BVHTree
 from .cb_const import CAUSTIC_RECEIVER_ATTRIBUTE, CAUSTIC_CONTRIBUTOR_ATTRIBUTE, \
     CAUSTIC_HIDDEN_ATTRIBUTE, CAUSTIC_MATERIAL_OUTPUT, CAUSTIC_SENSOR_NAME, \
     CAUSTIC_SHADOW_ATTRIBUTE, CAUSTIC_SOURCE_ATTRIBUTE, DEBUG_MODE, DELETE_NODE_ON_RESET, \
     NODEGROUP_MAIN_NAME, UV_SCALE_MAP_NAME, NODEGROUP_CAM_PLACEMENT_ORTHO, NODEGROUP_CLIPPING_PLANES_ORTHO, \
-    NODEGROUP_CAM_PLACEMENT_PANO, NODEGROUP_CLIPPING_PLANES_PANO, PANO_NORMALIZATION, ORTHO_NORMALIZATION
+    NODEGROUP_CAM_PLACEMENT_PANO, NODEGROUP_CLIPPING_PLANES_PANO, PANO_NORMALIZATION, ORTHO_NORMALIZATION, \
+    CROP_BORDER_MARGIN, BASE_SENSOR_RESOLUTION, COMPOSITOR_SCENE_NAME
+from .cb_placement import cached_placement, cluster, footprint_border, numpy_placement, object_vertices, \
+    ortho_bounds, ortho_overlap, pano_bounds, pano_overlap
+from .cb_profiler import stage
+from .cb_textureRenderingFunctions import fix_pano_lens, lens_cache
 import numpy as np
 
 
-# Preparing the Scene to Render Reciever Coordinates
+# Preparing the Scene to Render Reciever Coordinates, isolated bakes prepare the bake scene created for them instead
 def scene_setup(scene):
+    bake = bake_scene()
+    if bake != scene:
+        return isolated_scene_setup(scene, bake)
     scene_settings = {
         'render_settings': set_render_settings(scene),
         'shader_settings': shader_setup()
@@ -21,17 +29,122 @@ def scene_setup(scene):
     return scene_settings
 
 
-# Resetting the Scene to its original state
+# Resetting the Scene to its original state, returns the seconds spent restoring the materials
 def reset_scene(scene, scene_settings):
+    if scene_settings.get('isolated', False):
+        return isolated_scene_reset(scene_settings)
     reset_render_settings(scene, scene_settings['render_settings'])
     reset_visibility(scene)
-    shader_reset(scene_settings['shader_settings'])
+    material_time = shader_reset(scene_settings['shader_settings'])
     uv_scale_map_reset(scene)
+    return material_time
+
+
+# scene the sensors are rendered in, the temporary scene of an isolated bake or the scene of the user
+def bake_scene():
+    return bpy.data.scenes.get(COMPOSITOR_SCENE_NAME, bpy.context.scene)
+
+
+# creating the empty scene of an isolated bake, a scene left behind by an interrupted bake is removed first
+def create_bake_scene(source):
+    remove_bake_scene()
+    if source.cb_props.isolated_scene:
+        bpy.data.scenes.new(COMPOSITOR_SCENE_NAME)
+
+
+# deleting the bake scene together with the object and material copies it contains
+def remove_bake_scene():
+    scene = bpy.data.scenes.get(COMPOSITOR_SCENE_NAME)
+    if scene is None:
+        return
+    copies = [obj for obj in scene.objects if obj.get(DELETE_NODE_ON_RESET, False)]
+    materials = {slot.material for obj in copies for slot in obj.material_slots
+                 if slot.material is not None and slot.material.get(DELETE_NODE_ON_RESET, False)}
+    bpy.data.scenes.remove(scene)
+    for obj in copies:
+        bpy.data.objects.remove(obj)
+    for material in materials:
+        bpy.data.materials.remove(material)
+
+
+# Preparing the bake scene with copies of the rendered objects, the scene of the user and its data stay untouched
+#
+# The copies share their object data with the originals, their material slots are switched to object links pointing
+# to copies of the materials that contain the caustic shader. Materials that are not assigned through slots, like
+# materials set by geometry nodes or used by instanced objects, are patched in place and restored by reset_scene.
+# Setup and reset therefore scale with the tagged objects and their materials instead of all data of the file.
+def isolated_scene_setup(source, scene):
+    start_time = time.perf_counter()
+    with stage('material_setup'):
+        copy_scene_settings(source, scene)
+        copies = {}
+        copied = []
+        for obj in tagged_objects(source):
+            copy = obj.copy()
+            copy[DELETE_NODE_ON_RESET] = True
+            scene.collection.objects.link(copy)
+            copied.append(copy)
+            for slot in copy.material_slots:
+                material = slot.material
+                if material is None:
+                    continue
+                if material not in copies:
+                    copies[material] = material.copy()
+                    copies[material][DELETE_NODE_ON_RESET] = True
+                    material_setup(copies[material])
+                slot.link = 'OBJECT'
+                slot.material = copies[material]
+        uv_scale_map_setup(scene)
+
+        view_layer = scene.view_layers[0]
+        view_layer.update()
+        patched = [material for material in scoped_materials(copied, view_layer.depsgraph)
+                   if not material.get(DELETE_NODE_ON_RESET, False)]
+        for material in patched:
+            material_setup(material)
+    scene.world = None
+    set_render_settings(scene)
+    color_sampling(0)
+
+    materials = list(copies.values()) + patched
+    setup_time = time.perf_counter() - start_time
+    if is_debug():
+        print(f"isolated bake scene with {len(scene.objects)} objects, {len(copies)} material copies and "
+              f"{len(patched)} patched materials in {setup_time:.3f}s")
+    return {
+        'isolated': True,
+        'shader_settings': {'materials': materials, 'patched': patched, 'setup_time': setup_time}
+    }
+
+
+# restoring the materials patched in place and deleting the bake scene, returns the seconds it took
+def isolated_scene_reset(scene_settings):
+    start_time = time.perf_counter()
+    with stage('material_reset'):
+        for material in scene_settings['shader_settings']['patched']:
+            material_reset(material)
+        remove_bake_scene()
+    return time.perf_counter() - start_time
+
+
+# copying the settings of the scene of the user that change the sensor renders onto the bake scene
+def copy_scene_settings(source, scene):
+    scene.frame_current = source.frame_current
+    for settings, target in ((source.cycles, scene.cycles), (source.display_settings, scene.display_settings),
+                             (source.view_settings, scene.view_settings)):
+        for prop in settings.bl_rna.properties:
+            if prop.is_readonly or prop.type in ('POINTER', 'COLLECTION'):
+                continue
+            try:
+                setattr(target, prop.identifier, getattr(settings, prop.identifier))
+            except (AttributeError, TypeError, ValueError):
+                # settings that are not available in this configuration keep their defaults
+                pass
 
 
 # Setting render settings to the correct values for the baking Process and returning original settings
 def set_render_settings(scene):
-    cb_props = scene.cb_props
+    cb_props = bpy.context.scene.cb_props
     render_settings = {
         'engine': scene.render.engine,
         'resolution_x': scene.render.resolution_x,
@@ -40,6 +153,10 @@ def set_render_settings(scene):
         'pixel_aspect_y': scene.render.pixel_aspect_y,
         'resolution_percentage': scene.render.resolution_percentage,
         'use_persistent_data': scene.render.use_persistent_data,
+        'use_border': scene.render.use_border,
+        'use_crop_to_border': scene.render.use_crop_to_border,
+        'border': (scene.render.border_min_x, scene.render.border_max_x, scene.render.border_min_y,
+                   scene.render.border_max_y),
         'camera': scene.camera,
         'device': scene.cycles.device,
         'samples': scene.cycles.samples,
@@ -50,8 +167,8 @@ def set_render_settings(scene):
     }
 
     scene.render.engine = 'CYCLES'
-    scene.render.resolution_x = int(1024 * cb_props.sampleResMultiplier)
-    scene.render.resolution_y = int(1024 * cb_props.sampleResMultiplier)
+    scene.render.resolution_x = sample_resolution()
+    scene.render.resolution_y = sample_resolution()
     scene.render.resolution_percentage = 100
     scene.render.use_persistent_data = True
     if cb_props.use_gpu:
@@ -77,6 +194,10 @@ def reset_render_settings(scene, render_settings):
     scene.render.pixel_aspect_y = render_settings['pixel_aspect_y']
     scene.render.resolution_percentage = render_settings['resolution_percentage']
     scene.render.use_persistent_data = render_settings['use_persistent_data']
+    scene.render.use_border = render_settings['use_border']
+    scene.render.use_crop_to_border = render_settings['use_crop_to_border']
+    scene.render.border_min_x, scene.render.border_max_x, scene.render.border_min_y, scene.render.border_max_y = \
+        render_settings['border']
 
     scene.cycles.device = render_settings['device']
     scene.cycles.samples = render_settings['samples']
@@ -106,56 +227,131 @@ def reset_visibility(scene):
             del obj[CAUSTIC_HIDDEN_ATTRIBUTE]
 
 
-# Editing all materials to fulfill their function in the baking process
+# rendered objects of the scene that are tagged for the bake, looked up through the collections of the tags
+def tagged_objects(scene):
+    objects = {}
+    for tag in (CAUSTIC_RECEIVER_ATTRIBUTE, CAUSTIC_CONTRIBUTOR_ATTRIBUTE, CAUSTIC_SHADOW_ATTRIBUTE):
+        collection = bpy.data.collections.get(tag)
+        if collection is None:
+            continue
+        for obj in collection.all_objects:
+            if not obj.hide_render and scene.objects.get(obj.name) == obj:
+                objects[obj.name] = obj
+    return list(objects.values())
+
+
+# materials the bake renders, the materials of the given objects including materials assigned by modifiers and the
+# materials of objects they instance
+#
+# Objects that are not given keep their materials untouched, so do materials without users and library materials
+# that are not used by them. The dependency graph is only searched for instances if one of the objects is an
+# instancer, it has no lookup of the instances of a single object.
+def scoped_materials(objects, deps_graph=None):
+    materials = set()
+
+    def add_materials(obj):
+        for slot in obj.material_slots:
+            if slot.material is not None:
+                materials.add(slot.material.original)
+        # materials of the geometry that are not replaced by object linked slots
+        slots = obj.material_slots
+        for i, material in enumerate(getattr(obj.data, 'materials', ())):
+            if material is not None and (i >= len(slots) or slots[i].link != 'OBJECT'):
+                materials.add(material.original)
+
+    if deps_graph is None:
+        deps_graph = bpy.context.evaluated_depsgraph_get()
+    instancers = set()
+    for obj in objects:
+        add_materials(obj)
+        if obj.instance_type == 'COLLECTION' and obj.instance_collection is not None:
+            for instanced in obj.instance_collection.all_objects:
+                add_materials(instanced)
+        # the evaluated object includes materials set by geometry nodes
+        evaluated = obj.evaluated_get(deps_graph)
+        add_materials(evaluated)
+        if evaluated.is_instancer:
+            instancers.add(obj)
+
+    # objects instanced by particles or geometry nodes only exist as instances of the dependency graph
+    if instancers:
+        for instance in deps_graph.object_instances:
+            if instance.is_instance and instance.parent is not None and instance.parent.original in instancers:
+                add_materials(instance.object)
+    return [material for material in bpy.data.materials if material in materials]
+
+
+# Editing the materials used by the bake to fulfill their function in the baking process
 def shader_setup():
-    for material in bpy.data.materials:
-        material.use_nodes = True
-        nodes = material.node_tree.nodes
-        caustic_node = None
-        for node in nodes:
-            # Finding the custom shader node which holds relevant Material information
-            if node.bl_idname == 'ShaderNodeGroup' and node.node_tree.name == NODEGROUP_MAIN_NAME:
-                caustic_node = node
-
-        # Creating the custom shader node in materials without it to produce default behavior
-        if caustic_node is None:
-            caustic_node = nodes.new('ShaderNodeGroup')
-            caustic_node[DELETE_NODE_ON_RESET] = True
-            caustic_node.node_tree = bpy.data.node_groups[NODEGROUP_MAIN_NAME]
-
-        # Creating new output node to keep original connections intact
-        output = nodes.new('ShaderNodeOutputMaterial')
-        output.name = CAUSTIC_MATERIAL_OUTPUT
-        output[DELETE_NODE_ON_RESET] = True
-        output.is_active_output = True
-
-        # linking custom shader node to the new active output
-        links = material.node_tree.links
-        links.new(output.inputs[0], caustic_node.outputs[0])
-        links.new(output.inputs[1], caustic_node.outputs[1])
+    start_time = time.perf_counter()
+    with stage('material_setup'):
+        materials = scoped_materials(tagged_objects(bpy.context.scene))
+        for material in materials:
+            material_setup(material)
 
     # Deactivating world shader
     shader_settings = {
         'world_use_nodes': bpy.context.scene.world.use_nodes,
-        'world_color': bpy.context.scene.world.color
+        'world_color': bpy.context.scene.world.color,
+        'materials': materials,
+        'setup_time': time.perf_counter() - start_time
     }
     bpy.context.scene.world.use_nodes = False
     bpy.context.scene.world.color = (0, 0, 0)
     color_sampling(0)
+    if is_debug():
+        print(f"prepared {len(materials)} of {len(bpy.data.materials)} materials in "
+              f"{shader_settings['setup_time']:.3f}s")
     return shader_settings
 
 
-# restoring all materials to their original state
+# adding the caustic shader and a new active output to a material
+def material_setup(material):
+    material.use_nodes = True
+    nodes = material.node_tree.nodes
+    caustic_node = None
+    for node in nodes:
+        # Finding the custom shader node which holds relevant Material information
+        if node.bl_idname == 'ShaderNodeGroup' and node.node_tree.name == NODEGROUP_MAIN_NAME:
+            caustic_node = node
+
+    # Creating the custom shader node in materials without it to produce default behavior
+    if caustic_node is None:
+        caustic_node = nodes.new('ShaderNodeGroup')
+        caustic_node[DELETE_NODE_ON_RESET] = True
+        caustic_node.node_tree = bpy.data.node_groups[NODEGROUP_MAIN_NAME]
+
+    # Creating new output node to keep original connections intact
+    output = nodes.new('ShaderNodeOutputMaterial')
+    output.name = CAUSTIC_MATERIAL_OUTPUT
+    output[DELETE_NODE_ON_RESET] = True
+    output.is_active_output = True
+
+    # linking custom shader node to the new active output
+    links = material.node_tree.links
+    links.new(output.inputs[0], caustic_node.outputs[0])
+    links.new(output.inputs[1], caustic_node.outputs[1])
+
+
+# removing the nodes added by material_setup
+def material_reset(material):
+    nodes = material.node_tree.nodes
+    for node in nodes:
+        if node.get(DELETE_NODE_ON_RESET, False):
+            nodes.remove(node)
+
+
+# restoring the materials edited by shader_setup to their original state, returns the seconds it took
 def shader_reset(shader_settings):
-    for material in bpy.data.materials:
-        nodes = material.node_tree.nodes
-        for node in nodes:
-            if node.get(DELETE_NODE_ON_RESET, False):
-                nodes.remove(node)
+    start_time = time.perf_counter()
+    with stage('material_reset'):
+        for material in shader_settings['materials']:
+            material_reset(material)
 
     # restoring world shader
     bpy.context.scene.world.color = shader_settings['world_color']
     bpy.context.scene.world.use_nodes = shader_settings['world_use_nodes']
+    return time.perf_counter() - start_time
 
 
 # adding a modifier to all reciever objects that calculates the ratio between uv surface area and actual area
@@ -185,11 +381,11 @@ def uv_scale_map_reset(scene):
 
 # modifying the compositor node tree to extract the rendered image
 def setup_compositor():
-    scene = bpy.context.scene
+    scene = bake_scene()
 
     # switch on nodes
     scene.use_nodes = True
-    tree = bpy.context.scene.node_tree
+    tree = scene.node_tree
     links = tree.links
 
     # remove any existing viewer nodes and muting all compositor nodes
@@ -215,7 +411,10 @@ def setup_compositor():
 
 # deleting added compositor nodes and unmuting compositor nodes
 def reset_compositor():
-    nodes = bpy.context.scene.node_tree.nodes
+    # a new bake scene has no compositor nodes until the denoiser or the preview sets them up
+    if bake_scene().node_tree is None:
+        return
+    nodes = bake_scene().node_tree.nodes
     for node in nodes:
         if node.get(DELETE_NODE_ON_RESET, False):
             nodes.remove(node)
@@ -226,7 +425,8 @@ def reset_compositor():
 # creating a compositor node tree that uses the build in AI denoiser to denoise the image
 def denoising(image_name):
     # building node tree
-    tree = bpy.context.scene.node_tree
+    scene = bake_scene()
+    tree = scene.node_tree
     reset_compositor()
     image = tree.nodes.new(type="CompositorNodeImage")
     image.image = bpy.data.images[image_name]
@@ -242,7 +442,7 @@ def denoising(image_name):
     links.new(denoise.outputs[0], viewer.inputs[0])
 
     # triggering compositing
-    bpy.ops.render.render()
+    bpy.ops.render.render(scene=scene.name)
     pixels = bpy.data.images['Viewer Node'].pixels
     pixels = np.array(pixels[:])
 
@@ -278,8 +478,9 @@ def build_collection(name):
 def remove_collection(name):
     for obj in bpy.data.collections[name].all_objects:
         if obj is not None:
-            if obj.type == 'CAMERA':
-                bpy.context.scene.collection.objects.unlink(obj)
+            # the cameras are already unlinked if the bake scene was removed
+            if obj.type == 'CAMERA' and obj.name in bake_scene().collection.objects:
+                bake_scene().collection.objects.unlink(obj)
             unset_collection(name, obj)
     bpy.data.collections.remove(bpy.data.collections[name])
 
@@ -293,8 +494,64 @@ def remove_collections():
     remove_collection(CAUSTIC_SENSOR_NAME)
 
 
-# automatically creates cameras at the positions of given light source
-def auto_cam_placement(light):
+# automatically creates cameras at the positions of given light source, samples defaults to the baking settings
+def auto_cam_placement(light, samples=None):
+    if samples is None:
+        samples = bpy.context.scene.cb_props.samples
+    cb_props = bpy.context.scene.cb_props
+    place = numpy_placement if cb_props.placement_backend == 'NUMPY' else node_placement
+    if cb_props.placement_cache:
+        placement = cached_placement(light, cb_props.placement_backend, place)
+    else:
+        placement = place(light)
+    cams = create_cams(light, placement)
+
+    # limiting the rendered region of every camera to the part of the frame showing contributors
+    if cb_props.crop_to_footprint:
+        deps_graph = bpy.context.evaluated_depsgraph_get()
+        vertices = [object_vertices(obj, deps_graph)
+                    for obj in bpy.data.collections[CAUSTIC_CONTRIBUTOR_ATTRIBUTE].all_objects]
+        for cam in cams:
+            fov = fisheye_fov(cam) if cam.data.type == 'PANO' else None
+            border = footprint_border(cam, vertices, fov, CROP_BORDER_MARGIN)
+            if border is not None:
+                cam['border'] = border
+
+    # adjusting the number of samples for each camera to ensure a similar amount of samples per area for all cameras
+    lowest_density = cams[0]['sample_density']
+    for cam in cams:
+        cam['remaining'] = 0
+        if cam['sample_density'] < lowest_density:
+            lowest_density = cam['sample_density']
+    for cam in cams:
+        remaining = lowest_density * (samples - 1)
+        while remaining > -.5 * lowest_density:
+            cam['remaining'] += 1
+            remaining -= cam['sample_density']
+        # a folded render contains the pixels of several samples
+        cam['remaining'] = -(-cam['remaining'] // cb_props.sample_folding ** 2)
+    # adjusting the normalization to reflect the number of samples
+    for cam in cams:
+        cam['cam_normalization'] = cam['cam_normalization'] / cam['remaining']
+        if bpy.context.scene.cb_props.bake_energy or len(
+                bpy.data.collections[CAUSTIC_SOURCE_ATTRIBUTE].all_objects) > 1:
+            cam['cam_normalization'] *= light.data.energy
+
+    # precomputing the lens correction of the first cameras to be rendered, cameras are popped from the end of the list,
+    # only as many as the cache keeps at this sample resolution
+    if light.data.type != 'SUN':
+        sample_res = sample_resolution()
+        for cam in cams[::-1][:lens_cache.capacity(sample_res)]:
+            fix_pano_lens(sample_res, fisheye_fov(cam))
+    return cams
+
+
+# evaluates the camera placement of the given light with the geometry node groups
+#
+# Returns the placement of the light: the clipping distances and for every camera its position and size for sun
+# lights or its rotation and field of view for point lights, full_sphere is set if the point light needs two fisheye
+# cameras covering the whole sphere.
+def node_placement(light):
     # find clipping Planes using Geo-Nodes
     empty_mesh = bpy.data.meshes.new('emptyMesh')
     obj = bpy.data.objects.new(name='Clip_planes', object_data=empty_mesh)
@@ -356,86 +613,100 @@ def auto_cam_placement(light):
                 modifier[input.identifier] = collection
 
     # Combining overlapping cam placements to avoid double sampling of overlapping area
-    if light.data.type == 'SUN':
-        while True:
-            deps_graph = bpy.context.evaluated_depsgraph_get()
-            overlap = False
-            bvh_trees = []
-            for cam_pos in cam_positions:
-                bvh_trees.append(BVHTree.FromObject(cam_pos, deps_graph))
-            for i, tree in enumerate(bvh_trees):
-                if len(collections[i].all_objects) > 0:
-                    for j, other_tree in enumerate(bvh_trees):
-                        if not tree == other_tree and tree.overlap(other_tree) and len(collections[j].all_objects) > 0:
-                            for obj in collections[j].all_objects:
-                                unset_collection(f'CB_Rendering_{j}', obj)
-                                set_collection(f'CB_Rendering_{i}', obj)
-                            overlap = True
-            if not overlap:
+    full_sphere = False
+    while True:
+        deps_graph = bpy.context.evaluated_depsgraph_get()
+        # groups that were merged into others and contributors without geometry have no camera
+        live = [i for i, collection in enumerate(collections) if len(collection.all_objects) > 0 and
+                len(cam_positions[i].evaluated_get(deps_graph).data.vertices) > 0]
+        bounds = []
+        for i in live:
+            attributes = cam_positions[i].evaluated_get(deps_graph).data.attributes
+            if light.data.type == 'SUN':
+                bounds.append(ortho_bounds({
+                    'cam_pos': tuple(attributes['cam_pos'].data[0].vector),
+                    'cam_width': attributes['cam_width'].data[0].value,
+                    'cam_height': attributes['cam_height'].data[0].value
+                }))
+            elif attributes['full_sphere'].data[0].value:
+                full_sphere = True
                 break
-    else:
-        full_sphere = False
-        while True:
-            deps_graph = bpy.context.evaluated_depsgraph_get()
-            overlap = False
-            cam_attributes = []
-            for cam_pos in cam_positions:
+            else:
+                bounds.append(pano_bounds({
+                    'rotation': tuple(attributes['rotation'].data[0].vector),
+                    'fov': attributes['fov'].data[0].value
+                }))
+        if full_sphere:
+            break
+        components = cluster(bounds, ortho_overlap if light.data.type == 'SUN' else pano_overlap)
+        if len(components) == len(live):
+            break
+        for component in components:
+            for j in component[1:]:
+                for obj in collections[live[j]].all_objects:
+                    unset_collection(f'CB_Rendering_{live[j]}', obj)
+                    set_collection(f'CB_Rendering_{live[component[0]]}', obj)
+
+    # reading the camera parameters from the evaluated geometry
+    if light.data.type == 'SUN':
+        placement = {'sensor_height': sensor_height, 'sensor_clip': sensor_clip, 'cams': []}
+        for cam_pos in cam_positions:
+            if len(cam_pos.evaluated_get(deps_graph).data.vertices) > 0:
                 attributes = cam_pos.evaluated_get(deps_graph).data.attributes
-                if attributes['full_sphere'].data[0].value:
-                    full_sphere = True
-                    break
-                cam_attributes.append({
-                    'rot': attributes['rotation'].data[0].vector,
-                    'fov': max(attributes['fov'].data[0].value, math.radians(10.0))
+                placement['cams'].append({
+                    'cam_pos': tuple(attributes['cam_pos'].data[0].vector),
+                    'cam_width': attributes['cam_width'].data[0].value,
+                    'cam_height': attributes['cam_height'].data[0].value
                 })
-            for i, cam in enumerate(cam_attributes):
+    else:
+        placement = {'clip_start': clip_start, 'clip_end': clip_end, 'full_sphere': full_sphere, 'cams': []}
+        if not full_sphere:
+            for i, cam_pos in enumerate(cam_positions):
                 if len(collections[i].all_objects) > 0:
-                    for j, other_cam in enumerate(cam_attributes):
-                        if j != i and len(collections[j].all_objects) > 0:
-                            a = mathutils.Vector((0, 0, 1))
-                            b = mathutils.Vector((0, 0, 1))
-                            a.rotate(mathutils.Euler((cam['rot'][0], cam['rot'][1], cam['rot'][2]), 'XYZ'))
-                            b.rotate(
-                                mathutils.Euler((other_cam['rot'][0], other_cam['rot'][1], other_cam['rot'][2]), 'XYZ'))
-                            if a.angle(b) < (cam['fov'] + other_cam['fov']) / 2:
-                                for obj in collections[j].all_objects:
-                                    unset_collection(f'CB_Rendering_{j}', obj)
-                                    set_collection(f'CB_Rendering_{i}', obj)
-                                overlap = True
-            if not overlap:
-                break
+                    attributes = cam_pos.evaluated_get(deps_graph).data.attributes
+                    placement['cams'].append({
+                        'rotation': tuple(attributes['rotation'].data[0].vector),
+                        'fov': attributes['fov'].data[0].value
+                    })
+
+    # deleting created objects and collections that are no longer needed
+    for i, cam_pos in enumerate(cam_positions):
+        bpy.data.objects.remove(cam_pos)
+    for index, collection in enumerate(collections):
+        for obj in collection.all_objects:
+            unset_collection(f'CB_Rendering_{index}', obj)
+        bpy.data.collections.remove(collection)
+    return placement
+
 
-    # creating cameras from calculated positions and storing relevant information in camera object
+# creating cameras from the calculated placement and storing relevant information in camera object
+def create_cams(light, placement):
     cams = []
     if light.data.type == 'SUN':
-        for cam_pos in cam_positions:
-            if len(cam_pos.evaluated_get(deps_graph).data.vertices) > 0:
-                attributes = cam_pos.evaluated_get(deps_graph).data.attributes
-                pos = attributes['cam_pos'].data
-                width = attributes['cam_width'].data
-                height = attributes['cam_height'].data
-                width = width[0].value
-                height = height[0].value
-                vec = mathutils.Vector((pos[0].vector[0], pos[0].vector[1], sensor_height))
-                euler = mathutils.Euler((0.0, 0.0, pos[0].vector[2]))
-                vec.rotate(light.rotation_euler)
-                euler.rotate(light.rotation_euler)
-                sensor = bpy.data.cameras.new('CB_Cam')
-                sensor.type = 'ORTHO'
-                sensor.ortho_scale = max(width, height)
-                sensor.clip_end = sensor_clip
-                sensor_object = bpy.data.objects.new('CB_Cam', sensor)
-                sensor_object['cam_normalization'] = width * height * ORTHO_NORMALIZATION
-                sensor_object['sample_density'] = 1 / (width * height)
-                sensor_object['width'] = width / min(width, height)
-                sensor_object['height'] = height / min(width, height)
-                sensor_object.location = vec
-                sensor_object.rotation_euler = euler
-                set_collection(CAUSTIC_SENSOR_NAME, sensor_object)
-                bpy.context.scene.collection.objects.link(sensor_object)
-                cams.append(sensor_object)
+        for cam in placement['cams']:
+            pos = cam['cam_pos']
+            width = cam['cam_width']
+            height = cam['cam_height']
+            vec = mathutils.Vector((pos[0], pos[1], placement['sensor_height']))
+            euler = mathutils.Euler((0.0, 0.0, pos[2]))
+            vec.rotate(light.rotation_euler)
+            euler.rotate(light.rotation_euler)
+            sensor = bpy.data.cameras.new('CB_Cam')
+            sensor.type = 'ORTHO'
+            sensor.ortho_scale = max(width, height)
+            sensor.clip_end = placement['sensor_clip']
+            sensor_object = bpy.data.objects.new('CB_Cam', sensor)
+            sensor_object['cam_normalization'] = width * height * ORTHO_NORMALIZATION
+            sensor_object['sample_density'] = 1 / (width * height)
+            sensor_object['width'] = width / min(width, height)
+            sensor_object['height'] = height / min(width, height)
+            sensor_object.location = vec
+            sensor_object.rotation_euler = euler
+            set_collection(CAUSTIC_SENSOR_NAME, sensor_object)
+            bake_scene().collection.objects.link(sensor_object)
+            cams.append(sensor_object)
     else:
-        if full_sphere:
+        if placement['full_sphere']:
             for i in range(2):
                 sensor = bpy.data.cameras.new('CB_Cam')
                 sensor.type = 'PANO'
@@ -445,78 +716,71 @@ def auto_cam_placement(light):
                 else:
                     sensor.panorama_type = 'FISHEYE_EQUIDISTANT'
                     sensor.fisheye_fov = math.pi
-                sensor.clip_end = clip_end
-                sensor.clip_start = clip_start
+                sensor.clip_end = placement['clip_end']
+                sensor.clip_start = placement['clip_start']
                 sensor_object = bpy.data.objects.new('CB_Cam', sensor)
                 sensor_object['cam_normalization'] = 2 * math.pi * (1 - math.cos(math.pi)) * PANO_NORMALIZATION
                 sensor_object['sample_density'] = 1 / (2 * math.pi * (1 - math.cos(math.pi)))
                 sensor_object.location = light.location
                 sensor_object.rotation_euler = mathutils.Euler((i * math.pi, 0, 0), 'XYZ')
                 set_collection(CAUSTIC_SENSOR_NAME, sensor_object)
-                bpy.context.scene.collection.objects.link(sensor_object)
+                bake_scene().collection.objects.link(sensor_object)
                 cams.append(sensor_object)
         else:
-            for i, cam_pos in enumerate(cam_positions):
-                if len(collections[i].all_objects) > 0:
-                    attributes = cam_pos.evaluated_get(deps_graph).data.attributes
-                    sensor = bpy.data.cameras.new('CB_Cam')
-                    sensor.type = 'PANO'
-                    if (4, 0, 0) > bpy.app.version:
-                        sensor.cycles.panorama_type = 'FISHEYE_EQUIDISTANT'
-                        sensor.cycles.fisheye_fov = max(attributes['fov'].data[0].value, math.radians(10.0))
-                    else:
-                        sensor.panorama_type = 'FISHEYE_EQUIDISTANT'
-                        sensor.fisheye_fov = max(attributes['fov'].data[0].value, math.radians(10.0))
-                    sensor.clip_end = clip_end
-                    sensor.clip_start = clip_start
-                    sensor_object = bpy.data.objects.new('CB_Cam', sensor)
-                    sensor_object['cam_normalization'] = 2 * math.pi * (
-                            1 - math.cos(max(attributes['fov'].data[0].value, math.radians(10.0)))) * PANO_NORMALIZATION
-                    sensor_object['sample_density'] = 1 / (
-                            2 * math.pi * (1 - math.cos(max(attributes['fov'].data[0].value, math.radians(10.0)))))
-                    sensor_object.location = light.location
-                    rotation = attributes['rotation'].data[0].vector
-                    sensor_object.rotation_euler = mathutils.Euler((rotation[0], rotation[1], rotation[2]), 'XYZ')
-                    set_collection(CAUSTIC_SENSOR_NAME, sensor_object)
-                    bpy.context.scene.collection.objects.link(sensor_object)
-                    cams.append(sensor_object)
+            for cam in placement['cams']:
+                fov = max(cam['fov'], math.radians(10.0))
+                sensor = bpy.data.cameras.new('CB_Cam')
+                sensor.type = 'PANO'
+                if (4, 0, 0) > bpy.app.version:
+                    sensor.cycles.panorama_type = 'FISHEYE_EQUIDISTANT'
+                    sensor.cycles.fisheye_fov = fov
+                else:
+                    sensor.panorama_type = 'FISHEYE_EQUIDISTANT'
+                    sensor.fisheye_fov = fov
+                sensor.clip_end = placement['clip_end']
+                sensor.clip_start = placement['clip_start']
+                sensor_object = bpy.data.objects.new('CB_Cam', sensor)
+                sensor_object['cam_normalization'] = 2 * math.pi * (1 - math.cos(fov)) * PANO_NORMALIZATION
+                sensor_object['sample_density'] = 1 / (2 * math.pi * (1 - math.cos(fov)))
+                sensor_object.location = light.location
+                rotation = cam['rotation']
+                sensor_object.rotation_euler = mathutils.Euler((rotation[0], rotation[1], rotation[2]), 'XYZ')
+                set_collection(CAUSTIC_SENSOR_NAME, sensor_object)
+                bake_scene().collection.objects.link(sensor_object)
+                cams.append(sensor_object)
+    return cams
 
-    # deleting created objects and collections that are no longer needed
-    for i, cam_pos in enumerate(cam_positions):
-        bpy.data.objects.remove(cam_pos)
-    for index, collection in enumerate(collections):
-        for obj in collection.all_objects:
-            unset_collection(f'CB_Rendering_{index}', obj)
-        bpy.data.collections.remove(collection)
 
-    # adjusting the number of samples for each camera to ensure a similar amount of samples per area for all cameras
-    lowest_density = cams[0]['sample_density']
-    for cam in cams:
-        cam['remaining'] = 0
-        if cam['sample_density'] < lowest_density:
-            lowest_density = cam['sample_density']
-    for cam in cams:
-        remaining = lowest_density * (bpy.context.scene.cb_props.samples - 1)
-        while remaining > -.5 * lowest_density:
-            cam['remaining'] += 1
-            remaining -= cam['sample_density']
-    # adjusting the normalization to reflect the number of samples
-    for cam in cams:
-        cam['cam_normalization'] = cam['cam_normalization'] / cam['remaining']
-        if bpy.context.scene.cb_props.bake_energy or len(
-                bpy.data.collections[CAUSTIC_SOURCE_ATTRIBUTE].all_objects) > 1:
-            cam['cam_normalization'] *= light.data.energy
-    return cams
+# returns the field of view of a fisheye sensor camera
+def fisheye_fov(cam):
+    if (4, 0, 0) > bpy.app.version:
+        return cam.data.cycles.fisheye_fov
+    return cam.data.fisheye_fov
+
+
+# resolution of the sensor renders, sample folding renders fold² samples at once with fold times the resolution
+#
+# Every pixel is one path, so a render with fold² times the pixels carries as many paths as fold² renders. The image
+# normalization is derived from this resolution, so the folded samples are weighted correctly.
+def sample_resolution():
+    cb_props = bpy.context.scene.cb_props
+    return int(BASE_SENSOR_RESOLUTION * cb_props.sampleResMultiplier) * cb_props.sample_folding
 
 
 # setting active cam and adjusting render settings to cam parameters
 def cam_setup(cam):
-    props = bpy.context.scene.cb_props
-    scene = bpy.context.scene
+    scene = bake_scene()
 
     scene.camera = cam
-    scene.render.resolution_x = int(1024 * props.sampleResMultiplier)
-    scene.render.resolution_y = int(1024 * props.sampleResMultiplier)
+    scene.render.resolution_x = sample_resolution()
+    scene.render.resolution_y = sample_resolution()
+    # the border is not cropped so the render keeps the full frame layout expected by the accumulation
+    border = cam.get('border')
+    scene.render.use_border = border is not None
+    scene.render.use_crop_to_border = False
+    if border is not None:
+        scene.render.border_min_x, scene.render.border_max_x, scene.render.border_min_y, \
+            scene.render.border_max_y = border
     if cam.data.type == 'ORTHO':
         scene.render.pixel_aspect_x = cam['width']
         scene.render.pixel_aspect_y = cam['height']
@@ -1,5 +1,9 @@
 import bpy
 import json
+import time
+
+from .cb_const import NODEGROUP_FINGERPRINT_ATTRIBUTE
+from .cb_nodeGroupLoader_v4 import import_stats, node_group_fingerprint
 
 
 def export_node_group_to_json(name):
@@ -97,93 +101,108 @@ def export_node_group_to_json(name):
     return (json.dumps(nodeGroup))
 
 
-def import_node_group_from_json(name, data):
-    if data.replace(" ", "") != str(export_node_group_to_json(name)).replace(" ", ""):
-        # Save all nodeGroups with this Nodetree for reassignment
-        nodeGroups = []
-        for nodeGroup in bpy.data.node_groups:
-            for node in nodeGroup.nodes:
+# same fingerprint check as the import of blender 4, see cb_nodeGroupLoader_v4
+def import_node_group_from_json(name, data, force=False):
+    start_time = time.perf_counter()
+    fingerprint = node_group_fingerprint(data)
+    node_tree = bpy.data.node_groups.get(name)
+    if not force and node_tree is not None and node_tree.get(NODEGROUP_FINGERPRINT_ATTRIBUTE) == fingerprint:
+        import_stats[name] = {'result': 'stamped', 'time': time.perf_counter() - start_time}
+        return False
+    rebuild = force or data.replace(" ", "") != str(export_node_group_to_json(name)).replace(" ", "")
+    if rebuild:
+        build_node_group(name, data)
+    bpy.data.node_groups[name][NODEGROUP_FINGERPRINT_ATTRIBUTE] = fingerprint
+    import_stats[name] = {'result': 'rebuilt' if rebuild else 'matched', 'time': time.perf_counter() - start_time}
+    return rebuild
+
+
+def build_node_group(name, data):
+    # Save all nodeGroups with this Nodetree for reassignment
+    nodeGroups = []
+    for nodeGroup in bpy.data.node_groups:
+        for node in nodeGroup.nodes:
+            if str(node.__class__.__name__) == 'ShaderNodeGroup':
+                if node.node_tree.name == name:
+                    nodeGroups.append(node)
+    for material in bpy.data.materials:
+        if material.node_tree is not None:
+            for node in material.node_tree.nodes:
                 if str(node.__class__.__name__) == 'ShaderNodeGroup':
                     if node.node_tree.name == name:
                         nodeGroups.append(node)
-        for material in bpy.data.materials:
-            if material.node_tree is not None:
-                for node in material.node_tree.nodes:
-                    if str(node.__class__.__name__) == 'ShaderNodeGroup':
-                        if node.node_tree.name == name:
-                            nodeGroups.append(node)
-
-        data = json.loads(data)
-        if bpy.data.node_groups.__contains__(name):
-            bpy.data.node_groups.remove(bpy.data.node_groups[name])
-        match data['type']:
-            case 'SHADER':
-                nodeTree = bpy.data.node_groups.new(name, 'ShaderNodeTree')
-            case 'GEOMETRY':
-                nodeTree = bpy.data.node_groups.new(name, 'GeometryNodeTree')
-
-        outputs = nodeTree.outputs
-        outputs.clear()
-        for o in data['outputs']:
-            outputs.new(o['type'], o['name'])
-
-        inputs = nodeTree.inputs
-        inputs.clear()
-        for i in data['inputs']:
-            input = inputs.new(i['type'], i['name'])
-            input.hide_value = i['hide_value']
-            match i['type']:
-                case 'NodeSocketFloat':
-                    input.default_value = i['default_value']
-                    input.min_value = i['min_value']
-                    input.max_value = i['max_value']
-                    if data['type'] == 'GEOMETRY':
-                        input.default_attribute_name = i['default_attribute_name']
-                case 'NodeSocketVector':
-                    input.default_value = i['default_value']
-                    input.min_value = i['min_value']
-                    input.max_value = i['max_value']
-                    if data['type'] == 'GEOMETRY':
-                        input.default_attribute_name = i['default_attribute_name']
-                case 'NodeSocketColor':
-                    input.default_value = i['default_value']
-                    if data['type'] == 'GEOMETRY':
-                        input.default_attribute_name = i['default_attribute_name']
-
-        nodes = nodeTree.nodes
-        nodes.clear()
-        for n in data['nodes']:
-            node = nodes.new(n['type'])
-            node.name = n['name']
-            node.location = n['location']
-
-            for atr, value in n['attributes'].items():
-                if atr is not None:
-                    if atr == 'node_tree':
-                        node.node_tree = bpy.data.node_groups[value]
-                    else:
-                        setattr(node, atr, value)
-
-            if not n['type'] == 'NodeReroute':
-                for id, default in n['inputs'].items():
-                    if default is not None:
-                        for input in node.inputs:
-                            if input.identifier == id:
-                                input.default_value = default
-
-        for l in data['links']:
-            input = None
-            output = None
-            for i in nodes[l['to_node']].inputs:
-                if i.identifier == l['to_socket']:
-                    input = i
-            for o in nodes[l['from_node']].outputs:
-                if o.identifier == l['from_socket']:
-                    output = o
-            if input is not None and output is not None:
-                nodeTree.links.new(input, output)
-            else:
-                print('error at ', l['from_node'], ' ', l['from_socket'], '->', l['to_node'], ' ', l['to_socket'])
-
-        for node in nodeGroups:
-            node.node_tree = bpy.data.node_groups[name]
+
+    data = json.loads(data)
+    if bpy.data.node_groups.__contains__(name):
+        bpy.data.node_groups.remove(bpy.data.node_groups[name])
+    match data['type']:
+        case 'SHADER':
+            nodeTree = bpy.data.node_groups.new(name, 'ShaderNodeTree')
+        case 'GEOMETRY':
+            nodeTree = bpy.data.node_groups.new(name, 'GeometryNodeTree')
+
+    outputs = nodeTree.outputs
+    outputs.clear()
+    for o in data['outputs']:
+        outputs.new(o['type'], o['name'])
+
+    inputs = nodeTree.inputs
+    inputs.clear()
+    for i in data['inputs']:
+        input = inputs.new(i['type'], i['name'])
+        input.hide_value = i['hide_value']
+        match i['type']:
+            case 'NodeSocketFloat':
+                input.default_value = i['default_value']
+                input.min_value = i['min_value']
+                input.max_value = i['max_value']
+                if data['type'] == 'GEOMETRY':
+                    input.default_attribute_name = i['default_attribute_name']
+            case 'NodeSocketVector':
+                input.default_value = i['default_value']
+                input.min_value = i['min_value']
+                input.max_value = i['max_value']
+                if data['type'] == 'GEOMETRY':
+                    input.default_attribute_name = i['default_attribute_name']
+            case 'NodeSocketColor':
+                input.default_value = i['default_value']
+                if data['type'] == 'GEOMETRY':
+                    input.default_attribute_name = i['default_attribute_name']
+
+    nodes = nodeTree.nodes
+    nodes.clear()
+    for n in data['nodes']:
+        node = nodes.new(n['type'])
+        node.name = n['name']
+        node.location = n['location']
+
+        for atr, value in n['attributes'].items():
+            if atr is not None:
+                if atr == 'node_tree':
+                    node.node_tree = bpy.data.node_groups[value]
+                else:
+                    setattr(node, atr, value)
+
+        if not n['type'] == 'NodeReroute':
+            for id, default in n['inputs'].items():
+                if default is not None:
+                    for input in node.inputs:
+                        if input.identifier == id:
+                            input.default_value = default
+
+    for l in data['links']:
+        input = None
+        output = None
+        for i in nodes[l['to_node']].inputs:
+            if i.identifier == l['to_socket']:
+                input = i
+        for o in nodes[l['from_node']].outputs:
+            if o.identifier == l['from_socket']:
+                output = o
+        if input is not None and output is not None:
+            nodeTree.links.new(input, output)
+        else:
+            print('error at ', l['from_node'], ' ', l['from_socket'], '->', l['to_node'], ' ', l['to_socket'])
+
+    for node in nodeGroups:
+        node.node_tree = bpy.data.node_groups[name]
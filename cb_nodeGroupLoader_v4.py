@@ -1,5 +1,14 @@
 import bpy
+import functools
+import hashlib
 import json
+import time
+
+from .cb_const import NODEGROUP_FINGERPRINT_ATTRIBUTE
+
+# outcome and seconds of the last import of every node group, the outcome is 'stamped' when the fingerprint matched,
+# 'matched' when the exported tree matched and 'rebuilt'
+import_stats = {}
 
 
 # converts a blender Nodegroup to a json string
@@ -95,89 +104,114 @@ def export_node_group_to_json(name):
     return (json.dumps(nodeGroup))
 
 
+# hash of the json of a node group, computed once per embedded string
+@functools.lru_cache(maxsize=None)
+def node_group_fingerprint(data):
+    return hashlib.blake2b(data.replace(" ", "").encode(), digest_size=16).hexdigest()
+
+
 # uses a json created with the export function to rebuild the blender nodegroup
-def import_node_group_from_json(name, data):
-    if data.replace(" ", "") != str(export_node_group_to_json(name)).replace(" ", ""):
-        # Save all nodeGroups with this Nodetree for reassignment with the new tree
-        node_groups = []
-        for nodeGroup in bpy.data.node_groups:
-            for node in nodeGroup.nodes:
+#
+# Imported groups are stamped with the fingerprint of their json, a stamped group is used as it is without comparing
+# its exported tree. Groups without a matching stamp are compared once and rebuilt if they differ, force always
+# rebuilds the group, for example after it was edited by hand. Returns True if the group was rebuilt.
+def import_node_group_from_json(name, data, force=False):
+    start_time = time.perf_counter()
+    fingerprint = node_group_fingerprint(data)
+    node_tree = bpy.data.node_groups.get(name)
+    if not force and node_tree is not None and node_tree.get(NODEGROUP_FINGERPRINT_ATTRIBUTE) == fingerprint:
+        import_stats[name] = {'result': 'stamped', 'time': time.perf_counter() - start_time}
+        return False
+    rebuild = force or data.replace(" ", "") != str(export_node_group_to_json(name)).replace(" ", "")
+    if rebuild:
+        build_node_group(name, data)
+    bpy.data.node_groups[name][NODEGROUP_FINGERPRINT_ATTRIBUTE] = fingerprint
+    import_stats[name] = {'result': 'rebuilt' if rebuild else 'matched', 'time': time.perf_counter() - start_time}
+    return rebuild
+
+
+# creates the node group from its json, nodes using an existing group with the name are switched to the new one
+def build_node_group(name, data):
+    # Save all nodeGroups with this Nodetree for reassignment with the new tree
+    node_groups = []
+    for nodeGroup in bpy.data.node_groups:
+        for node in nodeGroup.nodes:
+            if str(node.__class__.__name__) == 'ShaderNodeGroup':
+                if node.node_tree is not None and node.node_tree.name == name:
+                    node_groups.append(node)
+    for material in bpy.data.materials:
+        if material.node_tree is not None:
+            for node in material.node_tree.nodes:
                 if str(node.__class__.__name__) == 'ShaderNodeGroup':
                     if node.node_tree is not None and node.node_tree.name == name:
                         node_groups.append(node)
-        for material in bpy.data.materials:
-            if material.node_tree is not None:
-                for node in material.node_tree.nodes:
-                    if str(node.__class__.__name__) == 'ShaderNodeGroup':
-                        if node.node_tree is not None and node.node_tree.name == name:
-                            node_groups.append(node)
-
-        data = json.loads(data)
-        # creating new node tree and deleting existing with same name
-        if bpy.data.node_groups.__contains__(name):
-            bpy.data.node_groups.remove(bpy.data.node_groups[name])
-        match data['type']:
-            case 'SHADER':
-                node_tree = bpy.data.node_groups.new(name, 'ShaderNodeTree')
-            case 'GEOMETRY':
-                node_tree = bpy.data.node_groups.new(name, 'GeometryNodeTree')
-
-        # creating in and outputs of the tree
-        for i in data['interface']:
-            item = node_tree.interface.new_socket(i['name'], in_out=i['in_out'], socket_type=i['socket_type'])
-            item.default_attribute_name = i['default_attribute_name']
-            item.hide_value = i['hide_value']
-            match i['socket_type']:
-                case 'NodeSocketFloat':
-                    item.default_value = i['default_value']
-                    item.min_value = i['min_value']
-                    item.max_value = i['max_value']
-                    item.subtype = i['subtype']
-                case 'NodeSocketVector':
-                    item.default_value = i['default_value']
-                    item.min_value = i['min_value']
-                    item.max_value = i['max_value']
-                    item.subtype = i['subtype']
-                case 'NodeSocketColor':
-                    item.default_value = i['default_value']
-
-        # creating the nodes of the tree
-        nodes = node_tree.nodes
-        nodes.clear()
-        for n in data['nodes']:
-            node = nodes.new(n['type'])
-            node.name = n['name']
-            node.location = n['location']
-
-            for atr, value in n['attributes'].items():
-                if atr is not None:
-                    if atr == 'node_tree':
-                        node.node_tree = bpy.data.node_groups[value]
-                    else:
-                        setattr(node, atr, value)
-
-            if not n['type'] == 'NodeReroute':
-                for id, default in n['inputs'].items():
-                    if default is not None:
-                        for input in node.inputs:
-                            if input.identifier == id:
-                                input.default_value = default
-
-        # connecting the nodes of the tree
-        for l in data['links']:
-            input = None
-            output = None
-            for i in nodes[l['to_node']].inputs:
-                if i.identifier == l['to_socket']:
-                    input = i
-            for o in nodes[l['from_node']].outputs:
-                if o.identifier == l['from_socket']:
-                    output = o
-            if input is not None and output is not None:
-                node_tree.links.new(input, output)
-            else:
-                print('error at ', l['from_node'], ' ', l['from_socket'], '->', l['to_node'], ' ', l['to_socket'])
-
-        # assigning the node tree to all nodes that had the old version of it
-        for node in node_groups:
-            node.node_tree = bpy.data.node_groups[name]
\ No newline at end of file
+
+    data = json.loads(data)
+    # creating new node tree and deleting existing with same name
+    if bpy.data.node_groups.__contains__(name):
+        bpy.data.node_groups.remove(bpy.data.node_groups[name])
+    match data['type']:
+        case 'SHADER':
+            node_tree = bpy.data.node_groups.new(name, 'ShaderNodeTree')
+        case 'GEOMETRY':
+            node_tree = bpy.data.node_groups.new(name, 'GeometryNodeTree')
+
+    # creating in and outputs of the tree
+    for i in data['interface']:
+        item = node_tree.interface.new_socket(i['name'], in_out=i['in_out'], socket_type=i['socket_type'])
+        item.default_attribute_name = i['default_attribute_name']
+        item.hide_value = i['hide_value']
+        match i['socket_type']:
+            case 'NodeSocketFloat':
+                item.default_value = i['default_value']
+                item.min_value = i['min_value']
+                item.max_value = i['max_value']
+                item.subtype = i['subtype']
+            case 'NodeSocketVector':
+                item.default_value = i['default_value']
+                item.min_value = i['min_value']
+                item.max_value = i['max_value']
+                item.subtype = i['subtype']
+            case 'NodeSocketColor':
+                item.default_value = i['default_value']
+
+    # creating the nodes of the tree
+    nodes = node_tree.nodes
+    nodes.clear()
+    for n in data['nodes']:
+        node = nodes.new(n['type'])
+        node.name = n['name']
+        node.location = n['location']
+
+        for atr, value in n['attributes'].items():
+            if atr is not None:
+                if atr == 'node_tree':
+                    node.node_tree = bpy.data.node_groups[value]
+                else:
+                    setattr(node, atr, value)
+
+        if not n['type'] == 'NodeReroute':
+            for id, default in n['inputs'].items():
+                if default is not None:
+                    for input in node.inputs:
+                        if input.identifier == id:
+                            input.default_value = default
+
+    # connecting the nodes of the tree
+    for l in data['links']:
+        input = None
+        output = None
+        for i in nodes[l['to_node']].inputs:
+            if i.identifier == l['to_socket']:
+                input = i
+        for o in nodes[l['from_node']].outputs:
+            if o.identifier == l['from_socket']:
+                output = o
+        if input is not None and output is not None:
+            node_tree.links.new(input, output)
+        else:
+            print('error at ', l['from_node'], ' ', l['from_socket'], '->', l['to_node'], ' ', l['to_socket'])
+
+    # assigning the node tree to all nodes that had the old version of it
+    for node in node_groups:
+        node.node_tree = bpy.data.node_groups[name]
\ No newline at end of file
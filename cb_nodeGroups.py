@@ -4,17 +4,17 @@ from .cb_const import NODEGROUP_CAUSTIC_NAME, NODEGROUP_CONTROLLER_NAME, NODEGRO
 from .cb_nodeGroupLoader import import_node_group_from_json
 
 
-def setup_shader_node_group():
-    import_node_group_from_json(NODEGROUP_MAIN_NAME, causticsGroup)
+def setup_shader_node_group(force=False):
+    import_node_group_from_json(NODEGROUP_MAIN_NAME, causticsGroup, force)
 
 
-def setup_geo_node_groups():
-    import_node_group_from_json(NODEGROUP_UV_NAME, uvScaleMapGroup)
-    import_node_group_from_json(NODEGROUP_REVERSE_ROTATION, reverseRotation)
-    import_node_group_from_json(NODEGROUP_CAM_PLACEMENT_ORTHO, camPlacementOrtho)
-    import_node_group_from_json(NODEGROUP_CLIPPING_PLANES_ORTHO, clippingPlanesOrtho)
-    import_node_group_from_json(NODEGROUP_CAM_PLACEMENT_PANO, camPlacementPano)
-    import_node_group_from_json(NODEGROUP_CLIPPING_PLANES_PANO, clippingPlanesPano)
+def setup_geo_node_groups(force=False):
+    import_node_group_from_json(NODEGROUP_UV_NAME, uvScaleMapGroup, force)
+    import_node_group_from_json(NODEGROUP_REVERSE_ROTATION, reverseRotation, force)
+    import_node_group_from_json(NODEGROUP_CAM_PLACEMENT_ORTHO, camPlacementOrtho, force)
+    import_node_group_from_json(NODEGROUP_CLIPPING_PLANES_ORTHO, clippingPlanesOrtho, force)
+    import_node_group_from_json(NODEGROUP_CAM_PLACEMENT_PANO, camPlacementPano, force)
+    import_node_group_from_json(NODEGROUP_CLIPPING_PLANES_PANO, clippingPlanesPano, force)
 
 
 causticsGroup = '{"type": "SHADER", "outputs": [{"name": "Surface", "type": "NodeSocketShader"}, {"name": "Volume", "type": "NodeSocketShader"}], "inputs": [{"name": "Color", "type": "NodeSocketColor", "hide_value": false, "default_value": [1.0, 1.0, 1.0, 1.0]}, {"name": "Transmission", "type": "NodeSocketFloat", "hide_value": false, "default_value": 1.0, "min_value": 0.0, "max_value": 1.0}, {"name": "IOR", "type": "NodeSocketFloat", "hide_value": false, "default_value": 1.4500000476837158, "min_value": -3.4028234663852886e+38, "max_value": 3.4028234663852886e+38}, {"name": "Normal", "type": "NodeSocketVector", "hide_value": true, "default_value": [0.0, 0.0, 0.0], "min_value": -3.4028234663852886e+38, "max_value": 3.4028234663852886e+38}, {"name": "Roughness", "type": "NodeSocketFloat", "hide_value": false, "default_value": 0.0, "min_value": -3.4028234663852886e+38, "max_value": 3.4028234663852886e+38}, {"name": "Volume", "type": "NodeSocketShader", "hide_value": false}], "nodes": [{"name": "White Noise Texture", "type": "ShaderNodeTexWhiteNoise", "location": [-1440.0, -380.0], "inputs": {"Vector": [0.0, 0.0, 0.0], "W": 0.0}, "attributes": {"noise_dimensions": "3D"}}, {"name": "Math.002", "type": "ShaderNodeMath", "location": [-1440.0, -580.0], "inputs": {"Value": 0.5, "Value_001": 2.0, "Value_002": 0.5}, "attributes": {"operation": "POWER", "use_clamp": false}}, {"name": "Vector Math.003", "type": "ShaderNodeVectorMath", "location": [-1260.0, -380.0], "inputs": {"Vector": [0.0, 0.0, 0.0], "Vector_001": [0.5, 0.5, 0.5], "Vector_002": [0.0, 0.0, 0.0], "Scale": 1.0}, "attributes": {"operation": "SUBTRACT"}}, {"name": "Math.003", "type": "ShaderNodeMath", "location": [-1260.0, -580.0], "inputs": {"Value": 0.5, "Value_001": 2.499999761581421, "Value_002": 0.5}, "attributes": {"operation": "MULTIPLY", "use_clamp": false}}, {"name": "Vector Math", "type": "ShaderNodeVectorMath", "location": [-900.0, -380.0], "inputs": {"Vector": [0.0, 0.0, 0.0], "Vector_001": [0.0, 0.0, 0.0], "Vector_002": [0.0, 0.0, 0.0], "Scale": 1.0}, "attributes": {"operation": "ADD"}}, {"name": "Vector Math.001", "type": "ShaderNodeVectorMath", "location": [-720.0, -380.0], "inputs": {"Vector": [0.0, 0.0, 0.0], "Vector_001": [0.0, 0.0, 0.0], "Vector_002": [0.0, 0.0, 0.0], "Scale": 1.0}, "attributes": {"operation": "NORMALIZE"}}, {"name": "Texture Coordinate", "type": "ShaderNodeTexCoord", "location": [-1620.0, -380.0], "inputs": {}, "attributes": {"from_instancer": false}}, {"name": "Vector Math.002", "type": "ShaderNodeVectorMath", "location": [-1080.0, -480.0], "inputs": {"Vector": [0.0, 0.0, 0.0], "Vector_001": [0.0, 0.0, 0.0], "Vector_002": [0.0, 0.0, 0.0], "Scale": 1.0}, "attributes": {"operation": "MULTIPLY"}}, {"name": "Bump", "type": "ShaderNodeBump", "location": [-1080.0, -280.0], "inputs": {"Strength": 0.0, "Distance": 1.0, "Height": 1.0, "Normal": [0.0, 0.0, 0.0]}, "attributes": {"invert": false}}, {"name": "Mix Shader.002", "type": "ShaderNodeMixShader", "location": [600.0, 900.0], "inputs": {"Fac": 0.5}, "attributes": {}}, {"name": "Mix Shader.003", "type": "ShaderNodeMixShader", "location": [400.0, 900.0], "inputs": {"Fac": 0.5}, "attributes": {}}, {"name": "Mix Shader.004", "type": "ShaderNodeMixShader", "location": [200.0, 900.0], "inputs": {"Fac": 0.5}, "attributes": {}}, {"name": "Vector Math.004", "type": "ShaderNodeVectorMath", "location": [0.0, 900.0], "inputs": {"Vector": [0.0, 0.0, 0.0], "Vector_001": [0.0, 0.0, 0.0], "Vector_002": [0.0, 0.0, 0.0], "Scale": 1.0}, "attributes": {"operation": "ADD"}}, {"name": "Emission", "type": "ShaderNodeEmission", "location": [0.0, 700.0], "inputs": {"Color": [1.0, 1.0, 1.0, 1.0], "Strength": 1.0, "Weight": 0.0}, "attributes": {}}, {"name": "Light Path", "type": "ShaderNodeLightPath", "location": [400.0, 700.0], "inputs": {}, "attributes": {}}, {"name": "Combine XYZ", "type": "ShaderNodeCombineXYZ", "location": [-200.0, 900.0], "inputs": {"X": 0.0, "Y": 0.0, "Z": 0.0}, "attributes": {}}, {"name": "Attribute.003", "type": "ShaderNodeAttribute", "location": [-620.0, 900.0], "inputs": {}, "attributes": {"attribute_type": "GEOMETRY", "attribute_name": "CB_UV_Scale"}}, {"name": "Math.004", "type": "ShaderNodeMath", "location": [-400.0, 900.0], "inputs": {"Value": 0.5, "Value_001": 0.5, "Value_002": 0.5}, "attributes": {"operation": "MULTIPLY", "use_clamp": false}}, {"name": "Math.005", "type": "ShaderNodeMath", "location": [-620.0, 680.0], "inputs": {"Value": 0.5, "Value_001": 0.5, "Value_002": 0.5}, "attributes": {"operation": "DIVIDE", "use_clamp": false}}, {"name": "Vector Math.005", "type": "ShaderNodeVectorMath", "location": [-860.0, 680.0], "inputs": {"Vector": [0.0, 0.0, 0.0], "Vector_001": [0.0, 0.0, 0.0], "Vector_002": [0.0, 0.0, 0.0], "Scale": 1.0}, "attributes": {"operation": "DOT_PRODUCT"}}, {"name": "Geometry", "type": "ShaderNodeNewGeometry", "location": [-1100.0, 900.0], "inputs": {}, "attributes": {}}, {"name": "Vector Math.006", "type": "ShaderNodeVectorMath", "location": [-860.0, 900.0], "inputs": {"Vector": [0.0, 0.0, 0.0], "Vector_001": [0.0, 0.0, 0.0], "Vector_002": [0.0, 0.0, 0.0], "Scale": 1.0}, "attributes": {"operation": "DOT_PRODUCT"}}, {"name": "Bump.001", "type": "ShaderNodeBump", "location": [-1100.0, 600.0], "inputs": {"Strength": 0.0, "Distance": 1.0, "Height": 1.0, "Normal": [0.0, 0.0, 0.0]}, "attributes": {"invert": false}}, {"name": "Attribute.002", "type": "ShaderNodeAttribute", "location": [-200.0, 1100.0], "inputs": {}, "attributes": {"attribute_type": "GEOMETRY", "attribute_name": "CB_UV_Coordinates"}}, {"name": "Attribute", "type": "ShaderNodeAttribute", "location": [200.0, 1100.0], "inputs": {}, "attributes": {"attribute_type": "OBJECT", "attribute_name": "CB_Caustic_Baking"}}, {"name": "Fresnel", "type": "ShaderNodeFresnel", "location": [-400.0, 20.0], "inputs": {"IOR": 1.4500000476837158, "Normal": [0.0, 0.0, 0.0]}, "attributes": {}}, {"name": "Math", "type": "ShaderNodeMath", "location": [0.0, 220.0], "inputs": {"Value": 0.5, "Value_001": 0.5, "Value_002": 0.5}, "attributes": {"operation": "LESS_THAN", "use_clamp": false}}, {"name": "Math.001", "type": "ShaderNodeMath", "location": [-200.0, 220.0], "inputs": {"Value": 0.5, "Value_001": 0.5, "Value_002": 0.5}, "attributes": {"operation": "MULTIPLY", "use_clamp": false}}, {"name": "Separate HSV", "type": "ShaderNodeSeparateHSV", "location": [-200.0, 20.0], "inputs": {"Color": [0.800000011920929, 0.800000011920929, 0.800000011920929, 1.0]}, "attributes": {}}, {"name": "Combine RGB", "type": "ShaderNodeCombineRGB", "location": [0.0, 20.0], "inputs": {"R": 1.0, "G": 1.0, "B": 0.0}, "attributes": {}}, {"name": "Mix", "type": "ShaderNodeMixRGB", "location": [200.0, 0.0], "inputs": {"Fac": 0.5, "Color1": [0.5, 0.5, 0.5, 1.0], "Color2": [0.5, 0.5, 0.5, 1.0]}, "attributes": {"blend_type": "MIX", "use_alpha": false, "use_clamp": false}}, {"name": "Refraction BSDF", "type": "ShaderNodeBsdfRefraction", "location": [400.0, 20.0], "inputs": {"Color": [1.0, 1.0, 1.0, 1.0], "Roughness": 0.0, "IOR": 1.4500000476837158, "Normal": [0.0, 0.0, 0.0], "Weight": 0.0}, "attributes": {"distribution": "BECKMANN"}}, {"name": "Glossy BSDF", "type": "ShaderNodeBsdfGlossy", "location": [400.0, -180.0], "inputs": {"Color": [0.800000011920929, 0.800000011920929, 0.800000011920929, 1.0], "Roughness": 0.0, "Normal": [0.0, 0.0, 0.0], "Weight": 0.0}, "attributes": {"distribution": "GGX"}}, {"name": "Mix Shader.005", "type": "ShaderNodeMixShader", "location": [600.0, 220.0], "inputs": {"Fac": 0.5}, "attributes": {}}, {"name": "Geometry.001", "type": "ShaderNodeNewGeometry", "location": [-600.0, 220.0], "inputs": {}, "attributes": {}}, {"name": "White Noise Texture.001", "type": "ShaderNodeTexWhiteNoise", "location": [-400.0, 220.0], "inputs": {"Vector": [0.0, 0.0, 0.0], "W": 0.0}, "attributes": {"noise_dimensions": "4D"}}, {"name": "Color", "type": "ShaderNodeValue", "location": [0.0, 360.0], "inputs": {}, "attributes": {}}, {"name": "Attribute.001", "type": "ShaderNodeAttribute", "location": [1200.0, 920.0], "inputs": {}, "attributes": {"attribute_type": "OBJECT", "attribute_name": "CB_Caustic_Contributor"}}, {"name": "Mix Shader", "type": "ShaderNodeMixShader", "location": [1420.0, 720.0], "inputs": {"Fac": 0.5}, "attributes": {}}, {"name": "Group Output", "type": "NodeGroupOutput", "location": [1660.0, 720.0], "inputs": {}, "attributes": {"is_active_output": true}}, {"name": "Mix Shader.001", "type": "ShaderNodeMixShader", "location": [1400.0, 360.0], "inputs": {"Fac": 0.5}, "attributes": {}}, {"name": "Test.001", "type": "NodeGroupInput", "location": [1200.0, 220.0], "inputs": {}, "attributes": {}}, {"name": "Seed", "type": "ShaderNodeValue", "location": [-600.0, 320.0], "inputs": {}, "attributes": {}}, {"name": "Group Input", "type": "NodeGroupInput", "location": [-2100.0, 0.0], "inputs": {}, "attributes": {}}], "links": [{"from_node": "Attribute.001", "to_node": "Mix Shader", "from_socket": "Fac", "to_socket": "Fac"}, {"from_node": "Mix Shader", "to_node": "Group Output", "from_socket": "Shader", "to_socket": "Output_0"}, {"from_node": "Test.001", "to_node": "Mix Shader.001", "from_socket": "Input_7", "to_socket": "Shader_001"}, {"from_node": "Mix Shader.001", "to_node": "Group Output", "from_socket": "Shader", "to_socket": "Output_1"}, {"from_node": "Texture Coordinate", "to_node": "White Noise Texture", "from_socket": "Object", "to_socket": "Vector"}, {"from_node": "Vector Math.002", "to_node": "Vector Math", "from_socket": "Vector", "to_socket": "Vector_001"}, {"from_node": "Vector Math", "to_node": "Vector Math.001", "from_socket": "Vector", "to_socket": "Vector"}, {"from_node": "Vector Math.003", "to_node": "Vector Math.002", "from_socket": "Vector", "to_socket": "Vector"}, {"from_node": "Math.003", "to_node": "Vector Math.002", "from_socket": "Value", "to_socket": "Vector_001"}, {"from_node": "Math.002", "to_node": "Math.003", "from_socket": "Value", "to_socket": "Value"}, {"from_node": "White Noise Texture", "to_node": "Vector Math.003", "from_socket": "Color", "to_socket": "Vector"}, {"from_node": "Bump", "to_node": "Vector Math", "from_socket": "Normal", "to_socket": "Vector"}, {"from_node": "Group Input", "to_node": "Math.002", "from_socket": "Input_6", "to_socket": "Value"}, {"from_node": "Group Input", "to_node": "Bump", "from_socket": "Input_5", "to_socket": "Normal"}, {"from_node": "Light Path", "to_node": "Mix Shader.002", "from_socket": "Is Camera Ray", "to_socket": "Fac"}, {"from_node": "Mix Shader.003", "to_node": "Mix Shader.002", "from_socket": "Shader", "to_socket": "Shader"}, {"from_node": "Mix Shader.004", "to_node": "Mix Shader.003", "from_socket": "Shader", "to_socket": "Shader_001"}, {"from_node": "Vector Math.004", "to_node": "Mix Shader.004", "from_socket": "Vector", "to_socket": "Shader"}, {"from_node": "Emission", "to_node": "Mix Shader.004", "from_socket": "Emission", "to_socket": "Shader_001"}, {"from_node": "Combine XYZ", "to_node": "Vector Math.004", "from_socket": "Vector", "to_socket": "Vector"}, {"from_node": "Math.004", "to_node": "Combine XYZ", "from_socket": "Value", "to_socket": "Z"}, {"from_node": "Bump.001", "to_node": "Vector Math.005", "from_socket": "Normal", "to_socket": "Vector_001"}, {"from_node": "Geometry", "to_node": "Vector Math.006", "from_socket": "Incoming", "to_socket": "Vector"}, {"from_node": "Geometry", "to_node": "Vector Math.006", "from_socket": "True Normal", "to_socket": "Vector_001"}, {"from_node": "Geometry", "to_node": "Vector Math.005", "from_socket": "Incoming", "to_socket": "Vector"}, {"from_node": "Vector Math.005", "to_node": "Math.005", "from_socket": "Value", "to_socket": "Value"}, {"from_node": "Vector Math.006", "to_node": "Math.005", "from_socket": "Value", "to_socket": "Value_001"}, {"from_node": "Attribute.003", "to_node": "Math.004", "from_socket": "Fac", "to_socket": "Value"}, {"from_node": "Math.004", "to_node": "Emission", "from_socket": "Value", "to_socket": "Strength"}, {"from_node": "Math.005", "to_node": "Math.004", "from_socket": "Value", "to_socket": "Value_001"}, {"from_node": "Attribute", "to_node": "Mix Shader.003", "from_socket": "Fac", "to_socket": "Fac"}, {"from_node": "Attribute.002", "to_node": "Vector Math.004", "from_socket": "Vector", "to_socket": "Vector_001"}, {"from_node": "Group Input", "to_node": "Bump.001", "from_socket": "Input_5", "to_socket": "Normal"}, {"from_node": "Mix Shader.002", "to_node": "Mix Shader", "from_socket": "Shader", "to_socket": "Shader"}, {"from_node": "Geometry.001", "to_node": "White Noise Texture.001", "from_socket": "Position", "to_socket": "Vector"}, {"from_node": "White Noise Texture.001", "to_node": "Math.001", "from_socket": "Value", "to_socket": "Value"}, {"from_node": "Math.001", "to_node": "Math", "from_socket": "Value", "to_socket": "Value"}, {"from_node": "Fresnel", "to_node": "Math", "from_socket": "Fac", "to_socket": "Value_001"}, {"from_node": "Separate HSV", "to_node": "Combine RGB", "from_socket": "V", "to_socket": "B"}, {"from_node": "Combine RGB", "to_node": "Mix", "from_socket": "Image", "to_socket": "Color1"}, {"from_node": "Mix", "to_node": "Refraction BSDF", "from_socket": "Color", "to_socket": "Color"}, {"from_node": "Mix", "to_node": "Glossy BSDF", "from_socket": "Color", "to_socket": "Color"}, {"from_node": "Math", "to_node": "Mix Shader.005", "from_socket": "Value", "to_socket": "Fac"}, {"from_node": "Refraction BSDF", "to_node": "Mix Shader.005", "from_socket": "BSDF", "to_socket": "Shader"}, {"from_node": "Glossy BSDF", "to_node": "Mix Shader.005", "from_socket": "BSDF", "to_socket": "Shader_001"}, {"from_node": "Group Input", "to_node": "Fresnel", "from_socket": "Input_4", "to_socket": "IOR"}, {"from_node": "Vector Math.001", "to_node": "Fresnel", "from_socket": "Vector", "to_socket": "Normal"}, {"from_node": "Group Input", "to_node": "Math.001", "from_socket": "Input_3", "to_socket": "Value_001"}, {"from_node": "Group Input", "to_node": "Separate HSV", "from_socket": "Input_2", "to_socket": "Color"}, {"from_node": "Group Input", "to_node": "Mix", "from_socket": "Input_2", "to_socket": "Color2"}, {"from_node": "Group Input", "to_node": "Refraction BSDF", "from_socket": "Input_4", "to_socket": "IOR"}, {"from_node": "Vector Math.001", "to_node": "Refraction BSDF", "from_socket": "Vector", "to_socket": "Normal"}, {"from_node": "Vector Math.001", "to_node": "Glossy BSDF", "from_socket": "Vector", "to_socket": "Normal"}, {"from_node": "Mix Shader.005", "to_node": "Mix Shader", "from_socket": "Shader", "to_socket": "Shader_001"}, {"from_node": "Seed", "to_node": "White Noise Texture.001", "from_socket": "Value", "to_socket": "W"}, {"from_node": "Color", "to_node": "Mix", "from_socket": "Value", "to_socket": "Fac"}, {"from_node": "Color", "to_node": "Mix Shader.004", "from_socket": "Value", "to_socket": "Fac"}, {"from_node": "Color", "to_node": "Mix Shader.001", "from_socket": "Value", "to_socket": "Fac"}]}'
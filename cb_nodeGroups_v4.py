@@ -6,23 +6,24 @@ from .cb_nodeGroups import setup_shader_node_group as shader_old
 from .cb_nodeGroups import setup_geo_node_groups as geo_old
 
 
-def setup_shader_node_group():
+# force rebuilds the node groups even if their fingerprint matches
+def setup_shader_node_group(force=False):
     if (4, 0, 0) > bpy.app.version:
-        shader_old()
+        shader_old(force)
     else:
-        import_node_group_from_json(NODEGROUP_MAIN_NAME, causticsGroup)
+        import_node_group_from_json(NODEGROUP_MAIN_NAME, causticsGroup, force)
 
 
-def setup_geo_node_groups():
+def setup_geo_node_groups(force=False):
     if (4, 0, 0) > bpy.app.version:
-        geo_old()
+        geo_old(force)
     else:
-        import_node_group_from_json(NODEGROUP_UV_NAME, uvScaleMapGroup)
-        import_node_group_from_json(NODEGROUP_REVERSE_ROTATION, reverseRotation)
-        import_node_group_from_json(NODEGROUP_CAM_PLACEMENT_ORTHO, camPlacementOrtho)
-        import_node_group_from_json(NODEGROUP_CLIPPING_PLANES_ORTHO, clippingPlanesOrtho)
-        import_node_group_from_json(NODEGROUP_CAM_PLACEMENT_PANO, camPlacementPano)
-        import_node_group_from_json(NODEGROUP_CLIPPING_PLANES_PANO, clippingPlanesPano)
+        import_node_group_from_json(NODEGROUP_UV_NAME, uvScaleMapGroup, force)
+        import_node_group_from_json(NODEGROUP_REVERSE_ROTATION, reverseRotation, force)
+        import_node_group_from_json(NODEGROUP_CAM_PLACEMENT_ORTHO, camPlacementOrtho, force)
+        import_node_group_from_json(NODEGROUP_CLIPPING_PLANES_ORTHO, clippingPlanesOrtho, force)
+        import_node_group_from_json(NODEGROUP_CAM_PLACEMENT_PANO, camPlacementPano, force)
+        import_node_group_from_json(NODEGROUP_CLIPPING_PLANES_PANO, clippingPlanesPano, force)
 
 
 causticsGroup = '{"type": "SHADER", "interface": [{"in_out": "OUTPUT", "name": "Surface", "socket_type": "NodeSocketShader", "default_attribute_name": "", "hide_value": false}, {"in_out": "OUTPUT", "name": "Volume", "socket_type": "NodeSocketShader", "default_attribute_name": "", "hide_value": false}, {"in_out": "INPUT", "name": "Color", "socket_type": "NodeSocketColor", "default_attribute_name": "", "hide_value": false, "default_value": [1.0, 1.0, 1.0, 1.0]}, {"in_out": "INPUT", "name": "Transmission", "socket_type": "NodeSocketFloat", "default_attribute_name": "", "hide_value": false, "default_value": 1.0, "min_value": 0.0, "max_value": 1.0, "subtype": "FACTOR"}, {"in_out": "INPUT", "name": "IOR", "socket_type": "NodeSocketFloat", "default_attribute_name": "", "hide_value": false, "default_value": 1.4500000476837158, "min_value": -3.4028234663852886e+38, "max_value": 3.4028234663852886e+38, "subtype": "NONE"}, {"in_out": "INPUT", "name": "Normal", "socket_type": "NodeSocketVector", "default_attribute_name": "", "hide_value": true, "default_value": [0.0, 0.0, 0.0], "min_value": -3.4028234663852886e+38, "max_value": 3.4028234663852886e+38, "subtype": "NONE"}, {"in_out": "INPUT", "name": "Roughness", "socket_type": "NodeSocketFloat", "default_attribute_name": "", "hide_value": false, "default_value": 0.0, "min_value": 0.0, "max_value": 1.0, "subtype": "FACTOR"}, {"in_out": "INPUT", "name": "Volume", "socket_type": "NodeSocketShader", "default_attribute_name": "", "hide_value": false}], "nodes": [{"name": "Attribute.001", "type": "ShaderNodeAttribute", "location": [2660.0, 360.0], "inputs": {}, "attributes": {"attribute_type": "OBJECT", "attribute_name": "CB_Caustic_Contributor"}}, {"name": "Mix Shader", "type": "ShaderNodeMixShader", "location": [2880.0, 160.0], "inputs": {"Fac": 0.5}, "attributes": {}}, {"name": "Group Output", "type": "NodeGroupOutput", "location": [3120.0, 160.0], "inputs": {}, "attributes": {"is_active_output": true}}, {"name": "Test.001", "type": "NodeGroupInput", "location": [2680.0, -120.0], "inputs": {}, "attributes": {}}, {"name": "Mix Shader.001", "type": "ShaderNodeMixShader", "location": [2880.0, 20.0], "inputs": {"Fac": 0.5}, "attributes": {}}, {"name": "Mix Shader.003", "type": "ShaderNodeMixShader", "location": [2020.0, 360.0], "inputs": {"Fac": 0.5}, "attributes": {}}, {"name": "Mix Shader.004", "type": "ShaderNodeMixShader", "location": [1820.0, 360.0], "inputs": {"Fac": 0.5}, "attributes": {}}, {"name": "Vector Math.004", "type": "ShaderNodeVectorMath", "location": [1620.0, 360.0], "inputs": {"Vector": [0.0, 0.0, 0.0], "Vector_001": [0.0, 0.0, 0.0], "Vector_002": [0.0, 0.0, 0.0], "Scale": 1.0}, "attributes": {"operation": "ADD"}}, {"name": "Emission", "type": "ShaderNodeEmission", "location": [1620.0, 160.0], "inputs": {"Color": [1.0, 1.0, 1.0, 1.0], "Strength": 1.0, "Weight": 0.0}, "attributes": {}}, {"name": "Combine XYZ", "type": "ShaderNodeCombineXYZ", "location": [1420.0, 360.0], "inputs": {"X": 0.0, "Y": 0.0, "Z": 0.0}, "attributes": {}}, {"name": "Mix Shader.005", "type": "ShaderNodeMixShader", "location": [2220.0, 360.0], "inputs": {"Fac": 0.5}, "attributes": {}}, {"name": "Math.004", "type": "ShaderNodeMath", "location": [1220.0, 360.0], "inputs": {"Value": 0.5, "Value_001": 0.5, "Value_002": 0.5}, "attributes": {"operation": "MULTIPLY", "use_clamp": false}}, {"name": "Attribute.003", "type": "ShaderNodeAttribute", "location": [1020.0, 360.0], "inputs": {}, "attributes": {"attribute_type": "GEOMETRY", "attribute_name": "CB_UV_Scale"}}, {"name": "Math.005", "type": "ShaderNodeMath", "location": [1020.0, 160.0], "inputs": {"Value": 0.5, "Value_001": 0.5, "Value_002": 0.5}, "attributes": {"operation": "DIVIDE", "use_clamp": false}}, {"name": "Vector Math.005", "type": "ShaderNodeVectorMath", "location": [800.0, 160.0], "inputs": {"Vector": [0.0, 0.0, 0.0], "Vector_001": [0.0, 0.0, 0.0], "Vector_002": [0.0, 0.0, 0.0], "Scale": 1.0}, "attributes": {"operation": "DOT_PRODUCT"}}, {"name": "Vector Math.006", "type": "ShaderNodeVectorMath", "location": [800.0, 360.0], "inputs": {"Vector": [0.0, 0.0, 0.0], "Vector_001": [0.0, 0.0, 0.0], "Vector_002": [0.0, 0.0, 0.0], "Scale": 1.0}, "attributes": {"operation": "DOT_PRODUCT"}}, {"name": "Geometry.001", "type": "ShaderNodeNewGeometry", "location": [580.0, 360.0], "inputs": {}, "attributes": {}}, {"name": "Bump.001", "type": "ShaderNodeBump", "location": [580.0, 100.0], "inputs": {"Strength": 0.0, "Distance": 1.0, "Height": 1.0, "Normal": [0.0, 0.0, 0.0]}, "attributes": {"invert": false}}, {"name": "Fresnel", "type": "ShaderNodeFresnel", "location": [1220.0, -380.0], "inputs": {"IOR": 1.4500000476837158, "Normal": [0.0, 0.0, 0.0]}, "attributes": {}}, {"name": "Math", "type": "ShaderNodeMath", "location": [1620.0, -180.0], "inputs": {"Value": 0.5, "Value_001": 0.5, "Value_002": 0.5}, "attributes": {"operation": "LESS_THAN", "use_clamp": false}}, {"name": "Math.001", "type": "ShaderNodeMath", "location": [1420.0, -180.0], "inputs": {"Value": 0.5, "Value_001": 0.5, "Value_002": 0.5}, "attributes": {"operation": "MULTIPLY", "use_clamp": false}}, {"name": "Separate HSV", "type": "ShaderNodeSeparateHSV", "location": [1420.0, -380.0], "inputs": {"Color": [0.800000011920929, 0.800000011920929, 0.800000011920929, 1.0]}, "attributes": {}}, {"name": "Combine RGB", "type": "ShaderNodeCombineRGB", "location": [1620.0, -380.0], "inputs": {"R": 1.0, "G": 1.0, "B": 0.0}, "attributes": {}}, {"name": "Mix", "type": "ShaderNodeMixRGB", "location": [1820.0, -400.0], "inputs": {"Fac": 0.5, "Color1": [0.5, 0.5, 0.5, 1.0], "Color2": [0.5, 0.5, 0.5, 1.0]}, "attributes": {"blend_type": "MIX", "use_alpha": false, "use_clamp": false}}, {"name": "Refraction BSDF", "type": "ShaderNodeBsdfRefraction", "location": [2020.0, -380.0], "inputs": {"Color": [1.0, 1.0, 1.0, 1.0], "Roughness": 0.0, "IOR": 1.4500000476837158, "Normal": [0.0, 0.0, 0.0], "Weight": 0.0}, "attributes": {"distribution": "BECKMANN"}}, {"name": "Glossy BSDF", "type": "ShaderNodeBsdfAnisotropic", "location": [2020.0, -580.0], "inputs": {"Color": [0.800000011920929, 0.800000011920929, 0.800000011920929, 1.0], "Roughness": 0.0, "Anisotropy": 0.0, "Rotation": 0.0, "Normal": [0.0, 0.0, 0.0], "Tangent": [0.0, 0.0, 0.0], "Weight": 0.0}, "attributes": {"distribution": "GGX"}}, {"name": "Geometry", "type": "ShaderNodeNewGeometry", "location": [1020.0, -180.0], "inputs": {}, "attributes": {}}, {"name": "White Noise Texture.001", "type": "ShaderNodeTexWhiteNoise", "location": [1220.0, -180.0], "inputs": {"Vector": [0.0, 0.0, 0.0], "W": 0.0}, "attributes": {"noise_dimensions": "4D"}}, {"name": "Mix Shader.002", "type": "ShaderNodeMixShader", "location": [2220.0, -180.0], "inputs": {"Fac": 0.5}, "attributes": {}}, {"name": "White Noise Texture", "type": "ShaderNodeTexWhiteNoise", "location": [1100.0, -700.0], "inputs": {"Vector": [0.0, 0.0, 0.0], "W": 0.0}, "attributes": {"noise_dimensions": "3D"}}, {"name": "Math.002", "type": "ShaderNodeMath", "location": [1100.0, -900.0], "inputs": {"Value": 0.5, "Value_001": 2.0, "Value_002": 0.5}, "attributes": {"operation": "POWER", "use_clamp": false}}, {"name": "Vector Math.003", "type": "ShaderNodeVectorMath", "location": [1280.0, -700.0], "inputs": {"Vector": [0.0, 0.0, 0.0], "Vector_001": [0.5, 0.5, 0.5], "Vector_002": [0.0, 0.0, 0.0], "Scale": 1.0}, "attributes": {"operation": "SUBTRACT"}}, {"name": "Math.003", "type": "ShaderNodeMath", "location": [1280.0, -900.0], "inputs": {"Value": 0.5, "Value_001": 2.499999761581421, "Value_002": 0.5}, "attributes": {"operation": "MULTIPLY", "use_clamp": false}}, {"name": "Vector Math", "type": "ShaderNodeVectorMath", "location": [1640.0, -700.0], "inputs": {"Vector": [0.0, 0.0, 0.0], "Vector_001": [0.0, 0.0, 0.0], "Vector_002": [0.0, 0.0, 0.0], "Scale": 1.0}, "attributes": {"operation": "ADD"}}, {"name": "Vector Math.001", "type": "ShaderNodeVectorMath", "location": [1820.0, -700.0], "inputs": {"Vector": [0.0, 0.0, 0.0], "Vector_001": [0.0, 0.0, 0.0], "Vector_002": [0.0, 0.0, 0.0], "Scale": 1.0}, "attributes": {"operation": "NORMALIZE"}}, {"name": "Texture Coordinate", "type": "ShaderNodeTexCoord", "location": [920.0, -700.0], "inputs": {}, "attributes": {"from_instancer": false}}, {"name": "Vector Math.002", "type": "ShaderNodeVectorMath", "location": [1460.0, -800.0], "inputs": {"Vector": [0.0, 0.0, 0.0], "Vector_001": [0.0, 0.0, 0.0], "Vector_002": [0.0, 0.0, 0.0], "Scale": 1.0}, "attributes": {"operation": "MULTIPLY"}}, {"name": "Bump", "type": "ShaderNodeBump", "location": [1460.0, -600.0], "inputs": {"Strength": 0.0, "Distance": 1.0, "Height": 1.0, "Normal": [0.0, 0.0, 0.0]}, "attributes": {"invert": false}}, {"name": "Attribute", "type": "ShaderNodeAttribute", "location": [1820.0, 540.0], "inputs": {}, "attributes": {"attribute_type": "OBJECT", "attribute_name": "CB_Caustic_Baking"}}, {"name": "Attribute.002", "type": "ShaderNodeAttribute", "location": [1420.0, 540.0], "inputs": {}, "attributes": {"attribute_type": "GEOMETRY", "attribute_name": "CB_UV_Coordinates"}}, {"name": "Seed", "type": "ShaderNodeValue", "location": [1020.0, -80.0], "inputs": {}, "attributes": {}}, {"name": "Color", "type": "ShaderNodeValue", "location": [1620.0, 0.0], "inputs": {}, "attributes": {}}, {"name": "Light Path", "type": "ShaderNodeLightPath", "location": [2020.0, 700.0], "inputs": {}, "attributes": {}}, {"name": "Group Input", "type": "NodeGroupInput", "location": [160.0, -560.0], "inputs": {}, "attributes": {}}], "links": [{"from_node": "Attribute.001", "to_node": "Mix Shader", "from_socket": "Fac", "to_socket": "Fac"}, {"from_node": "Mix Shader", "to_node": "Group Output", "from_socket": "Shader", "to_socket": "Socket_0"}, {"from_node": "Mix Shader.001", "to_node": "Group Output", "from_socket": "Shader", "to_socket": "Socket_1"}, {"from_node": "Test.001", "to_node": "Mix Shader.001", "from_socket": "Socket_7", "to_socket": "Shader_001"}, {"from_node": "Texture Coordinate", "to_node": "White Noise Texture", "from_socket": "Object", "to_socket": "Vector"}, {"from_node": "Vector Math.002", "to_node": "Vector Math", "from_socket": "Vector", "to_socket": "Vector_001"}, {"from_node": "Vector Math", "to_node": "Vector Math.001", "from_socket": "Vector", "to_socket": "Vector"}, {"from_node": "Vector Math.003", "to_node": "Vector Math.002", "from_socket": "Vector", "to_socket": "Vector"}, {"from_node": "Math.003", "to_node": "Vector Math.002", "from_socket": "Value", "to_socket": "Vector_001"}, {"from_node": "Math.002", "to_node": "Math.003", "from_socket": "Value", "to_socket": "Value"}, {"from_node": "White Noise Texture", "to_node": "Vector Math.003", "from_socket": "Color", "to_socket": "Vector"}, {"from_node": "Bump", "to_node": "Vector Math", "from_socket": "Normal", "to_socket": "Vector"}, {"from_node": "Group Input", "to_node": "Math.002", "from_socket": "Socket_6", "to_socket": "Value"}, {"from_node": "Group Input", "to_node": "Bump", "from_socket": "Socket_5", "to_socket": "Normal"}, {"from_node": "Geometry", "to_node": "White Noise Texture.001", "from_socket": "Position", "to_socket": "Vector"}, {"from_node": "White Noise Texture.001", "to_node": "Math.001", "from_socket": "Value", "to_socket": "Value"}, {"from_node": "Math.001", "to_node": "Math", "from_socket": "Value", "to_socket": "Value"}, {"from_node": "Fresnel", "to_node": "Math", "from_socket": "Fac", "to_socket": "Value_001"}, {"from_node": "Separate HSV", "to_node": "Combine RGB", "from_socket": "V", "to_socket": "B"}, {"from_node": "Combine RGB", "to_node": "Mix", "from_socket": "Image", "to_socket": "Color1"}, {"from_node": "Mix", "to_node": "Refraction BSDF", "from_socket": "Color", "to_socket": "Color"}, {"from_node": "Mix", "to_node": "Glossy BSDF", "from_socket": "Color", "to_socket": "Color"}, {"from_node": "Math", "to_node": "Mix Shader.002", "from_socket": "Value", "to_socket": "Fac"}, {"from_node": "Refraction BSDF", "to_node": "Mix Shader.002", "from_socket": "BSDF", "to_socket": "Shader"}, {"from_node": "Glossy BSDF", "to_node": "Mix Shader.002", "from_socket": "BSDF", "to_socket": "Shader_001"}, {"from_node": "Group Input", "to_node": "Fresnel", "from_socket": "Socket_4", "to_socket": "IOR"}, {"from_node": "Group Input", "to_node": "Separate HSV", "from_socket": "Socket_2", "to_socket": "Color"}, {"from_node": "Group Input", "to_node": "Math.001", "from_socket": "Socket_3", "to_socket": "Value_001"}, {"from_node": "Vector Math.001", "to_node": "Refraction BSDF", "from_socket": "Vector", "to_socket": "Normal"}, {"from_node": "Vector Math.001", "to_node": "Glossy BSDF", "from_socket": "Vector", "to_socket": "Normal"}, {"from_node": "Group Input", "to_node": "Mix", "from_socket": "Socket_2", "to_socket": "Color2"}, {"from_node": "Mix Shader.002", "to_node": "Mix Shader", "from_socket": "Shader", "to_socket": "Shader_001"}, {"from_node": "Light Path", "to_node": "Mix Shader.005", "from_socket": "Is Camera Ray", "to_socket": "Fac"}, {"from_node": "Mix Shader.003", "to_node": "Mix Shader.005", "from_socket": "Shader", "to_socket": "Shader"}, {"from_node": "Mix Shader.004", "to_node": "Mix Shader.003", "from_socket": "Shader", "to_socket": "Shader_001"}, {"from_node": "Vector Math.004", "to_node": "Mix Shader.004", "from_socket": "Vector", "to_socket": "Shader"}, {"from_node": "Emission", "to_node": "Mix Shader.004", "from_socket": "Emission", "to_socket": "Shader_001"}, {"from_node": "Combine XYZ", "to_node": "Vector Math.004", "from_socket": "Vector", "to_socket": "Vector"}, {"from_node": "Math.004", "to_node": "Combine XYZ", "from_socket": "Value", "to_socket": "Z"}, {"from_node": "Bump.001", "to_node": "Vector Math.006", "from_socket": "Normal", "to_socket": "Vector_001"}, {"from_node": "Geometry.001", "to_node": "Vector Math.005", "from_socket": "Incoming", "to_socket": "Vector"}, {"from_node": "Geometry.001", "to_node": "Vector Math.005", "from_socket": "True Normal", "to_socket": "Vector_001"}, {"from_node": "Geometry.001", "to_node": "Vector Math.006", "from_socket": "Incoming", "to_socket": "Vector"}, {"from_node": "Vector Math.006", "to_node": "Math.005", "from_socket": "Value", "to_socket": "Value"}, {"from_node": "Vector Math.005", "to_node": "Math.005", "from_socket": "Value", "to_socket": "Value_001"}, {"from_node": "Attribute.003", "to_node": "Math.004", "from_socket": "Fac", "to_socket": "Value"}, {"from_node": "Math.004", "to_node": "Emission", "from_socket": "Value", "to_socket": "Strength"}, {"from_node": "Math.005", "to_node": "Math.004", "from_socket": "Value", "to_socket": "Value_001"}, {"from_node": "Attribute", "to_node": "Mix Shader.003", "from_socket": "Fac", "to_socket": "Fac"}, {"from_node": "Attribute.002", "to_node": "Vector Math.004", "from_socket": "Vector", "to_socket": "Vector_001"}, {"from_node": "Group Input", "to_node": "Bump.001", "from_socket": "Socket_5", "to_socket": "Normal"}, {"from_node": "Mix Shader.005", "to_node": "Mix Shader", "from_socket": "Shader", "to_socket": "Shader"}, {"from_node": "Seed", "to_node": "White Noise Texture.001", "from_socket": "Value", "to_socket": "W"}, {"from_node": "Color", "to_node": "Mix", "from_socket": "Value", "to_socket": "Fac"}, {"from_node": "Color", "to_node": "Mix Shader.001", "from_socket": "Value", "to_socket": "Fac"}, {"from_node": "Color", "to_node": "Mix Shader.004", "from_socket": "Value", "to_socket": "Fac"}]}'
@@ -0,0 +1,82 @@
+# partial accumulation files written by the shards of a distributed bake and the tool merging them
+#
+# A partial holds the normalized accumulation values of the cameras baked by one shard together with the metadata
+# needed to check that all partials belong to the same bake. The normalization is applied per sample while splatting,
+# so the final caustic map is the plain sum of the partials. This module only depends on numpy so partials can be
+# merged without blender:
+#
+#   python cb_partial.py merged.npz part_0.npz part_1.npz ...
+import argparse
+import json
+import sys
+import numpy as np
+
+PARTIAL_VERSION = 1
+
+# metadata that has to be equal for all partials of a bake
+PARTIAL_LAYOUT_KEYS = ('texture_res', 'channels', 'image_normalization', 'samples_total', 'sample_res', 'shard_count')
+
+
+def save_partial(path, values, metadata):
+    metadata = dict(metadata, version=PARTIAL_VERSION)
+    with open(path, 'wb') as file:
+        np.savez(file, values=values, metadata=np.array(json.dumps(metadata)))
+
+
+# returns the (texels, channels) values and the metadata of a partial
+def load_partial(path):
+    with np.load(path) as file:
+        metadata = json.loads(str(file['metadata']))
+        if metadata.get('version') != PARTIAL_VERSION:
+            raise ValueError(f'{path} is not a caustic bake partial of version {PARTIAL_VERSION}')
+        return file['values'], metadata
+
+
+# sums the partials of a bake, the shards are checked to be complete and to share the same layout and normalization
+#
+# Merged partials can be merged again, the shards they cover are kept in the metadata.
+def merge_partials(paths):
+    if not paths:
+        raise ValueError('no partials to merge')
+    total = None
+    merged = None
+    for path in paths:
+        values, metadata = load_partial(path)
+        if merged is None:
+            merged = {key: metadata[key] for key in PARTIAL_LAYOUT_KEYS}
+            merged['shards'] = []
+            merged['cams'] = []
+            merged['stats'] = []
+            total = np.zeros(values.shape, dtype=np.float64)
+        else:
+            for key in PARTIAL_LAYOUT_KEYS:
+                if metadata[key] != merged[key]:
+                    raise ValueError(f'{path} does not match the other partials: {key} is {metadata[key]}, '
+                                     f'expected {merged[key]}')
+        duplicates = set(metadata['shards']) & set(merged['shards'])
+        if duplicates:
+            raise ValueError(f'{path} contains shards that were already merged: {sorted(duplicates)}')
+        merged['shards'] += metadata['shards']
+        merged['cams'] += metadata['cams']
+        merged['stats'] += metadata['stats']
+        # summing in float64 keeps the result independent of the order of the partials, the float64 partials of a
+        # distributed bake therefore merge into the map of a single double precision bake
+        total += values
+    merged['shards'].sort()
+    merged['complete'] = merged['shards'] == list(range(merged['shard_count']))
+    return total, merged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='merges partial caustic bakes into one partial')
+    parser.add_argument('output', help='merged partial file')
+    parser.add_argument('partials', nargs='+', help='partial files written by the shards')
+    arguments = parser.parse_args(argv)
+    values, metadata = merge_partials(arguments.partials)
+    save_partial(arguments.output, values, metadata)
+    print(json.dumps({'shards': metadata['shards'], 'complete': metadata['complete'], 'output': arguments.output}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
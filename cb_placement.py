@@ -0,0 +1,320 @@
+import hashlib
+import json
+import math
+import bmesh
+import bpy
+import mathutils
+import numpy as np
+
+from .cb_const import CAUSTIC_CONTRIBUTOR_ATTRIBUTE, CAUSTIC_RECEIVER_ATTRIBUTE, CAUSTIC_SHADOW_ATTRIBUTE, \
+    PLACEMENT_ANGLE_STEPS, PLACEMENT_CHUNK_SIZE, PLACEMENT_CACHE_ATTRIBUTE
+
+# tolerance of the geometry nodes when selecting the smallest of the rotated bounding rectangles
+RECT_AREA_EPSILON = 0.001
+# minimal field of view used when testing fisheye cameras for overlap
+MIN_PANO_FOV = math.radians(10.0)
+# smallest clip start of the fisheye cameras, geometry touching the light would otherwise give a clip start of zero
+MIN_CLIP_START = 0.001
+# changing the placement computation has to change the version so cached placements are computed again
+PLACEMENT_CACHE_VERSION = 2
+
+
+# world space vertex positions of the evaluated object, objects without geometry return no vertices
+def object_vertices(obj, deps_graph):
+    evaluated = obj.evaluated_get(deps_graph)
+    try:
+        mesh = evaluated.to_mesh()
+    except RuntimeError:
+        return np.empty((0, 3))
+    if mesh is None:
+        return np.empty((0, 3))
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get('co', co)
+    evaluated.to_mesh_clear()
+    matrix = np.array(evaluated.matrix_world, dtype=np.float64)
+    return co.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def collection_vertices(names, deps_graph):
+    vertices = [object_vertices(obj, deps_graph) for name in names for obj in bpy.data.collections[name].all_objects]
+    return np.concatenate(vertices) if vertices else np.empty((0, 3))
+
+
+# extents of the points in the light plane for every tested rotation, shape (angles, 4) with min x, max x, min y, max y
+#
+# The geometry nodes rotate the flattened convex hull in PLACEMENT_ANGLE_STEPS steps over 90° and keep the smallest
+# bounding rectangle. The extents of a group of objects are the element wise min and max of the extents of its
+# objects, so the hull never has to be built and merged groups do not touch the vertices again.
+def ortho_extents(points):
+    angles = np.arange(PLACEMENT_ANGLE_STEPS) / PLACEMENT_ANGLE_STEPS * (math.pi / 2)
+    cos, sin = np.cos(angles), np.sin(angles)
+    extents = np.empty((PLACEMENT_ANGLE_STEPS, 4))
+    extents[:, 0::2] = np.inf
+    extents[:, 1::2] = -np.inf
+    for start in range(0, len(points), PLACEMENT_CHUNK_SIZE):
+        x = points[start:start + PLACEMENT_CHUNK_SIZE, 0:1]
+        y = points[start:start + PLACEMENT_CHUNK_SIZE, 1:2]
+        rotated_x = x * cos - y * sin
+        rotated_y = x * sin + y * cos
+        np.minimum(extents[:, 0], rotated_x.min(axis=0), out=extents[:, 0])
+        np.maximum(extents[:, 1], rotated_x.max(axis=0), out=extents[:, 1])
+        np.minimum(extents[:, 2], rotated_y.min(axis=0), out=extents[:, 2])
+        np.maximum(extents[:, 3], rotated_y.max(axis=0), out=extents[:, 3])
+    return extents
+
+
+# smallest bounding rectangle of the given extents as camera placement of an orthographic sensor
+def ortho_cam(extents):
+    widths = extents[:, 1] - extents[:, 0]
+    heights = extents[:, 3] - extents[:, 2]
+    areas = widths * heights
+    k = int(np.flatnonzero(np.abs(areas - areas.min()) <= RECT_AREA_EPSILON)[0])
+    angle = k / PLACEMENT_ANGLE_STEPS * (math.pi / 2)
+    center_x = (extents[k, 0] + extents[k, 1]) / 2
+    center_y = (extents[k, 2] + extents[k, 3]) / 2
+    # rotating the center of the rectangle back into the light plane
+    x = math.cos(angle) * center_x + math.sin(angle) * center_y
+    y = -math.sin(angle) * center_x + math.cos(angle) * center_y
+    return {'cam_pos': (float(x), float(y), -angle), 'cam_width': float(widths[k]), 'cam_height': float(heights[k])}
+
+
+# prepares the rectangle of an orthographic camera for clustering, the sweep runs along the x axis of the light plane
+def ortho_bounds(cam):
+    x, y, rotation = cam['cam_pos']
+    u = np.array((math.cos(rotation), math.sin(rotation)))
+    v = np.array((-math.sin(rotation), math.cos(rotation)))
+    half_u = u * cam['cam_width'] / 2
+    half_v = v * cam['cam_height'] / 2
+    center = np.array((x, y))
+    corners = np.array((center - half_u - half_v, center + half_u - half_v, center + half_u + half_v,
+                        center - half_u + half_v))
+    return corners[:, 0].min(), corners[:, 0].max(), (corners, (u, v), corners[:, 1].min(), corners[:, 1].max())
+
+
+# True if two prepared rectangles intersect, separating axis test of two oriented rectangles
+def ortho_overlap(rect, other):
+    if rect[3] < other[2] or other[3] < rect[2]:
+        return False
+    for axis in rect[1] + other[1]:
+        a = rect[0] @ axis
+        b = other[0] @ axis
+        if a.max() < b.min() or b.max() < a.min():
+            return False
+    return True
+
+
+# area weighted center of the convex hull of the points, the same statistic the geometry nodes use for the view axis
+def hull_center(points):
+    mesh = bpy.data.meshes.new('CB_Hull')
+    mesh.vertices.add(len(points))
+    mesh.vertices.foreach_set('co', points.astype(np.float32).reshape(-1))
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    hull = bmesh.ops.convex_hull(bm, input=bm.verts)
+    bmesh.ops.delete(bm, geom=hull['geom_interior'] + hull['geom_unused'], context='VERTS')
+    bm.to_mesh(mesh)
+    bm.free()
+    areas = np.empty(len(mesh.polygons))
+    centers = np.empty(len(mesh.polygons) * 3)
+    mesh.polygons.foreach_get('area', areas)
+    mesh.polygons.foreach_get('center', centers)
+    bpy.data.meshes.remove(mesh)
+    if areas.sum() <= 0:
+        return points.mean(axis=0)
+    return (centers.reshape(-1, 3) * areas[:, None]).sum(axis=0) / areas.sum()
+
+
+# fisheye camera looking at the given directions from the light, directions are unit vectors
+def pano_cam(directions):
+    axis = -hull_center(directions)
+    rotation = mathutils.Vector((0, 0, 1)).rotation_difference(mathutils.Vector(axis)).to_euler('XYZ')
+    # directions in camera space, the camera looks along its negative z axis
+    local = directions @ np.array(rotation.to_matrix())
+    z = local[:, 2]
+    full_sphere = bool(z.max() > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tangent = np.sqrt(local[:, 0] ** 2 + local[:, 1] ** 2) / np.abs(z)
+    fov = 2 * math.atan(float(np.nanmax(tangent))) if len(tangent) else 0.0
+    return {'rotation': tuple(rotation), 'fov': fov, 'full_sphere': full_sphere}
+
+
+# prepares the view cone of a fisheye camera for clustering
+#
+# The sweep runs along the polar angle of the view axis, two cones can only overlap if their polar angles differ by
+# less than the sum of their half opening angles.
+def pano_bounds(cam):
+    axis = mathutils.Vector((0, 0, 1))
+    axis.rotate(mathutils.Euler(cam['rotation'], 'XYZ'))
+    polar = math.acos(max(-1.0, min(1.0, axis.z)))
+    half_fov = max(cam['fov'], MIN_PANO_FOV) / 2
+    return polar - half_fov, polar + half_fov, (axis, half_fov)
+
+
+# True if the view cones of two prepared fisheye cameras overlap
+def pano_overlap(cone, other):
+    return cone[0].angle(other[0]) < cone[1] + other[1]
+
+
+# groups the overlapping items into connected components with a sweep line and a union-find structure
+#
+# bounds are (start, end, item) tuples, items whose intervals along the sweep axis do not intersect are never
+# compared. Returns the components as lists of indices ordered by their smallest index.
+def cluster(bounds, overlap):
+    parent = list(range(len(bounds)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    active = []
+    for i in sorted(range(len(bounds)), key=lambda index: bounds[index][0]):
+        active = [j for j in active if bounds[j][1] >= bounds[i][0]]
+        for j in active:
+            root, other_root = find(i), find(j)
+            if root != other_root and overlap(bounds[i][2], bounds[j][2]):
+                parent[max(root, other_root)] = min(root, other_root)
+        active.append(i)
+    components = {}
+    for i in range(len(bounds)):
+        components.setdefault(find(i), []).append(i)
+    return list(components.values())
+
+
+# merges overlapping groups of contributors until no two cameras overlap
+#
+# The cameras of merged groups are larger than the cameras they replace and may overlap further groups, so the
+# clustering is repeated on the merged groups. Usually the second pass finds nothing to merge.
+def merge_groups(groups, place, bounds, overlap):
+    while True:
+        cams = [place(group) for group in groups]
+        components = cluster([bounds(cam) for cam in cams], overlap)
+        if len(components) == len(groups):
+            return cams
+        groups = [[index for i in component for index in groups[i]] for component in components]
+
+
+# computes the same placement as node_placement with numpy and mathutils instead of geometry node evaluation
+def numpy_placement(light):
+    deps_graph = bpy.context.evaluated_depsgraph_get()
+    contributors = list(bpy.data.collections[CAUSTIC_CONTRIBUTOR_ATTRIBUTE].all_objects)
+    vertices = [object_vertices(obj, deps_graph) for obj in contributors]
+    scene_vertices = collection_vertices(
+        (CAUSTIC_CONTRIBUTOR_ATTRIBUTE, CAUSTIC_RECEIVER_ATTRIBUTE, CAUSTIC_SHADOW_ATTRIBUTE), deps_graph)
+    groups = [[i] for i in range(len(contributors))]
+
+    if light.data.type == 'SUN':
+        # light space positions, the inverse of the light rotation is applied
+        rotation = np.array(light.rotation_euler.to_matrix())
+        height = scene_vertices @ rotation
+        sensor_height = height[:, 2].max() + 1
+        extents = [ortho_extents(points @ rotation) for points in vertices]
+
+        def place(group):
+            group_extents = np.stack([extents[i] for i in group])
+            merged = np.empty(group_extents.shape[1:])
+            merged[:, 0::2] = group_extents[:, :, 0::2].min(axis=0)
+            merged[:, 1::2] = group_extents[:, :, 1::2].max(axis=0)
+            return ortho_cam(merged)
+
+        groups = [group for group in groups if len(vertices[group[0]])]
+        return {'sensor_height': sensor_height, 'sensor_clip': sensor_height - height[:, 2].min() + 1,
+                'cams': merge_groups(groups, place, ortho_bounds, ortho_overlap)}
+
+    location = np.array(light.location)
+    distances = np.linalg.norm(scene_vertices - location, axis=1)
+    clip_start = max(min(distances.min() - 0.01, distances.min() / 2), MIN_CLIP_START)
+    placement = {'clip_start': clip_start, 'clip_end': distances.max() + 1, 'full_sphere': False, 'cams': []}
+    directions = []
+    for points in vertices:
+        offset = points - location
+        directions.append(offset / np.linalg.norm(offset, axis=1, keepdims=True))
+    hulls = {}
+
+    # a group that needs the whole sphere in any pass of the merging makes the light use two hemisphere cameras
+    def place(group):
+        key = tuple(sorted(group))
+        if key not in hulls:
+            hulls[key] = pano_cam(np.concatenate([directions[i] for i in group]))
+            placement['full_sphere'] |= hulls[key]['full_sphere']
+        return hulls[key]
+
+    groups = [group for group in groups if len(directions[group[0]])]
+    for group in groups:
+        place(group)
+    if not placement['full_sphere']:
+        cams = merge_groups(groups, place, pano_bounds, pano_overlap)
+        if not placement['full_sphere']:
+            placement['cams'] = [{'rotation': cam['rotation'], 'fov': cam['fov']} for cam in cams]
+    return placement
+
+
+# part of the frame of a sensor camera the contributors are seen in as (min x, max x, min y, max y) fractions of the
+# frame, None if no contributor is in view
+#
+# Only pixels looking at a contributor can return caustic coordinates. The bounds of the projected vertices are exact
+# for orthographic cameras, the fisheye projection bends the edges between vertices outwards which the margin covers.
+# vertices are the world space vertices of the contributors, fov the field of view of fisheye cameras.
+def footprint_border(cam, vertices, fov, margin):
+    world = mathutils.Matrix.Translation(cam.location) @ cam.rotation_euler.to_matrix().to_4x4()
+    matrix = np.array(world.inverted())
+    boxes = []
+    for points in vertices:
+        if not len(points):
+            continue
+        local = points @ matrix[:3, :3].T + matrix[:3, 3]
+        if cam.data.type == 'ORTHO':
+            scale = cam.data.ortho_scale / max(cam['width'], cam['height'])
+            u = local[:, 0] / (scale * cam['width']) + .5
+            v = local[:, 1] / (scale * cam['height']) + .5
+        else:
+            # equidistant fisheye, the distance from the center of the frame grows linear with the angle to the view axis
+            radius = np.hypot(local[:, 0], local[:, 1])
+            r = np.arctan2(radius, -local[:, 2]) / fov
+            if (r > .5).all():
+                continue
+            # vertices out of view are moved onto the edge of the image circle
+            r = np.minimum(r, .5) / np.maximum(radius, 1e-12)
+            u = local[:, 0] * r + .5
+            v = local[:, 1] * r + .5
+        box = (u.min(), u.max(), v.min(), v.max())
+        if box[1] >= 0 and box[0] <= 1 and box[3] >= 0 and box[2] <= 1:
+            boxes.append(box)
+    if not boxes:
+        return None
+    boxes = np.array(boxes)
+    return (max(float(boxes[:, 0].min()) - margin, 0.0), min(float(boxes[:, 1].max()) + margin, 1.0),
+            max(float(boxes[:, 2].min()) - margin, 0.0), min(float(boxes[:, 3].max()) + margin, 1.0))
+
+
+# hash of everything the placement of the light depends on: the light transform and the world space vertices of the
+# contributors, receivers and shadow casters
+def placement_key(light, backend):
+    deps_graph = bpy.context.evaluated_depsgraph_get()
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{PLACEMENT_CACHE_VERSION} {PLACEMENT_ANGLE_STEPS} {backend} {light.data.type}'.encode())
+    digest.update(np.array(light.matrix_world, dtype=np.float64).tobytes())
+    digest.update(np.array((*light.location, *light.rotation_euler), dtype=np.float64).tobytes())
+    for name in (CAUSTIC_CONTRIBUTOR_ATTRIBUTE, CAUSTIC_RECEIVER_ATTRIBUTE, CAUSTIC_SHADOW_ATTRIBUTE):
+        for obj in bpy.data.collections[name].all_objects:
+            digest.update(f'{name} {obj.name}'.encode())
+            digest.update(object_vertices(obj, deps_graph).tobytes())
+    return digest.hexdigest()
+
+
+# returns the placement of the light from the cache of the scene, place computes and caches it if the scene changed
+#
+# The cache keeps the last placement of every light as JSON in a custom property of the scene, so it is saved with
+# the .blend file.
+def cached_placement(light, backend, place):
+    scene = bpy.context.scene
+    key = placement_key(light, backend)
+    cache = json.loads(scene.get(PLACEMENT_CACHE_ATTRIBUTE, '{}'))
+    entry = cache.get(light.name)
+    if entry is not None and entry['key'] == key:
+        return entry['placement']
+    placement = place(light)
+    cache[light.name] = {'key': key, 'placement': placement}
+    scene[PLACEMENT_CACHE_ATTRIBUTE] = json.dumps(cache)
+    return placement
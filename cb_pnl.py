@@ -5,7 +5,7 @@ from .cb_const import CAUSTIC_RECEIVER_ATTRIBUTE, CAUSTIC_CONTRIBUTOR_ATTRIBUTE,
     CAUSTIC_SOURCE_ATTRIBUTE
 
 from .cb_op import CBSetCausticSource, CBSetShadowCaster, CBUnSetShadowCaster, CBSetContributor, \
-    CBUnSetContributor, CBSetBakingTarget, CBUnSetBakingTarget, CBRunBaking, CBUnsetCausticSource
+    CBUnSetContributor, CBSetBakingTarget, CBUnSetBakingTarget, CBRunBaking, CBUnsetCausticSource, CBRebuildNodeGroups
 
 
 class CB_PT_PanelModifyObject(Panel):
@@ -119,7 +119,14 @@ class CB_PT_PanelBakingSettings(Panel):
         col.label(text="Baking Settings")
 
         col.prop(cb_props, 'sampleResMultiplier')
+        col.prop(cb_props, 'sample_folding')
         col.prop(cb_props, "samples")
+        col.prop(cb_props, 'adaptive_sampling')
+        col.prop(cb_props, 'stop_mode')
+        if cb_props.stop_mode != 'SAMPLES':
+            col.prop(cb_props, 'time_budget')
+        if cb_props.stop_mode == 'NOISE':
+            col.prop(cb_props, 'noise_target')
         col.prop(cb_props, "denoise")
         col.prop(cb_props, "colored")
         if caustic_source <= 1:
@@ -158,6 +165,24 @@ class CB_PT_PanelBakingSettings(Panel):
         col.separator(factor=4)
 
         col.prop(cb_props, 'use_gpu')
+        col.prop(cb_props, 'isolated_scene')
+        col.prop(cb_props, 'out_of_core')
+        if cb_props.out_of_core:
+            col.prop(cb_props, 'checkpoint_interval')
+            col.prop(cb_props, 'resume_bake')
+        else:
+            col.prop(cb_props, 'sparse_target')
+        if not cb_props.sparse_target or cb_props.out_of_core:
+            col.prop(cb_props, 'accumulation_backend')
+        col.prop(cb_props, 'compensated_summation')
+        col.prop(cb_props, 'double_precision')
+        col.prop(cb_props, 'worker_threads')
+        col.prop(cb_props, 'preview_interval')
+        col.prop(cb_props, 'profile_bake')
+        col.prop(cb_props, 'placement_backend')
+        col.prop(cb_props, 'placement_cache')
+        col.prop(cb_props, 'crop_to_footprint')
+        col.operator(CBRebuildNodeGroups.bl_idname)
         if caustic_source and caustic_contributor and caustic_receiver and not targetImageError:
             col.operator(CBRunBaking.bl_idname)
 
@@ -0,0 +1,54 @@
+import time
+
+from .cb_profiler import stage
+
+
+# keeps the blender image of a running bake up to date with the samples accumulated so far
+#
+# The image is refreshed at most every interval seconds, an interval of 0 turns the preview off. A float32 RGBA copy
+# of the image is kept so only the tiles changed since the last refresh have to be written into it, the copy is then
+# handed to blender with a single foreach_set. The first refresh and refreshes after the whole map was rescaled
+# rebuild the copy from a snapshot of the accumulation.
+class ImagePreview:
+    def __init__(self, image, interval):
+        self.image = image
+        self.interval = interval
+        self.buffer = None
+        self.full = True
+        self.last_update = time.perf_counter()
+        self.updates = 0
+        self.tiles = 0
+
+    @property
+    def enabled(self):
+        return self.interval > 0
+
+    # forces the next refresh to rebuild the whole image
+    def invalidate(self):
+        self.full = True
+
+    def due(self):
+        return self.enabled and time.perf_counter() - self.last_update >= self.interval
+
+    # refreshes the image from the engine if due, returns True if the image was changed
+    def update(self, engine):
+        if not self.due():
+            return False
+        self.last_update = time.perf_counter()
+        with stage('preview'):
+            if self.full or self.buffer is None:
+                # the dirty tiles are cleared first, everything changed afterwards is marked again
+                engine.dirty_tiles()
+                self.buffer = engine.snapshot().rgba(out=self.buffer)
+                self.full = False
+            else:
+                tiles = engine.dirty_tiles()
+                if len(tiles) == 0:
+                    return False
+                texels, values = engine.tile_values(tiles)
+                self.buffer[texels, :3] = values[:, :3]
+                self.tiles += len(tiles)
+        with stage('upload'):
+            self.image.pixels.foreach_set(self.buffer.reshape(-1))
+        self.updates += 1
+        return True
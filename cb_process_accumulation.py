@@ -0,0 +1,201 @@
+import importlib
+import multiprocessing
+import os
+import queue
+import sys
+from multiprocessing import shared_memory
+import numpy as np
+
+from .cb_const import ACCUMULATION_QUEUE_SIZE
+from .cb_targets import sum_tiles, take_dirty_tiles
+
+
+# float32 frame slots inside a shared memory block that the readback fills directly
+class SharedFramePool:
+    def __init__(self, frames, wait):
+        self.frames = frames
+        self.size = frames.shape[1]
+        self.wait = wait
+        self.free = list(range(len(frames) - 1, -1, -1))
+        self.allocated = len(frames)
+
+    def acquire(self):
+        while not self.free:
+            self.wait()
+        return self.frames[self.free.pop()]
+
+    def release(self, frame):
+        self.free.append(self.slot(frame))
+
+    def slot(self, frame):
+        return (frame.ctypes.data - self.frames.ctypes.data) // self.frames.strides[0]
+
+
+# imports the worker entry point as a top level module so spawned processes can resolve it without bpy
+def load_worker_module():
+    directory = os.path.dirname(os.path.abspath(__file__))
+    if directory not in sys.path:
+        sys.path.append(directory)
+    return importlib.import_module('cb_splat_worker')
+
+
+# process pool that splats samples into per process accumulation targets in shared memory
+#
+# It mirrors the interface of AccumulationEngine: sample k is handled by process k % workers and the per process
+# targets are reduced in process order by flush, which is called at the end of every light. With track_tiles set the
+# workers report the tiles every sample changed, they are collected in the dirty flags of the target.
+class ProcessAccumulationEngine:
+    def __init__(self, target, workers, frame_size, colored=False, queue_size=ACCUMULATION_QUEUE_SIZE, held_frames=0,
+                 track_tiles=False):
+        self.target = target
+        if track_tiles:
+            target.track_tiles()
+        self.queue_size = queue_size
+        self.submitted = 0
+        self.closed = False
+        self.errors = []
+        self.frames_per_sample = 2 if colored else 1
+        # held_frames are frames the caller keeps between renders before submitting them
+        slots = (workers * (queue_size + 1) + 1) * self.frames_per_sample + held_frames
+
+        # loaded before any shared memory is created, an import error then leaves nothing behind
+        worker = load_worker_module()
+        context = multiprocessing.get_context('spawn')
+        self.blocks = []
+        self.partials = []
+        self.frames_block = None
+        self.frame_pool = None
+        self.processes = []
+        try:
+            for _ in range(workers):
+                block = shared_memory.SharedMemory(create=True, size=target.nbytes)
+                self.blocks.append(block)
+                self.partials.append(target.empty_like(block.buf))
+                if track_tiles:
+                    self.partials[-1].track_tiles()
+            self.frames_block = shared_memory.SharedMemory(create=True, size=slots * frame_size * 4)
+            frames = np.ndarray((slots, frame_size), dtype=np.float32, buffer=self.frames_block.buf)
+            self.frame_pool = SharedFramePool(frames, self.collect)
+
+            self.tasks = [context.Queue() for _ in range(workers)]
+            self.results = context.Queue()
+            self.pending = [0] * workers
+            self.slot_owner = {}
+            self.start_workers(context, worker, frames.shape, track_tiles)
+        except BaseException:
+            # the blocks outlive the process unless they are unlinked, so every one created so far is freed
+            self.closed = True
+            for process in self.processes:
+                process.terminate()
+            self.release_blocks()
+            raise
+
+    def start_workers(self, context, worker, frames_shape, track_tiles):
+        target = self.target
+        # spawned children would otherwise try to re-run the script blender was started with
+        main = sys.modules['__main__']
+        main_file = main.__dict__.pop('__file__', None)
+        try:
+            for i in range(len(self.blocks)):
+                process = context.Process(target=worker.run_worker, daemon=True,
+                                          args=[self.blocks[i].name, target.texels, target.channels,
+                                                target.compensated, target.dtype.str, self.frames_block.name,
+                                                frames_shape, self.tasks[i], self.results, track_tiles])
+                process.start()
+                self.processes.append(process)
+        finally:
+            if main_file is not None:
+                main.__file__ = main_file
+
+    # closes and unlinks the shared memory of the partial targets and the frame slots
+    def release_blocks(self):
+        if self.frame_pool is not None:
+            self.frame_pool.frames = None
+        self.partials = []
+        blocks = self.blocks + ([self.frames_block] if self.frames_block is not None else [])
+        for block in blocks:
+            try:
+                block.close()
+            except BufferError:
+                # frames still referenced by the caller keep the mapping alive until they are collected
+                pass
+            block.unlink()
+
+    # returns the frame slots of finished samples to the pool, blocks for at least one result if requested
+    def collect(self, block=True):
+        while True:
+            try:
+                coordinate_slot, color_slot, error, tiles = self.results.get(block=block, timeout=None if block else 0)
+            except queue.Empty:
+                return
+            block = False
+            self.frame_pool.free.append(coordinate_slot)
+            if color_slot >= 0:
+                self.frame_pool.free.append(color_slot)
+            self.pending[self.slot_owner.pop(coordinate_slot)] -= 1
+            if error is not None:
+                self.errors.append(error)
+            if tiles is not None:
+                self.target.dirty[tiles] = True
+
+    # True if the next sample can be submitted without blocking
+    def has_capacity(self):
+        self.collect(block=False)
+        return self.pending[self.submitted % len(self.processes)] < self.queue_size and len(
+            self.frame_pool.free) >= self.frames_per_sample
+
+    # queues a sample for processing, args are the arguments of compute_caustic_map without target and frames
+    def submit(self, args, frames=()):
+        worker = self.submitted % len(self.processes)
+        while self.pending[worker] >= self.queue_size:
+            self.collect()
+        coordinate_slot = self.frame_pool.slot(frames[0])
+        color_slot = self.frame_pool.slot(frames[1]) if len(frames) > 1 else -1
+        self.slot_owner[coordinate_slot] = worker
+        self.pending[worker] += 1
+        self.tasks[worker].put((coordinate_slot, color_slot, args[2:]))
+        self.submitted += 1
+
+    # waits for all queued samples and reduces the per process targets into the target
+    def flush(self):
+        while sum(self.pending) > 0:
+            self.collect()
+        for partial in self.partials:
+            self.target.merge(partial)
+            partial.clear()
+        if self.errors:
+            error = self.errors[0]
+            self.errors = []
+            raise RuntimeError(f'caustic accumulation worker failed: {error}')
+        return self.target
+
+    def snapshot(self):
+        preview = self.target.copy()
+        for partial in self.partials:
+            preview.merge(partial)
+        return preview
+
+    def dirty_tiles(self):
+        self.collect(block=False)
+        return take_dirty_tiles([self.target])
+
+    def tile_values(self, tiles):
+        return sum_tiles([self.target] + self.partials, tiles)
+
+    # stops the worker processes and frees the shared memory, pending samples are dropped if discard is set
+    def close(self, discard=False):
+        if self.closed:
+            return self.target
+        self.closed = True
+        try:
+            if not discard:
+                self.flush()
+            for tasks in self.tasks:
+                tasks.put(None)
+            for process in self.processes:
+                process.join(timeout=None if not discard else 1)
+                if process.is_alive():
+                    process.terminate()
+        finally:
+            self.release_blocks()
+        return self.target
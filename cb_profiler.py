@@ -0,0 +1,79 @@
+import contextlib
+import json
+import os
+import threading
+import time
+
+# profiler of the running bake, None while profiling is off so the stages cost a single check
+_active = None
+
+
+# records the time spent in the stages of a bake as complete events of the chrome trace event format
+#
+# Stages may be recorded from the accumulation threads, the worker processes of the process backend do not report
+# their stages. The trace can be opened in chrome://tracing or https://ui.perfetto.dev.
+class StageProfiler:
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.events = []
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def record(self, name, start, end):
+        event = {'name': name, 'cat': 'bake', 'ph': 'X', 'ts': (start - self.start_time) * 1e6,
+                 'dur': (end - start) * 1e6, 'pid': os.getpid(), 'tid': threading.get_ident()}
+        with self.lock:
+            self.events.append(event)
+
+    # count, total, mean and maximum seconds of every stage ordered by total time
+    def summary(self):
+        stages = {}
+        with self.lock:
+            for event in self.events:
+                stage = stages.setdefault(event['name'], {'count': 0, 'total': 0.0, 'max': 0.0})
+                stage['count'] += 1
+                stage['total'] += event['dur'] / 1e6
+                stage['max'] = max(stage['max'], event['dur'] / 1e6)
+        for stage in stages.values():
+            stage['mean'] = stage['total'] / stage['count']
+        return dict(sorted(stages.items(), key=lambda item: item[1]['total'], reverse=True))
+
+    def report(self):
+        summary = self.summary()
+        print(f"{'stage':<16}{'count':>8}{'total s':>12}{'mean ms':>12}{'max ms':>12}")
+        for name, stage in summary.items():
+            print(f"{name:<16}{stage['count']:>8}{stage['total']:>12.3f}{stage['mean'] * 1000:>12.3f}"
+                  f"{stage['max'] * 1000:>12.3f}")
+
+    def write_trace(self, path):
+        with self.lock:
+            events = list(self.events)
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+
+
+def start_profiling():
+    global _active
+    _active = StageProfiler()
+    return _active
+
+
+def stop_profiling():
+    global _active
+    profiler = _active
+    _active = None
+    return profiler
+
+
+# context manager timing the enclosed code as the given stage of the running bake, does nothing while not profiling
+def stage(name):
+    if _active is None:
+        return contextlib.nullcontext()
+    return _active.stage(name)
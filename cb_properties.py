@@ -57,7 +57,9 @@ class CB_Props(bpy.types.PropertyGroup):
                                       description='size of the baked texture')
     samples: bpy.props.IntProperty(name="Samples", default=1, min=1,
                                    description='number of samples per camera (the final number of samples may change based on the sample density of individual cameras)')
-    colored: bpy.props.BoolProperty(name="Colored", default=False, description='Enables Colored Caustics')
+    colored: bpy.props.BoolProperty(name="Colored", default=False,
+                                    description='Enables Colored Caustics, every sample is rendered twice for its '
+                                                'coordinates and its color')
     denoise: bpy.props.BoolProperty(name="Denoise", default=False,
                                     description='Uses Open Image Denoise on final Result')
     use_gpu: bpy.props.BoolProperty(name='Use GPU', default=True, description='Use GPU to render')
@@ -66,6 +68,75 @@ class CB_Props(bpy.types.PropertyGroup):
 
     sampleResMultiplier: bpy.props.FloatProperty(name="Sample Resolution Multiplier", default=1, min=0,
                                                  description='base resolution is 1024x1024')
+    sample_folding: bpy.props.IntProperty(name='Sample Folding', default=1, min=1, max=8,
+                                          description='renders N x N samples at once with N times the resolution, '
+                                                      'fewer renders with less overhead per sample but more memory')
+
+    compensated_summation: bpy.props.BoolProperty(name='Compensated Summation', default=False,
+                                                  description='keeps a correction term per texel to reduce rounding '
+                                                              'errors of long bakes, doubles the memory of the target')
+    double_precision: bpy.props.BoolProperty(name='Double Precision', default=False,
+                                             description='accumulates in float64, the map of a distributed bake is '
+                                                         'then identical to this bake, doubles the memory of the target')
+    sparse_target: bpy.props.BoolProperty(name='Sparse Target', default=False,
+                                          description='only allocates memory for texture tiles that receive caustics, '
+                                                      'allows very large textures (uses thread accumulation)')
+    out_of_core: bpy.props.BoolProperty(name='Out-of-Core', default=False,
+                                        description='keeps the accumulated data in a file next to the .blend file and '
+                                                    'regularly saves the progress so the bake can be resumed')
+    checkpoint_interval: bpy.props.FloatProperty(name='Checkpoint Interval', default=60, min=1, subtype='TIME_ABSOLUTE',
+                                                 unit='TIME_ABSOLUTE',
+                                                 description='seconds between saved checkpoints')
+    resume_bake: bpy.props.BoolProperty(name='Resume', default=True,
+                                        description='continues an interrupted bake, a finished bake is extended when '
+                                                    'the sample count was increased')
+    worker_threads: bpy.props.IntProperty(name='Workers', default=0, min=0,
+                                          description='number of threads or processes accumulating samples (0 = automatic)')
+    accumulation_backend: bpy.props.EnumProperty(name='Accumulation', default='THREADS',
+                                                 items=[('THREADS', 'Threads', 'accumulate samples in worker threads'),
+                                                        ('PROCESSES', 'Processes',
+                                                         'accumulate samples in worker processes using shared memory, '
+                                                         'scales better with many cores')],
+                                                 description='backend used to splat samples into the texture')
+    isolated_scene: bpy.props.BoolProperty(name='Isolated Scene', default=True,
+                                           description='renders copies of the tagged objects and their materials in a '
+                                                       'temporary scene instead of changing the scene and materials')
+    placement_backend: bpy.props.EnumProperty(name='Camera Placement', default='NODES',
+                                              items=[('NODES', 'Geometry Nodes',
+                                                      'evaluate the camera placement node groups'),
+                                                     ('NUMPY', 'NumPy',
+                                                      'compute the camera placement directly from the vertices, '
+                                                      'faster for many contributors')],
+                                              description='method used to place the cameras around the lights')
+    placement_cache: bpy.props.BoolProperty(name='Cache Placement', default=True,
+                                            description='reuses the camera placement of the last bake while the lights '
+                                                        'and caustic objects are unchanged, saved in the .blend file')
+    crop_to_footprint: bpy.props.BoolProperty(name='Crop to Contributors', default=True,
+                                              description='only renders the part of every sensor camera that shows '
+                                                          'caustic contributors')
+    adaptive_sampling: bpy.props.BoolProperty(name='Adaptive Sampling', default=False,
+                                              description='renders a few pilot samples per camera and gives the '
+                                                          'remaining samples to the cameras with the most noise')
+    stop_mode: bpy.props.EnumProperty(name='Stop', default='SAMPLES',
+                                      items=[('SAMPLES', 'Samples', 'bake the given number of samples'),
+                                             ('TIME', 'Time Budget',
+                                              'bake passes of samples until the time budget is used up'),
+                                             ('NOISE', 'Noise Target',
+                                              'bake passes of samples until the estimated noise is below the target')],
+                                      description='when the bake stops, the samples set the size of the first pass '
+                                                  'for the time budget and the noise target')
+    time_budget: bpy.props.FloatProperty(name='Time Budget', default=600, min=1, subtype='TIME_ABSOLUTE',
+                                         unit='TIME_ABSOLUTE',
+                                         description='seconds the bake may take, also limits the noise target mode')
+    noise_target: bpy.props.FloatProperty(name='Noise Target', default=0.05, min=0.001, max=1, subtype='FACTOR',
+                                          description='relative RMS noise of the caustic map at which the bake stops')
+    preview_interval: bpy.props.FloatProperty(name='Preview Interval', default=1, min=0, subtype='TIME_ABSOLUTE',
+                                              unit='TIME_ABSOLUTE',
+                                              description='seconds between updates of the image while baking, only '
+                                                          'changed tiles are updated, 0 turns the live preview off')
+    profile_bake: bpy.props.BoolProperty(name='Profile', default=False,
+                                         description='times every stage of the bake, prints a summary and writes a '
+                                                     'chrome trace next to the .blend file (always on in debug mode)')
 
     save_image_externally: bpy.props.BoolProperty(name='save externally', default=False,
                                                   description='automatically saves the image to the given filepath')
@@ -0,0 +1,56 @@
+import time
+
+from .cb_const import UI_REFRESH_INTERVAL
+
+
+# decides when the modal bake renders and when it refreshes the interface, and measures how busy the renderer is
+#
+# Renders are started back to back as soon as the previous sample was handed off, the interface is only refreshed
+# every ui_interval seconds. The duty cycle is the fraction of wall clock time spent inside render calls.
+class RenderScheduler:
+    def __init__(self, ui_interval=UI_REFRESH_INTERVAL):
+        self.ui_interval = ui_interval
+        self.start_time = time.perf_counter()
+        self.last_ui = self.start_time
+        self.render_start = None
+        self.render_end = None
+        self.renders = 0
+        self.render_time = 0.0
+        self.idle_time = 0.0
+        self.max_gap = 0.0
+
+    def begin_render(self):
+        self.render_start = time.perf_counter()
+        if self.render_end is not None:
+            gap = self.render_start - self.render_end
+            self.idle_time += gap
+            self.max_gap = max(self.max_gap, gap)
+
+    def end_render(self):
+        self.render_end = time.perf_counter()
+        self.render_time += self.render_end - self.render_start
+        self.renders += 1
+
+    # True once the interface has not been refreshed for ui_interval seconds
+    def ui_due(self):
+        return time.perf_counter() - self.last_ui >= self.ui_interval
+
+    def ui_refreshed(self):
+        self.last_ui = time.perf_counter()
+
+    def stats(self):
+        wall_time = time.perf_counter() - self.start_time
+        return {
+            'renders': self.renders,
+            'wall_time': wall_time,
+            'render_time': self.render_time,
+            'duty_cycle': self.render_time / wall_time if wall_time > 0 else 0.0,
+            'mean_gap': self.idle_time / (self.renders - 1) if self.renders > 1 else 0.0,
+            'max_gap': self.max_gap
+        }
+
+    def report(self):
+        stats = self.stats()
+        print(f"renderer busy {stats['duty_cycle'] * 100:.1f}% of {stats['wall_time']:.1f}s, "
+              f"{stats['renders']} renders, gap between renders {stats['mean_gap'] * 1000:.1f} ms mean "
+              f"{stats['max_gap'] * 1000:.1f} ms max")
@@ -0,0 +1,50 @@
+# entry point of the accumulation worker processes
+#
+# Spawned workers cannot import the addon package because its __init__ depends on bpy, this module is therefore
+# imported as a top level module from the addon directory and only depends on numpy.
+from multiprocessing import shared_memory
+import numpy as np
+
+try:
+    from .cb_targets import CausticTarget
+    from .cb_textureRenderingFunctions import compute_caustic_map
+except ImportError:
+    from cb_targets import CausticTarget
+    from cb_textureRenderingFunctions import compute_caustic_map
+
+
+def run_worker(target_name, texels, channels, compensated, dtype, frames_name, frames_shape, tasks, results,
+               track_tiles=False):
+    target_block = shared_memory.SharedMemory(name=target_name)
+    frames_block = shared_memory.SharedMemory(name=frames_name)
+    target = attach_target(target_block.buf, texels, channels, compensated, dtype)
+    if track_tiles:
+        target.track_tiles()
+    frames = np.ndarray(frames_shape, dtype=np.float32, buffer=frames_block.buf)
+    empty = np.empty(0)
+    # the shared memory mappings are released when the process exits
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        coordinate_slot, color_slot, args = task
+        error = None
+        tiles = None
+        try:
+            colors = frames[color_slot].reshape(-1, 4) if color_slot >= 0 else empty
+            compute_caustic_map(target, frames[coordinate_slot].reshape(-1, 4), colors, *args)
+        except Exception as e:
+            error = repr(e)
+        if track_tiles:
+            # the changed tiles are reported with the finished sample
+            tiles = target.take_dirty()
+        results.put((coordinate_slot, color_slot, error, tiles))
+
+
+# wraps the shared accumulation arrays created by the main process without clearing them
+def attach_target(buffer, texels, channels, compensated, dtype):
+    data = np.ndarray((texels, channels), dtype=dtype, buffer=buffer)
+    compensation = None
+    if compensated:
+        compensation = np.ndarray((texels, channels), dtype=dtype, buffer=buffer, offset=data.nbytes)
+    return CausticTarget(texels, channels, compensated, dtype, data, compensation)
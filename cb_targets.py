@@ -0,0 +1,315 @@
+import math
+import numpy as np
+
+try:
+    from .cb_const import TILE_SIZE
+except ImportError:
+    from cb_const import TILE_SIZE
+
+
+# accumulation target storing one channel for luminance or three channels for colored bakes
+#
+# Values are stored as float32, with compensated set every texel additionally keeps a Kahan compensation term so long
+# bakes do not lose small contributions against large accumulated values. The data is only expanded to RGBA when it
+# is transferred into a blender image.
+class CausticTarget:
+    def __init__(self, texels, channels, compensated=False, dtype=np.float32, data=None, compensation=None):
+        self.texels = texels
+        self.channels = channels
+        self.compensated = compensated
+        self.dtype = np.dtype(dtype)
+        self.data = data if data is not None else np.zeros((texels, channels), dtype=dtype)
+        if compensated:
+            self.compensation = compensation if compensation is not None else np.zeros((texels, channels), dtype=dtype)
+        else:
+            self.compensation = None
+        self.scratch_buffer = None
+        # one flag per TILE_SIZE² tile set by add once tracking is enabled, used for incremental previews
+        self.dirty = None
+
+    def __len__(self):
+        return self.texels
+
+    # maps texel indices onto rows of the data array
+    def locate(self, texels):
+        return texels
+
+    # int32 working memory of at least size entries used to merge samples hitting the same texel
+    #
+    # splat_texels asks for the range of texels a sample hits, at most SPLAT_SCRATCH_BYTES. Every worker splats into
+    # its own partial target and keeps one buffer that is reused for all of its samples.
+    def scratch(self, size):
+        if self.scratch_buffer is None or len(self.scratch_buffer) < size:
+            self.scratch_buffer = np.empty(size, dtype=np.int32)
+        return self.scratch_buffer
+
+    # bytes needed for the data and compensation arrays
+    @property
+    def nbytes(self):
+        return self.data.nbytes * (2 if self.compensated else 1)
+
+    # an empty target with the same layout, optionally placed inside the given buffer
+    def empty_like(self, buffer=None):
+        if buffer is None:
+            return CausticTarget(self.texels, self.channels, self.compensated, self.dtype)
+        shape = (self.texels, self.channels)
+        data = np.ndarray(shape, dtype=self.dtype, buffer=buffer)
+        compensation = None
+        if self.compensated:
+            compensation = np.ndarray(shape, dtype=self.dtype, buffer=buffer, offset=data.nbytes)
+            compensation.fill(0)
+        data.fill(0)
+        return CausticTarget(self.texels, self.channels, self.compensated, self.dtype, data, compensation)
+
+    # adds values of shape (rows, channels) to the given distinct rows returned by locate
+    def add(self, rows, values):
+        if self.compensation is None:
+            self.data[rows] += values
+        else:
+            total = self.data[rows]
+            correction = values - self.compensation[rows]
+            corrected = (total + correction).astype(self.dtype)
+            self.compensation[rows] = (corrected - total) - correction
+            self.data[rows] = corrected
+        # the tiles are marked after the values are written so a preview never misses them
+        if self.dirty is not None:
+            self.mark_dirty(rows)
+
+    # starts recording which tiles of the square texture receive values
+    def track_tiles(self):
+        self.texture_res = math.isqrt(self.texels)
+        self.tile_size = TILE_SIZE
+        self.tile_texels = TILE_SIZE * TILE_SIZE
+        self.tiles_x = -(-self.texture_res // TILE_SIZE)
+        self.dirty = np.zeros(self.tiles_x * self.tiles_x, dtype=bool)
+
+    def mark_dirty(self, rows):
+        y, x = np.divmod(rows, self.texture_res)
+        self.dirty[(y // self.tile_size) * self.tiles_x + x // self.tile_size] = True
+
+    # indices of the tiles that changed since the last call
+    def take_dirty(self):
+        tiles = np.flatnonzero(self.dirty)
+        self.dirty[tiles] = False
+        return tiles
+
+    # global texel indices of all texels of the given tiles, texels outside of the texture are marked with -1
+    def tile_texel_indices(self, tiles):
+        tile_y, tile_x = np.divmod(tiles.astype(np.intp), self.tiles_x)
+        local_y, local_x = np.divmod(np.arange(self.tile_texels), self.tile_size)
+        y = (tile_y * self.tile_size).reshape(-1, 1) + local_y
+        x = (tile_x * self.tile_size).reshape(-1, 1) + local_x
+        return np.where((x < self.texture_res) & (y < self.texture_res), y * self.texture_res + x, -1)
+
+    # texel indices and accumulated values of the texels inside the given tiles
+    def tile_values(self, tiles):
+        texels = self.tile_texel_indices(tiles).reshape(-1)
+        texels = texels[texels >= 0]
+        values = self.data[texels]
+        if self.compensation is not None:
+            values = values - self.compensation[texels]
+        return texels, values
+
+    # adds the content of another target with the same layout
+    def merge(self, other):
+        values = other.data if other.compensation is None else other.data - other.compensation
+        if self.compensation is None:
+            self.data += values
+        else:
+            correction = values - self.compensation
+            corrected = self.data + correction
+            self.compensation[:] = (corrected - self.data) - correction
+            self.data[:] = corrected
+
+    # multiplies all accumulated values, used to reweight an existing bake before more samples are added
+    def scale(self, factor):
+        self.data *= factor
+        if self.compensation is not None:
+            self.compensation *= factor
+
+    # writes memory mapped storage back to disk
+    def flush(self):
+        for array in (self.data, self.compensation):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    def clear(self):
+        self.data.fill(0)
+        if self.compensation is not None:
+            self.compensation.fill(0)
+
+    def copy(self):
+        target = self.empty_like()
+        target.data[:] = self.data
+        if self.compensation is not None:
+            target.compensation[:] = self.compensation
+        return target
+
+    # accumulated values of all texels with the compensation applied
+    def values(self):
+        return self.data if self.compensation is None else self.data - self.compensation
+
+    # expands the accumulated values to the RGBA float32 layout of blender images with alpha set to 1
+    def rgba(self, out=None):
+        if out is None:
+            out = np.empty((self.texels, 4), dtype=np.float32)
+        values = self.values()
+        if self.channels == 1:
+            out[:, :3] = values
+        else:
+            out[:, :3] = values[:, :3]
+        out[:, 3] = 1
+        return out
+
+
+# sparse accumulation target that only allocates TILE_SIZE² texel tiles that received samples
+#
+# Allocated tiles are stored back to back in the data array, tile_slots maps every tile of the texture onto its slot
+# or -1. The memory therefore scales with the lit area of the texture instead of its resolution.
+class TiledTarget(CausticTarget):
+    def __init__(self, texture_res, channels, compensated=False, dtype=np.float32, tile_size=TILE_SIZE):
+        self.texture_res = texture_res
+        self.tile_size = tile_size
+        self.tile_texels = tile_size * tile_size
+        self.tiles_x = -(-texture_res // tile_size)
+        self.tile_slots = np.full(self.tiles_x * self.tiles_x, -1, dtype=np.int32)
+        self.tiles = np.empty(0, dtype=np.int32)
+        super().__init__(texture_res * texture_res, channels, compensated, dtype,
+                         data=np.zeros((0, channels), dtype=dtype),
+                         compensation=np.zeros((0, channels), dtype=dtype) if compensated else None)
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes * (2 if self.compensated else 1) + self.tile_slots.nbytes
+
+    def empty_like(self, buffer=None):
+        return TiledTarget(self.texture_res, self.channels, self.compensated, self.dtype, self.tile_size)
+
+    # tile index and offset inside the tile of the given texel indices
+    def split(self, texels):
+        y, x = np.divmod(texels, self.texture_res)
+        tile_y, local_y = np.divmod(y, self.tile_size)
+        tile_x, local_x = np.divmod(x, self.tile_size)
+        return tile_y * self.tiles_x + tile_x, local_y * self.tile_size + local_x
+
+    # allocates slots for tiles that do not have one yet and returns the slots of all given tiles
+    def allocate(self, tiles):
+        slots = self.tile_slots[tiles]
+        missing = slots < 0
+        if missing.any():
+            new = np.flatnonzero(np.bincount(tiles[missing], minlength=len(self.tile_slots))).astype(np.int32)
+            # the storage grows before the tiles are published so concurrent previews never see missing rows
+            self.reserve(len(self.tiles) + len(new))
+            self.tile_slots[new] = np.arange(len(self.tiles), len(self.tiles) + len(new), dtype=np.int32)
+            self.tiles = np.concatenate((self.tiles, new))
+            slots = self.tile_slots[tiles]
+        return slots
+
+    # grows the tile storage by doubling so allocations stay amortized O(1)
+    def reserve(self, tiles):
+        rows = tiles * self.tile_texels
+        if rows <= len(self.data):
+            return
+        capacity = max(rows, 2 * len(self.data))
+        data = np.zeros((capacity, self.channels), dtype=self.dtype)
+        data[:len(self.data)] = self.data
+        self.data = data
+        if self.compensation is not None:
+            compensation = np.zeros((capacity, self.channels), dtype=self.dtype)
+            compensation[:len(self.compensation)] = self.compensation
+            self.compensation = compensation
+
+    def locate(self, texels):
+        tiles, offsets = self.split(texels)
+        return self.allocate(tiles).astype(np.intp) * self.tile_texels + offsets
+
+    def merge(self, other):
+        # reading the tile list once keeps merges of targets that are still being filled consistent
+        tiles = other.tiles
+        if len(tiles) == 0:
+            return
+        rows = (self.allocate(tiles).astype(np.intp) * self.tile_texels).reshape(-1, 1) + np.arange(
+            self.tile_texels)
+        count = len(tiles) * self.tile_texels
+        values = other.data[:count]
+        if other.compensation is not None:
+            values = values - other.compensation[:count]
+        self.add(rows.reshape(-1), values)
+
+    def copy(self):
+        target = self.empty_like()
+        target.merge(self)
+        return target
+
+    # the tiles of the sparse layout are tracked directly
+    def track_tiles(self):
+        self.dirty = np.zeros(len(self.tile_slots), dtype=bool)
+
+    def mark_dirty(self, rows):
+        self.dirty[self.tiles[rows // self.tile_texels]] = True
+
+    # unallocated tiles are returned as zeros
+    def tile_values(self, tiles):
+        # the slots are read before the data, the storage grows before new slots are published
+        slots = self.tile_slots[tiles].astype(np.intp)
+        data = self.data
+        compensation = self.compensation
+        allocated = slots >= 0
+        values = np.zeros((len(tiles), self.tile_texels, self.channels), dtype=self.dtype)
+        rows = ((slots[allocated] * self.tile_texels).reshape(-1, 1) + np.arange(self.tile_texels)).reshape(-1)
+        if len(rows):
+            tile_data = data[rows] if compensation is None else data[rows] - compensation[rows]
+            values[allocated] = tile_data.reshape(-1, self.tile_texels, self.channels)
+        texels = self.tile_texel_indices(tiles).reshape(-1)
+        inside = texels >= 0
+        return texels[inside], values.reshape(-1, self.channels)[inside]
+
+    # yields (tile index, texel indices, values) for every allocated tile to stream the result out without densifying
+    def iter_tiles(self):
+        for slot, tile in enumerate(self.tiles):
+            rows = slice(slot * self.tile_texels, (slot + 1) * self.tile_texels)
+            values = self.data[rows]
+            if self.compensation is not None:
+                values = values - self.compensation[rows]
+            texels = self.tile_texel_indices(np.array([tile]))[0]
+            inside = texels >= 0
+            yield tile, texels[inside], values[inside]
+
+    def values(self):
+        values = np.zeros((self.texels, self.channels), dtype=self.dtype)
+        for tile, texels, tile_values in self.iter_tiles():
+            values[texels] = tile_values
+        return values
+
+    def rgba(self, out=None):
+        if out is None:
+            out = np.empty((self.texels, 4), dtype=np.float32)
+        out[:, :3] = 0
+        out[:, 3] = 1
+        if len(self.tiles) == 0:
+            return out
+        count = len(self.tiles) * self.tile_texels
+        values = self.data[:count]
+        if self.compensation is not None:
+            values = values - self.compensation[:count]
+        texels = self.tile_texel_indices(self.tiles).reshape(-1)
+        inside = texels >= 0
+        out[texels[inside], :3] = values[inside, :3] if self.channels > 1 else values[inside]
+        return out
+
+
+# tiles changed in any of the given targets since the last call, targets without tracking are skipped
+def take_dirty_tiles(targets):
+    tiles = [target.take_dirty() for target in targets if target.dirty is not None]
+    if not tiles:
+        return np.empty(0, dtype=np.intp)
+    return np.unique(np.concatenate(tiles))
+
+
+# texel indices of the given tiles and their values summed over all targets, which share the texture layout
+def sum_tiles(targets, tiles):
+    # tile_values always returns new arrays that can be summed into
+    texels, values = targets[0].tile_values(tiles)
+    for target in targets[1:]:
+        values += target.tile_values(tiles)[1]
+    return texels, values
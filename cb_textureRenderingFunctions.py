@@ -1,62 +1,143 @@
-from datetime import datetime
+import collections
 import math
+import threading
 import numpy as np
 
+try:
+    from .cb_const import LENS_CACHE_BYTES, SPLAT_SCRATCH_BYTES
+    from .cb_profiler import stage
+except ImportError:
+    from cb_const import LENS_CACHE_BYTES, SPLAT_SCRATCH_BYTES
+    from cb_profiler import stage
+
 
 def compute_caustic_map(target_map, coordinates, colors, texture_res, colored, index, pano, sample_res, sampler_fov,
                         normalization, debug):
-    # data cleanup
-    valid = (coordinates[:, 2] > 0) & (coordinates[:, 0] > 0) & (coordinates[:, 0] < 1) & (coordinates[:, 1] > 0) & (
-            coordinates[:, 1] < 1)
-    if colored:
-        if pano:
-            lens_time = datetime.now()
-            colors *= fix_pano_lens(sample_res, sampler_fov)
-        colors = colors[np.where(valid)]
-    elif pano:
-        lens_time = datetime.now()
-        coordinates[:, 2] *= fix_pano_lens(sample_res, sampler_fov).reshape(-1, )
-
-    coordinates = coordinates[np.where(valid)]
-    if len(coordinates) == 0:
-        return
-
-    # converting from UV to Pixel coordinates
-    coordinates = coordinates * [texture_res, texture_res, 1, 1]
-
-    coordinates[:, [0, 1]] = np.floor(coordinates[:, [0, 1]])
-    coordinates = coordinates * [1, texture_res, 1, 1]
-    coordinates[:, [0]] = np.floor(coordinates[:, [0]])
-
-    data = coordinates[:, 2]
-    coordinates = (coordinates[:, [1]] + coordinates[:, [0]]).astype(int)
-
-    order = np.lexsort(coordinates.T)
-    diff = np.diff(coordinates[order], axis=0)
-    uniq_mask = np.append(True, (diff != 0).any(axis=1))
-
-    uniq_inds = order[uniq_mask]
-    inv_idx = np.zeros_like(order)
-    inv_idx[order] = np.cumsum(uniq_mask) - 1
-
-    if colored:
-        r = np.bincount(inv_idx, weights=np.reshape(colors[:, [0]], -1))
-        g = np.bincount(inv_idx, weights=np.reshape(colors[:, [1]], -1))
-        b = np.bincount(inv_idx, weights=np.reshape(colors[:, [2]], -1))
-        data = np.vstack((r, g, b, r)).T
-    else:
-        data = np.bincount(inv_idx, weights=data)
-        data = np.vstack((data, data, data, data)).T
+    # data cleanup, the input frames are left untouched so pooled readback buffers can be handed in directly
+    with stage('convert'):
+        valid = (coordinates[:, 2] > 0) & (coordinates[:, 0] > 0) & (coordinates[:, 0] < 1) & (
+                coordinates[:, 1] > 0) & (coordinates[:, 1] < 1)
+        valid = np.flatnonzero(valid)
+        if len(valid) == 0:
+            return
+        coordinates = coordinates[valid]
+        if colored:
+            data = colors[valid, :3]
+        else:
+            data = coordinates[:, [2]]
+
+        # converting from UV to Pixel coordinates in double precision to keep float32 frames on the same texels
+        x = np.floor(coordinates[:, 0].astype(np.float64) * texture_res)
+        y = np.floor(coordinates[:, 1].astype(np.float64) * texture_res)
+        texels = (y * texture_res + x).astype(np.intp)
+    if pano:
+        with stage('lens'):
+            data = data * fix_pano_lens(sample_res, sampler_fov)[valid]
 
-    data = data * normalization
-    coordinates = coordinates[uniq_inds]
-    target_map[coordinates] += data.reshape(-1, 1, 4)
+    with stage('splat'):
+        rows, data = splat_texels(target_map.locate(texels), data, target_map.scratch)
+        target_map.add(rows, data * normalization)
     return
 
 
+# sums the values of all samples hitting the same texel in a single O(n) pass without sorting
+#
+# scratch(size) returns an int32 array with at least size entries that is reused between calls, it never has to be
+# cleared because every entry is written before it is read. It is indexed relative to the smallest texel of the
+# sample and covers the range of texels the sample hits, so it grows up to the texture size for samples spread over
+# the whole texture. Only ranges that do not fit into SPLAT_SCRATCH_BYTES, textures above 8192², are merged with
+# np.unique instead. Returns the distinct texels and the per texel sums of all channels, the sums are added in sample
+# order and are identical to summing with np.unique and np.bincount.
+def splat_texels(texels, values, scratch):
+    low = texels.min()
+    span = int(texels.max() - low) + 1
+    if span * 4 > SPLAT_SCRATCH_BYTES:
+        unique, slots = np.unique(texels, return_inverse=True)
+    else:
+        local = texels - low
+        buffer = scratch(span)
+        positions = np.arange(len(texels), dtype=np.int32)
+
+        # one sample per texel survives the scattered write and represents the texel
+        buffer[local] = positions
+        unique = local[buffer[local] == positions]
+
+        # numbering the distinct texels and mapping every sample onto its texel number
+        buffer[unique] = positions[:len(unique)]
+        slots = buffer[local]
+        unique = unique + low
+
+    channels = values.shape[1]
+    bins = (slots.reshape(-1, 1) * channels + np.arange(channels, dtype=np.int32)).reshape(-1)
+    sums = np.bincount(bins, weights=values.reshape(-1), minlength=len(unique) * channels)
+    return unique, sums.reshape(-1, channels)
+
+
+# returns the fisheye lens correction for every pixel of a sample, the tables are cached per resolution and fov
 def fix_pano_lens(sample_res, fov):
+    return lens_cache.get(int(sample_res), float(fov))
+
+
+# read only float32 correction table with one entry per pixel of a sample
+def pano_lens_table(sample_res, fov):
     a = math.sin(fov * 0.5)
     r = np.fromfunction(
         lambda x, y: (((x - sample_res * .5 + .5) ** 2 + (y - sample_res * .5 + .5) ** 2) ** .5) / sample_res * 2 + 0.0001,
         (sample_res, sample_res), dtype=float).reshape(-1, 1)
-    return (np.sin(r * fov * 0.5) / (r * a)) ** 2
+    table = ((np.sin(r * fov * 0.5) / (r * a)) ** 2).astype(np.float32)
+    table.flags.writeable = False
+    return table
+
+
+LensCacheInfo = collections.namedtuple('LensCacheInfo', ['hits', 'misses', 'maxsize', 'currsize', 'nbytes'])
+
+
+# least recently used cache of correction tables bounded by their total size
+#
+# A table takes 4 bytes per pixel of a sample, 256 MiB at a folded sample resolution of 8192², so the number of
+# cached tables shrinks with the square of the sample resolution. The most recent table is always kept.
+class LensCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.tables = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # number of tables of the given sample resolution that fit into the cache
+    def capacity(self, sample_res):
+        return max(1, self.max_bytes // (int(sample_res) ** 2 * 4))
+
+    def get(self, sample_res, fov):
+        key = (sample_res, fov)
+        with self.lock:
+            table = self.tables.get(key)
+            if table is not None:
+                self.tables.move_to_end(key)
+                self.hits += 1
+                return table
+            self.misses += 1
+        # the table is built outside of the lock so other workers keep splatting
+        table = pano_lens_table(sample_res, fov)
+        with self.lock:
+            self.tables[key] = table
+            self.tables.move_to_end(key)
+            while len(self.tables) > 1 and self.nbytes() > self.max_bytes:
+                self.tables.popitem(last=False)
+        return table
+
+    def nbytes(self):
+        return sum(table.nbytes for table in self.tables.values())
+
+    # hit and miss statistics in the layout of functools.lru_cache, maxsize is given for the cached resolution
+    def info(self):
+        with self.lock:
+            maxsize = self.capacity(next(iter(self.tables))[0]) if self.tables else None
+            return LensCacheInfo(self.hits, self.misses, maxsize, len(self.tables), self.nbytes())
+
+
+lens_cache = LensCache(LENS_CACHE_BYTES)
+
+
+def lens_cache_info():
+    return lens_cache.info()
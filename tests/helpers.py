@@ -0,0 +1,11 @@
+# helpers shared by the tests, they run with a plain python interpreter and numpy outside of blender
+#
+# The addon loader and the synthetic frames are the ones of the benchmark suite.
+import os
+import sys
+
+BENCHMARK_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks')
+if BENCHMARK_DIRECTORY not in sys.path:
+    sys.path.append(BENCHMARK_DIRECTORY)
+
+from common import ADDON_DIRECTORY, load_addon_module, synthetic_frame
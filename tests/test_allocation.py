@@ -0,0 +1,56 @@
+# sample allocation of adaptive bakes and the noise estimate of the time and noise stop modes
+import math
+
+import numpy as np
+
+from helpers import load_addon_module
+
+allocation = load_addon_module('cb_allocation')
+
+
+def test_neyman_allocation_keeps_the_budget():
+    samples = allocation.neyman_allocation(100, [1.0, 2.0, 7.0], minimum=2)
+    assert sum(samples) == 100
+    assert min(samples) >= 2
+    assert samples[0] < samples[1] < samples[2]
+
+
+def test_neyman_allocation_is_proportional_to_the_scores():
+    samples = allocation.neyman_allocation(1003, [1.0, 3.0], minimum=1)
+    assert samples == [251, 752]
+
+
+def test_neyman_allocation_falls_back_to_uniform_shares():
+    assert allocation.neyman_allocation(12, [0.0, 0.0, 0.0]) == [4, 4, 4]
+    assert allocation.neyman_allocation(12, [1.0, math.nan, 1.0]) == [4, 4, 4]
+    assert allocation.neyman_allocation(2, [1.0, 5.0, 1.0]) == [1, 1, 1]
+    assert allocation.neyman_allocation(10, []) == []
+
+
+def test_pilot_variance_matches_numpy():
+    rng = np.random.default_rng(0)
+    pilot = allocation.PilotStatistics()
+    dense = np.zeros((5, 50))
+    for i in range(5):
+        texels = rng.integers(0, 50, 30)
+        values = rng.random(30)
+        pilot.add(texels, values)
+        np.add.at(dense[i], texels, values)
+    assert math.isclose(pilot.variance(), dense.var(axis=0, ddof=1).sum(), rel_tol=1e-9)
+
+
+def test_relative_noise_estimates_the_error_of_the_map():
+    rng = np.random.default_rng(1)
+    truth = rng.random(4096) + 0.5
+    noise = 0.3
+
+    def mean_of(count):
+        return truth + rng.normal(0, noise, (count, truth.size)).mean(axis=0)
+
+    samples, added = 64, 32
+    previous = mean_of(samples)
+    current = (previous * samples + mean_of(added) * added) / (samples + added)
+    expected = noise / math.sqrt(samples + added) * math.sqrt(truth.size / np.square(current).sum())
+    estimate = allocation.relative_noise(previous, current, samples, added)
+    assert math.isclose(estimate, expected, rel_tol=0.05)
+    assert allocation.relative_noise(previous * 0, current * 0, samples, added) is None
@@ -0,0 +1,46 @@
+# checkpoints of out-of-core bakes
+import numpy as np
+
+from helpers import load_addon_module
+
+checkpoint = load_addon_module('cb_checkpoint')
+
+
+def place_cams(remaining):
+    return [{'remaining': samples} for samples in remaining]
+
+
+def test_state_round_trip(tmp_path):
+    path = checkpoint.checkpoint_path('', str(tmp_path), 'caustics')
+    target = checkpoint.open_target(path, 16, 1, True, True)
+    target.add(np.arange(16), np.ones((16, 1), dtype=np.float32))
+    checkpoint.save_state(path, target, {'texture_res': 4, 'channels': 1, 'compensated': True, 'finished': False})
+    assert checkpoint.load_state(path, 4, 1, True) is not None
+    assert checkpoint.load_state(path, 8, 1, True) is None
+    assert checkpoint.load_state(path, 4, 1, False) is None
+    resumed = checkpoint.open_target(path, 16, 1, True, False)
+    assert np.all(resumed.values() == 1)
+
+
+def test_progress_survives_rendered_cameras():
+    cams = place_cams([4, 4, 4])
+    light_cams = list(cams)
+    # the bake renders the cameras from the end of the list and pops them
+    cams.pop()['remaining'] = 0
+    active = cams.pop()
+    active['remaining'] = 1
+    state = dict(checkpoint.camera_progress(light_cams, False), finished=False)
+    assert state == {'cam_count': 3, 'remaining': [4, 1, 0], 'finished': False}
+
+    # resuming places the same cameras again and continues where the checkpoint stopped
+    placed = place_cams([4, 4, 4])
+    assert checkpoint.matches_placement(state, placed)
+    checkpoint.restore_progress(state, placed)
+    assert [cam['remaining'] for cam in placed] == [4, 1, 0]
+
+
+def test_changed_placement_does_not_match():
+    state = dict(checkpoint.camera_progress(place_cams([2, 2]), False), finished=False)
+    assert not checkpoint.matches_placement(state, place_cams([2, 2, 2]))
+    finished = dict(checkpoint.camera_progress(place_cams([2, 2]), True), finished=True)
+    assert checkpoint.matches_placement(finished, place_cams([2, 2, 2]))
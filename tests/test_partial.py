@@ -0,0 +1,83 @@
+# merging the partial files of distributed bakes
+import numpy as np
+import pytest
+
+from helpers import load_addon_module
+
+partial = load_addon_module('cb_partial')
+
+
+def write_partial(path, values, shards, shard_count=2, **layout):
+    metadata = {'texture_res': 4, 'channels': 1, 'image_normalization': 1.0, 'samples_total': 8, 'sample_res': 16,
+                'shard_count': shard_count, 'shards': shards, 'cams': [{'shard': shard} for shard in shards],
+                'stats': [{}]}
+    metadata.update(layout)
+    partial.save_partial(str(path), values, metadata)
+    return str(path)
+
+
+def test_merge_sums_the_shards(tmp_path):
+    rng = np.random.default_rng(0)
+    values = [rng.random((16, 1), dtype=np.float32) for _ in range(2)]
+    paths = [write_partial(tmp_path / f'part_{i}.npz', values[i], [i]) for i in range(2)]
+    merged, metadata = partial.merge_partials(paths)
+    assert np.allclose(merged, values[0] + values[1])
+    assert metadata['shards'] == [0, 1]
+    assert metadata['complete']
+
+
+def test_merged_partials_can_be_merged_again(tmp_path):
+    values = np.ones((16, 1), dtype=np.float32)
+    paths = [write_partial(tmp_path / f'part_{i}.npz', values, [i], shard_count=3) for i in range(3)]
+    first, metadata = partial.merge_partials(paths[:2])
+    assert not metadata['complete']
+    partial.save_partial(str(tmp_path / 'merged.npz'), first, metadata)
+    merged, metadata = partial.merge_partials([str(tmp_path / 'merged.npz'), paths[2]])
+    assert np.all(merged == 3)
+    assert metadata['complete']
+
+
+def test_duplicate_shards_are_rejected(tmp_path):
+    values = np.ones((16, 1), dtype=np.float32)
+    paths = [write_partial(tmp_path / 'part_0.npz', values, [0]),
+             write_partial(tmp_path / 'part_0_again.npz', values, [0])]
+    with pytest.raises(ValueError, match='already merged'):
+        partial.merge_partials(paths)
+
+
+def test_mismatching_layout_is_rejected(tmp_path):
+    values = np.ones((16, 1), dtype=np.float32)
+    paths = [write_partial(tmp_path / 'part_0.npz', values, [0]),
+             write_partial(tmp_path / 'part_1.npz', values, [1], samples_total=16)]
+    with pytest.raises(ValueError, match='samples_total'):
+        partial.merge_partials(paths)
+
+
+def test_sharded_bake_matches_single_bake(tmp_path):
+    targets = load_addon_module('cb_targets')
+    kernels = load_addon_module('cb_textureRenderingFunctions')
+    rng = np.random.default_rng(1)
+    texture_res = 64
+    cams = []
+    for _ in range(7):
+        frame = np.zeros((32 * 32, 4), dtype=np.float32)
+        frame[:, :2] = rng.random((len(frame), 2), dtype=np.float32)
+        frame[:, 2] = rng.random(len(frame), dtype=np.float32) * 10 ** rng.uniform(-3, 3)
+        cams.append((frame, float(rng.uniform(0.1, 10))))
+
+    def bake(shard, shard_count):
+        target = targets.CausticTarget(texture_res * texture_res, 1, dtype=np.float64)
+        # every shard renders every shard_count-th camera like BakeSession.assign_cams
+        for index, (frame, normalization) in enumerate(cams):
+            if index % shard_count == shard:
+                kernels.compute_caustic_map(target, frame, np.empty(0), texture_res, False, index, False, 0, 0.0,
+                                            normalization, False)
+        return target.values()
+
+    single = bake(0, 1)
+    for shard_count in (2, 3):
+        paths = [write_partial(tmp_path / f'part_{shard_count}_{i}.npz', bake(i, shard_count), [i], shard_count)
+                 for i in range(shard_count)]
+        merged, metadata = partial.merge_partials(paths)
+        assert metadata['complete']
+        assert np.array_equal(merged.astype(np.float32), single.astype(np.float32))
@@ -0,0 +1,50 @@
+# process backend accumulating samples in shared memory
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from helpers import load_addon_module
+
+
+def test_failed_start_unlinks_shared_memory(monkeypatch):
+    process_accumulation = load_addon_module('cb_process_accumulation')
+    targets = load_addon_module('cb_targets')
+    names = []
+
+    def start_workers(engine, *args):
+        names.extend(block.name for block in engine.blocks + [engine.frames_block])
+        raise OSError('no processes')
+
+    monkeypatch.setattr(process_accumulation.ProcessAccumulationEngine, 'start_workers', start_workers)
+    with pytest.raises(OSError):
+        process_accumulation.ProcessAccumulationEngine(targets.CausticTarget(32 * 32, 1), 2, 64 * 64 * 4)
+    assert len(names) == 3
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_process_engine_accumulates_like_threads():
+    accumulation = load_addon_module('cb_accumulation')
+    process_accumulation = load_addon_module('cb_process_accumulation')
+    targets = load_addon_module('cb_targets')
+
+    rng = np.random.default_rng(0)
+    frames = [rng.random((64 * 64, 4), dtype=np.float32) for _ in range(4)]
+    results = []
+    for backend in ('threads', 'processes'):
+        target = targets.CausticTarget(32 * 32, 1)
+        if backend == 'processes':
+            engine = process_accumulation.ProcessAccumulationEngine(target, 2, frames[0].size)
+        else:
+            engine = accumulation.AccumulationEngine(target, 2)
+        for index, frame in enumerate(frames):
+            if backend == 'processes':
+                slot = engine.frame_pool.acquire()
+                slot[:] = frame.reshape(-1)
+                frame = slot.reshape(-1, 4)
+            engine.submit([frame, np.empty(0), 32, False, index, False, 0, 0.0, 1.0, False], [frame])
+        engine.close()
+        results.append(target.values().copy())
+    assert np.allclose(results[0], results[1], rtol=1e-5)
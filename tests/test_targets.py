@@ -0,0 +1,73 @@
+# accumulation targets and the splatting kernel
+import numpy as np
+
+from helpers import load_addon_module, synthetic_frame
+
+targets = load_addon_module('cb_targets')
+kernels = load_addon_module('cb_textureRenderingFunctions')
+
+
+def splat(target, frames, texture_res):
+    for index, frame in enumerate(frames):
+        kernels.compute_caustic_map(target, frame, np.empty(0), texture_res, False, index, False, 0, 0.0, 1.0, False)
+    return target
+
+
+def test_compensated_summation_keeps_small_contributions():
+    texels = np.arange(4)
+    plain = targets.CausticTarget(4, 1)
+    compensated = targets.CausticTarget(4, 1, compensated=True)
+    for target in (plain, compensated):
+        target.add(texels, np.full((4, 1), 1.0, dtype=np.float32))
+        for _ in range(10000):
+            target.add(texels, np.full((4, 1), 1e-8, dtype=np.float32))
+    expected = 1.0 + 10000 * 1e-8
+    assert np.all(plain.values() == 1.0)
+    assert np.allclose(compensated.values(), expected, rtol=1e-7, atol=0)
+
+
+def test_compensated_merge_is_order_independent():
+    rng = np.random.default_rng(2)
+    partials = []
+    for _ in range(3):
+        partial = targets.CausticTarget(64, 1, compensated=True)
+        partial.add(np.arange(64), rng.random((64, 1), dtype=np.float32))
+        partials.append(partial)
+    forward = targets.CausticTarget(64, 1, compensated=True)
+    backward = targets.CausticTarget(64, 1, compensated=True)
+    for partial in partials:
+        forward.merge(partial)
+    for partial in partials[::-1]:
+        backward.merge(partial)
+    assert np.allclose(forward.values(), backward.values(), rtol=1e-7)
+
+
+def test_tiled_target_matches_dense_target():
+    rng = np.random.default_rng(0)
+    texture_res = 200
+    frames = [synthetic_frame(rng, 64, 0.5, concentration)[0] for concentration in (0.25, 0.01, 0.0004)]
+    dense = splat(targets.CausticTarget(texture_res * texture_res, 1), frames, texture_res)
+    tiled = splat(targets.TiledTarget(texture_res, 1, tile_size=16), frames, texture_res)
+    assert np.array_equal(dense.values(), tiled.values())
+    assert np.array_equal(dense.rgba(), tiled.rgba())
+    # only the tiles that received samples are allocated
+    assert len(tiled.tiles) < len(tiled.tile_slots)
+
+
+def test_splat_texels_matches_add_at(monkeypatch):
+    rng = np.random.default_rng(1)
+    texel_count = 10 ** 6
+    texels = rng.integers(10, texel_count, 5000).astype(np.intp)
+    values = rng.random((len(texels), 3))
+    expected = np.zeros((texel_count, 3))
+    np.add.at(expected, texels, values)
+    # hits spread over the texture use a scratch covering their range, ranges above the budget are merged by sorting
+    for budget in (4 * texel_count, 4 * 1000):
+        monkeypatch.setattr(kernels, 'SPLAT_SCRATCH_BYTES', budget)
+        target = targets.CausticTarget(texel_count, 3)
+        unique, sums = kernels.splat_texels(texels, values, target.scratch)
+        result = np.zeros_like(expected)
+        result[unique] = sums
+        assert len(unique) == len(np.unique(texels))
+        assert np.allclose(result, expected)
+        assert target.scratch_buffer is None or target.scratch_buffer.nbytes <= budget
@@ -0,0 +1,12 @@
+# the worker processes of the process backend import their modules without the addon package
+import subprocess
+import sys
+
+from helpers import ADDON_DIRECTORY
+
+
+def test_splat_worker_imports_as_top_level_module():
+    result = subprocess.run([sys.executable, '-c', 'import cb_splat_worker'], cwd=ADDON_DIRECTORY,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+